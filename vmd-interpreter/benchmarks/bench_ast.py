@@ -0,0 +1,132 @@
+# benchmarks/bench_ast.py
+#
+# Vergleicht Speicherbedarf und Renderzeit des kompakten AST (slots, ElementKind,
+# Parameters, Dispatch-Tabelle) mit dem bisherigen AST (dataclasses mit __dict__,
+# Parameter als dict, if/elif-Kette über element.type.lower()).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_ast.py [--elements 50000] [--repeat 3]
+
+import argparse
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_document
+from harness import measure
+from vmd_interpreter.dsl_ast import Header, SourceSpan
+from vmd_interpreter.parser import DSLParser
+from vmd_interpreter.renderer import DSLRenderer
+from vmd_interpreter.tokenizer import DSLTokenizer, ELEMENT, SCENE
+
+
+@dataclass
+class LegacyElement:
+    type: str
+    parameters: Dict[str, str]
+    content: str
+    span: Optional[SourceSpan] = None
+
+
+@dataclass
+class LegacyScene:
+    title: str
+    elements: List[LegacyElement] = field(default_factory=list)
+    span: Optional[SourceSpan] = None
+
+
+@dataclass
+class LegacyAST:
+    header: Header
+    scenes: List[LegacyScene] = field(default_factory=list)
+
+
+def parse_legacy(text: str) -> LegacyAST:
+    """Dieselben Tokens, aber in die bisherigen AST-Klassen übernommen."""
+    scenes = []
+    for token in DSLTokenizer(text):
+        if token.kind == ELEMENT:
+            scenes[-1].elements.append(LegacyElement(token.value, dict(token.parameters), token.content, token.span))
+        elif token.kind == SCENE:
+            scenes.append(LegacyScene(title=token.value, span=token.span))
+    return LegacyAST(header=DSLParser(text).parse_header(), scenes=scenes)
+
+
+class LegacyRenderer(DSLRenderer):
+    """render_element wie vor der Dispatch-Tabelle."""
+
+    def render_element(self, element):
+        t = element.type.lower()
+        if t == "slide":
+            lang = element.parameters.get("lang")
+            if self.target_lang and lang != self.target_lang:
+                return
+            self.render_slide(element)
+        elif t == "teleprompt":
+            title = element.parameters.get('title', 'Kein Titel').replace('&', '\\&')
+            self.output_lines.append("% TODO: Teleprompt-Element wird in LaTeX nicht dargestellt")
+            self.output_lines.append(f"% Titel: {title}")
+        elif t == "code":
+            self.render_code_placeholder(element)
+        elif t == "video" or t == "screencast":
+            self.output_lines.append(f"% TODO: {t.capitalize()}-Element wird in LaTeX nicht dargestellt")
+            source = element.parameters.get('source', 'Keine Quelle angegeben').replace('&', '\\&')
+            self.output_lines.append(f"% Quelle: {source}")
+        elif t == "quiz":
+            self.output_lines.append("% TODO: Quiz-Element wird in LaTeX nicht dargestellt")
+            name = element.parameters.get('name', 'Kein Name').replace('&', '\\&')
+            self.output_lines.append(f"% Name: {name}")
+        else:
+            self.output_lines.append(f"% Unbekanntes Element-Typ: {t}")
+
+
+def retained_memory(build):
+    """Speicher, den das Ergebnis von build() nach dem Aufbau belegt."""
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="AST-Benchmark: kompakter AST vs. bisheriger AST")
+    arg_parser.add_argument("--elements", type=int, default=50000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    # Ohne Quiz/Video/Code erzeugt generate_document zwei Elemente (Slide + Teleprompt) pro Szene
+    text = generate_document(args.elements // 2, quiz_every=0, video_every=0, code_every=0)
+
+    legacy_ast, legacy_bytes = retained_memory(lambda: parse_legacy(text))
+    compact_ast, compact_bytes = retained_memory(lambda: DSLParser(text).parse())
+    element_count = sum(len(scene.elements) for scene in compact_ast.scenes)
+    # Inhalte und Titel sind in beiden Varianten gleich groß; ohne sie bleibt der Strukturanteil
+    text_bytes = sum(sys.getsizeof(element.content) + sys.getsizeof(scene.title)
+                     for scene in compact_ast.scenes for element in scene.elements)
+
+    legacy_output = LegacyRenderer(legacy_ast).render()
+    compact_output = DSLRenderer(compact_ast).render()
+    if legacy_output != compact_output:
+        print("Error: outputs differ")
+        sys.exit(1)
+
+    legacy_time = measure(lambda: LegacyRenderer(legacy_ast).render(), args.repeat)
+    compact_time = measure(lambda: DSLRenderer(compact_ast).render(), args.repeat)
+
+    print(f"{element_count} elements in {len(compact_ast.scenes)} scenes")
+    print(f"  AST memory  legacy: {legacy_bytes / 2**20:7.1f}MB  compact: {compact_bytes / 2**20:7.1f}MB"
+          f"  ({legacy_bytes / element_count:.0f} -> {compact_bytes / element_count:.0f} bytes/element)")
+    print(f"  without text legacy: {(legacy_bytes - text_bytes) / 2**20:6.1f}MB  "
+          f"compact: {(compact_bytes - text_bytes) / 2**20:7.1f}MB")
+    print(f"  render time legacy: {legacy_time:7.3f}s   compact: {compact_time:7.3f}s"
+          f"  ({legacy_time / compact_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_ast_cache.py
+#
+# Vergleicht das Parsen einer .vmd-Datei (DSLParser.parse) mit dem Laden des
+# gespeicherten AST (ast_cache.load_ast bzw. parse_cached bei unveränderter Quelle).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_ast_cache.py [--scenes 1000 5000 20000] [--repeat 5]
+#
+# Exit-Code 1, wenn das Laden bei der größten Eingabe nicht schneller ist als das Parsen.
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusSpec, write_document
+from harness import measure
+from vmd_interpreter.ast_cache import ast_cache_path, dump_ast, load_ast, parse_cached, source_key
+from vmd_interpreter.parser import DSLParser
+
+
+def parse_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return DSLParser(f).parse()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="AST-Cache: load_ast vs. DSLParser.parse")
+    arg_parser.add_argument("--scenes", type=int, nargs="+", default=[1000, 5000, 20000])
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'scenes':>8} {'source':>9} {'cache':>9} {'parse [s]':>10} {'load_ast [s]':>13}"
+          f" {'parse_cached [s]':>17} {'speedup':>8}")
+    speedup = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scene_count in args.scenes:
+            path = os.path.join(tmp_dir, f"synthetic_{scene_count}.vmd")
+            size = write_document(path, CorpusSpec(scenes=scene_count, languages=args.languages))
+            ast = parse_file(path)
+            cache_file = os.path.join(tmp_dir, f"synthetic_{scene_count}.ast")
+            dump_ast(ast, cache_file, source_key(path))
+            if load_ast(cache_file) != ast:
+                print("Error: loaded AST differs from parsed AST")
+                sys.exit(1)
+            parse_cached(path, tmp_dir)  # legt den Cache-Eintrag für parse_cached an
+
+            parse_time = measure(lambda: parse_file(path), args.repeat)
+            load_time = measure(lambda: load_ast(cache_file), args.repeat)
+            cached_time = measure(lambda: parse_cached(path, tmp_dir), args.repeat)
+            speedup = parse_time / cached_time
+            cache_size = os.path.getsize(ast_cache_path(path, tmp_dir))
+            print(f"{scene_count:>8} {size / 2**20:>7.1f}MB {cache_size / 2**20:>7.1f}MB {parse_time:>10.4f}"
+                  f" {load_time:>13.4f} {cached_time:>17.4f} {speedup:>7.2f}x")
+
+    if speedup <= 1.0:
+        print("FAIL: loading the cached AST is not faster than parsing")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_inline.py
+#
+# Micro-Benchmark: Inline-Formatierung einer Zeile.
+# Vergleicht die bisherige Regex-Kette (drei re.sub + str.replace) mit dem
+# Ein-Durchlauf-Formatierer vmd_interpreter.inline.format_inline, einmal ohne
+# (cold) und einmal mit wiederholten Zeilen (warm, LRU-Memo).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_inline.py [--lines 200000] [--distinct 2000]
+
+import argparse
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure
+from vmd_interpreter.inline import format_inline
+
+
+def legacy_apply_markdown_formatting(text: str) -> str:
+    """Unveränderte Kopie von DSLRenderer.apply_markdown_formatting vor dem Umbau."""
+    text = re.sub(r'\[![\w:,-]+\]', '', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'\\textbf{\1}', text)
+    text = re.sub(r'\*(.+?)\*', r'\\textit{\1}', text)
+    text = text.replace('&', '\\&')
+    return text
+
+
+TEMPLATES = [
+    "Programs solve specific problems or perform tasks {i}",
+    "**Scenes**: Top-level containers for item {i}",
+    "[!bullet{i}] - Point {i} with **bold** and *italic* text",
+    "Costs & benefits of approach {i}",
+    "Use `print({i})` to show *output* on the screen",
+    "Simple line number {i} without any markup at all",
+]
+
+
+def make_lines(count: int, distinct: int):
+    return [TEMPLATES[(i % distinct) % len(TEMPLATES)].format(i=i % distinct) for i in range(count)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Inline-Formatierung: Regex-Kette vs. Ein-Durchlauf")
+    arg_parser.add_argument("--lines", type=int, default=200000)
+    arg_parser.add_argument("--distinct", type=int, default=2000,
+                            help="Anzahl verschiedener Zeilen (Wiederholungen über Sprachen/Folien)")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    unique_lines = make_lines(args.lines, args.lines)
+    repeated_lines = make_lines(args.lines, args.distinct)
+
+    def cold(line):
+        format_inline.cache_clear()
+        return format_inline.__wrapped__(line)
+
+    legacy = measure(lambda: [legacy_apply_markdown_formatting(line) for line in unique_lines], args.repeat)
+    single_pass = measure(lambda: [cold(line) for line in unique_lines], args.repeat)
+    format_inline.cache_clear()
+    memo = measure(lambda: [format_inline(line) for line in repeated_lines], args.repeat)
+
+    print(f"{args.lines} lines")
+    print(f"  legacy regex chain:       {legacy:.4f}s")
+    print(f"  single pass (no memo):    {single_pass:.4f}s  ({legacy / single_pass:.2f}x)")
+    print(f"  single pass + LRU memo:   {memo:.4f}s  ({legacy / memo:.2f}x, {args.distinct} distinct lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_layout.py
+#
+# Misst die Ausgabe beider Backends aus einem geparsten AST: LaTeX (alle Sprachen
+# in einem Durchlauf) und HTML, jeweils mit leerem Layout-Cache und danach mit der
+# bereits erzeugten Zwischendarstellung (layout.lower_content).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_layout.py [--scenes 2000] [--repeat 3]
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusSpec, generate_lines
+from harness import measure
+from vmd_interpreter.html_renderer import HTMLRenderer
+from vmd_interpreter.layout import lower_content
+from vmd_interpreter.parser import DSLParser
+from vmd_interpreter.renderer import DSLRenderer
+
+
+def cold(func):
+    def run():
+        lower_content.cache_clear()
+        func()
+    return run
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="LaTeX- und HTML-Backend aus einem AST")
+    arg_parser.add_argument("--scenes", type=int, default=2000)
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    text = "\n".join(generate_lines(CorpusSpec(scenes=args.scenes, languages=args.languages)))
+    ast = DSLParser(text).parse()
+
+    def latex():
+        DSLRenderer(ast).render_languages(args.languages)
+
+    def html():
+        HTMLRenderer(ast).render()
+
+    def both():
+        latex()
+        html()
+
+    print(f"{args.scenes} scenes, languages {' '.join(args.languages)}")
+    print(f"{'':>12} {'cold [s]':>10} {'warm [s]':>10}")
+    for name, func in (("latex", latex), ("html", html), ("latex+html", both)):
+        print(f"{name:>12} {measure(cold(func), args.repeat):>10.4f} {measure(func, args.repeat):>10.4f}")
+    print(f"layout cache: {lower_content.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
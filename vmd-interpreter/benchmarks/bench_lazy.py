@@ -0,0 +1,78 @@
+# benchmarks/bench_lazy.py
+#
+# Vergleicht DSLParser.parse mit LazyDocument: nur Header, Szenenanzahl (Index)
+# und eine einzelne Szene aus der Mitte des Dokuments.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_lazy.py [--scenes 1000 10000 50000] [--repeat 3]
+#
+# Exit-Code 1, wenn LazyDocument ein anderes AST liefert als der Parser oder der
+# Zugriff auf eine Szene bei der größten Eingabe nicht schneller ist als das Parsen.
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusSpec, write_document
+from harness import measure
+from vmd_interpreter.lazy import LazyDocument
+from vmd_interpreter.parser import DSLParser
+
+
+def parse_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return DSLParser(f).parse()
+
+
+def lazy_header(path: str):
+    with LazyDocument(path) as doc:
+        return doc.header
+
+
+def lazy_count(path: str):
+    with LazyDocument(path) as doc:
+        return len(doc)
+
+
+def lazy_scene(path: str):
+    with LazyDocument(path) as doc:
+        return doc.scene(len(doc) // 2)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="LazyDocument vs. DSLParser.parse")
+    arg_parser.add_argument("--scenes", type=int, nargs="+", default=[1000, 10000, 50000])
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'scenes':>8} {'source':>9} {'parse [s]':>10} {'header [s]':>11} {'index [s]':>10}"
+          f" {'1 scene [s]':>12} {'speedup':>8}")
+    speedup = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scene_count in args.scenes:
+            path = os.path.join(tmp_dir, f"synthetic_{scene_count}.vmd")
+            size = write_document(path, CorpusSpec(scenes=scene_count, languages=args.languages))
+            with LazyDocument(path) as doc:
+                if doc.to_ast() != parse_file(path):
+                    print("Error: LazyDocument differs from DSLParser.parse")
+                    sys.exit(1)
+
+            parse_time = measure(lambda: parse_file(path), args.repeat)
+            header_time = measure(lambda: lazy_header(path), args.repeat)
+            count_time = measure(lambda: lazy_count(path), args.repeat)
+            scene_time = measure(lambda: lazy_scene(path), args.repeat)
+            speedup = parse_time / scene_time
+            print(f"{scene_count:>8} {size / 2**20:>7.1f}MB {parse_time:>10.4f} {header_time:>11.5f}"
+                  f" {count_time:>10.4f} {scene_time:>12.4f} {speedup:>7.1f}x")
+
+    if speedup <= 1.0:
+        print("FAIL: reading one scene lazily is not faster than parsing the document")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
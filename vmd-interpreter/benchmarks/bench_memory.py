@@ -0,0 +1,110 @@
+# benchmarks/bench_memory.py
+#
+# Prüft mit tracemalloc, dass der Speicherbedarf beim Einlesen und Rendern nicht
+# mit der Kursgröße wächst. Gemessen wird jeweils die Spitze minus dem, was danach
+# belegt bleibt (der AST bzw. die begrenzten Memo-Caches von format_inline und
+# lower_content, die vorher in einem Durchlauf gefüllt werden):
+#   render_to  Streaming-Rendering (DSLRenderer.render_to) hält nur den aktuellen
+#              Szenen-Block (unter STREAM_OVERHEAD_LIMIT); zum Vergleich das
+#              Rendern in einen String (render), das mit dem Kurs wächst
+#   parse      der Parser hält neben dem entstehenden AST nur wenige Lese-Blöcke
+#              (unter PARSE_OVERHEAD_LIMIT)
+# Beide Grenzen sind fest und gelten für jede gemessene Kursgröße.
+# bench_suite.py führt dieselbe Prüfung (check_memory) bei jedem Lauf aus.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_memory.py [--scenes 1000 4000 16000]
+#
+# Exit-Code 1, wenn eine Grenze überschritten wird.
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_document
+from harness import traced_memory
+from vmd_interpreter.parser import DSLParser
+from vmd_interpreter.renderer import DSLRenderer
+from vmd_interpreter.tokenizer import CHUNK_SIZE
+
+# Einige Lese-Blöcke (bis zu 4 Bytes je Zeichen); unabhängig von der Kursgröße
+PARSE_OVERHEAD_LIMIT = 8 * CHUNK_SIZE
+# Der aktuelle Szenen-Block plus Umbau der begrenzten Memo-Caches (zusammen etwa
+# 200KB bei jeder Größe); 16000 Szenen als String brauchen über 10MB
+STREAM_OVERHEAD_LIMIT = 1 << 20
+
+
+def parse_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return DSLParser(f).parse()
+
+
+def overhead(func) -> int:
+    """Spitzen-Speicher von func() minus dem danach noch belegten Speicher (Bytes)."""
+    _result, retained, peak = traced_memory(func)
+    return peak - retained
+
+
+def measure_memory(scene_count: int, tmp_dir: str, compare_string: bool = False) -> Dict[str, int]:
+    """
+    Speicherwerte (Bytes) für einen Kurs mit scene_count Szenen: "parse_overhead"
+    (Parsen aus der Datei), "stream_overhead" (render_to) und mit compare_string
+    zusätzlich "string_overhead" (render).
+    """
+    path = os.path.join(tmp_dir, f"memory_{scene_count}.vmd")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generate_document(scene_count))
+    ast = parse_file(path)
+    values = {"parse_overhead": overhead(lambda: parse_file(path))}
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        # Nur der Render-Schritt wird gemessen; der AST existiert bereits, die
+        # Memo-Caches sind nach dem ersten Durchlauf gefüllt.
+        DSLRenderer(ast).render_to(sink)
+        values["stream_overhead"] = overhead(lambda: DSLRenderer(ast).render_to(sink))
+    if compare_string:
+        values["string_overhead"] = overhead(lambda: DSLRenderer(ast).render())
+    return values
+
+
+def check_memory(results: Dict[int, Dict[str, int]]) -> List[str]:
+    """Meldungen für jede überschrittene Grenze; leer, wenn alles flach bleibt."""
+    problems = []
+    for scene_count in sorted(results):
+        values = results[scene_count]
+        for key, name, limit in (("parse_overhead", "parser", PARSE_OVERHEAD_LIMIT),
+                                 ("stream_overhead", "render_to()", STREAM_OVERHEAD_LIMIT)):
+            if values[key] > limit:
+                problems.append(f"{name} needs {values[key] / 1024:.0f}KB at {scene_count} scenes "
+                                f"(limit {limit / 1024:.0f}KB)")
+    return problems
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Spitzen-Speicher: Parser und render_to (Streaming) vs. render")
+    arg_parser.add_argument("--scenes", type=int, nargs="+", default=[1000, 4000, 16000])
+    args = arg_parser.parse_args()
+
+    print(f"{'scenes':>8} {'parse':>10} {'render()':>10} {'render_to()':>12}  (peak minus retained)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scene_count in args.scenes:
+            values = results[scene_count] = measure_memory(scene_count, tmp_dir, compare_string=True)
+            print(f"{scene_count:>8} {values['parse_overhead'] / 1024:>8.0f}KB "
+                  f"{values['string_overhead'] / 1024:>8.0f}KB {values['stream_overhead'] / 1024:>10.0f}KB")
+
+    problems = check_memory(results)
+    if problems:
+        print("FAIL: memory grows with input size:")
+        for message in problems:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"Memory stays flat (limits: parser {PARSE_OVERHEAD_LIMIT / 1024:.0f}KB, "
+          f"render_to() {STREAM_OVERHEAD_LIMIT / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_parallel.py
+#
+# Skalierung des parallelen Renderers (ParallelRenderer) über 1..N Prozesse für
+# ein einzelnes großes Dokument, verglichen mit dem seriellen DSLRenderer.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_parallel.py [--scenes 20000] [--jobs 1 2 4 8] [--repeat 3]
+#
+# Exit-Code 1, wenn eine parallele Ausgabe nicht Byte für Byte der seriellen entspricht.
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_document
+from harness import environment, measure, write_json
+from vmd_interpreter.parallel import ParallelRenderer
+from vmd_interpreter.parser import DSLParser
+from vmd_interpreter.renderer import DSLRenderer
+
+
+def default_jobs():
+    cpus = os.cpu_count() or 1
+    jobs = [1]
+    while jobs[-1] * 2 <= cpus:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != cpus:
+        jobs.append(cpus)
+    return jobs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Skalierung von ParallelRenderer über 1..N Prozesse")
+    arg_parser.add_argument("--scenes", type=int, default=20000)
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--jobs", type=int, nargs="+", default=default_jobs())
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = arg_parser.parse_args()
+
+    ast = DSLParser(generate_document(args.scenes, languages=args.languages)).parse()
+    languages = sorted(args.languages)
+
+    def render(renderer):
+        if len(languages) > 1:
+            return renderer.render_languages(languages)
+        return renderer.render()
+
+    expected = render(DSLRenderer(ast))
+    serial = measure(lambda: render(DSLRenderer(ast)), args.repeat)
+    print(f"{args.scenes} scenes, languages {' '.join(languages)}, {os.cpu_count()} CPUs")
+    print(f"{'jobs':>5} {'render [s]':>11} {'speedup':>8} {'efficiency':>11}")
+    print(f"{'serial':>5} {serial:>11.4f} {1.0:>7.2f}x")
+
+    runs = []
+    mismatch = False
+    for jobs in args.jobs:
+        if render(ParallelRenderer(ast, jobs=jobs)) != expected:
+            print(f"Error: output with {jobs} jobs differs from the serial output")
+            mismatch = True
+        seconds = measure(lambda: render(ParallelRenderer(ast, jobs=jobs)), args.repeat)
+        speedup = serial / seconds
+        runs.append({"jobs": jobs, "seconds": seconds, "speedup": speedup})
+        print(f"{jobs:>5} {seconds:>11.4f} {speedup:>7.2f}x {speedup / jobs:>10.0%}")
+
+    if args.output:
+        write_json(args.output, {"environment": environment(), "scenes": args.scenes,
+                                 "languages": languages, "serial_seconds": serial, "runs": runs})
+    if mismatch:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
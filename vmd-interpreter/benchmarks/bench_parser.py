@@ -0,0 +1,139 @@
+# benchmarks/bench_parser.py
+#
+# Vergleicht den Streaming-Tokenizer (DSLParser) mit dem bisherigen
+# Parser (re.split + re.match pro Zeile) auf großen synthetischen Eingaben.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_parser.py [--scenes 1000 5000 20000] [--narration-lines 6] [--repeat 5]
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_document
+from harness import measure, peak_memory
+from vmd_interpreter.dsl_ast import Header, Element, Scene, AST
+from vmd_interpreter.parser import DSLParser
+
+
+class LegacyDSLParser:
+    """Unveränderte Kopie des bisherigen Parsers als Vergleichsbasis."""
+
+    def __init__(self, input_text: str):
+        self.input_text = input_text
+
+    def parse(self) -> AST:
+        header = self.parse_header()
+        scenes = self.parse_scenes()
+        return AST(header=header, scenes=scenes)
+
+    def parse_header(self) -> Header:
+        header_pattern = r'^---\s*(.*?)\s*---'
+        match = re.search(header_pattern, self.input_text, re.DOTALL | re.MULTILINE)
+        header_data = {}
+        if match:
+            header_content = match.group(1)
+            for line in header_content.splitlines():
+                if '=' in line:
+                    key, value = line.split('=', 1)
+                    header_data[key.strip()] = value.strip().strip('"')
+        return Header(
+            title=header_data.get("title", "Untitled"),
+            author=header_data.get("author", "Unknown"),
+            style=header_data.get("style", "")
+        )
+
+    def parse_scenes(self) -> List[Scene]:
+        scene_pattern = r'# Scene:\s*(.*)'
+        scene_splits = re.split(scene_pattern, self.input_text)
+        scenes = []
+        for i in range(1, len(scene_splits), 2):
+            scene_title = scene_splits[i].strip()
+            scene_content = scene_splits[i+1]
+            scene = Scene(title=scene_title, elements=self.parse_elements(scene_content))
+            scenes.append(scene)
+        return scenes
+
+    def parse_elements(self, scene_text: str) -> List[Element]:
+        elements = []
+        element_pattern = r'^(##\s*(\w+)(?:\s*\((.*?)\))?)\s*$'
+        lines = scene_text.splitlines()
+        current_element = None
+        current_lines = []
+        for line in lines:
+            match = re.match(element_pattern, line.strip())
+            if match:
+                if current_element:
+                    elements.append(Element(
+                        type=current_element['type'],
+                        parameters=current_element['parameters'],
+                        content="\n".join(current_lines).strip()
+                    ))
+                params_str = match.group(3)
+                parameters = {}
+                if params_str:
+                    for param in params_str.split(','):
+                        if '=' in param:
+                            k, v = param.split('=', 1)
+                            parameters[k.strip()] = v.strip().strip('"')
+                current_element = {'type': match.group(2), 'parameters': parameters}
+                current_lines = []
+            else:
+                if current_element is not None:
+                    current_lines.append(line)
+        if current_element:
+            elements.append(Element(
+                type=current_element['type'],
+                parameters=current_element['parameters'],
+                content="\n".join(current_lines).strip()
+            ))
+        return elements
+
+
+def parse_file_legacy(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return LegacyDSLParser(f.read()).parse()
+
+
+def parse_file_stream(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return DSLParser(f).parse()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parser-Benchmark: Streaming-Tokenizer vs. bisheriger Parser")
+    arg_parser.add_argument("--scenes", type=int, nargs="+", default=[1000, 5000, 20000])
+    arg_parser.add_argument("--narration-lines", type=int, default=6,
+                            help="Zeilen Sprechertext pro Teleprompt (weniger = mehr Struktur-Zeilen)")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'scenes':>8} {'lines':>9} {'legacy [s]':>11} {'stream [s]':>11} {'speedup':>8}"
+          f" {'legacy peak':>12} {'stream peak':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scene_count in args.scenes:
+            text = generate_document(scene_count, args.narration_lines)
+            path = os.path.join(tmp_dir, f"synthetic_{scene_count}.vmd")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            del text
+
+            # Laufzeit: Datei lesen + parsen, wie in main.py
+            legacy = measure(lambda: parse_file_legacy(path), args.repeat)
+            stream = measure(lambda: parse_file_stream(path), args.repeat)
+            # Spitzen-Speicher inklusive des fertigen AST
+            legacy_peak = peak_memory(lambda: parse_file_legacy(path))
+            stream_peak = peak_memory(lambda: parse_file_stream(path))
+            with open(path, "r", encoding="utf-8") as f:
+                line_count = sum(1 for _ in f)
+            print(f"{scene_count:>8} {line_count:>9} {legacy:>11.4f} {stream:>11.4f} {legacy / stream:>7.2f}x"
+                  f" {legacy_peak / 2**20:>10.1f}MB {stream_peak / 2**20:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/bench_server.py
+#
+# Lasttest des Render-Servers (vmd_interpreter/server.py): startet den Server auf
+# einem freien Loopback-Port und schickt aus mehreren Keep-Alive-Verbindungen
+# gleichzeitig Anfragen. Gemessen werden Anfragen pro Sekunde für
+#   document  ganzes Dokument einer Sprache (nach dem ersten Rendern aus dem Cache)
+#   scene     einzelne Szenen einer Sprache, reihum
+#   304       bedingte Anfragen mit dem zuletzt erhaltenen ETag
+#   edit      nach Änderung einer Szene: neues Dokument, nur die Szene wird neu gerendert
+# und zum Vergleich ein Aufruf von "python -m vmd_interpreter.main" pro Dokument.
+# Client und Server laufen im selben Prozess (Server in einem eigenen Thread).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_server.py [--scenes 500] [--clients 8] [--requests 2000]
+#
+# Exit-Code 1 bei einer unerwarteten Antwort (Status oder fehlendes ETag).
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusSpec, generate_lines
+from harness import measure
+from vmd_interpreter.server import PreviewServer
+
+
+def start_server(root: str, workers: int) -> PreviewServer:
+    """Startet den Server mit eigener Ereignisschleife in einem Hintergrund-Thread."""
+    preview = PreviewServer(root, workers=workers)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(preview.start("127.0.0.1", 0))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return preview
+
+
+async def fetch(reader, writer, target: str, etag=None):
+    lines = [f"GET {target} HTTP/1.1", "Host: localhost"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(head[0].split(" ")[1]), headers.get("etag"), body
+
+
+async def load(port: int, targets, clients: int, requests: int, expected: int, conditional=False) -> float:
+    """Verteilt requests Anfragen (reihum über targets) auf clients Verbindungen; liefert Anfragen/s."""
+    etags = {}
+    if conditional:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for target in targets:
+            etags[target] = (await fetch(reader, writer, target))[1]
+        writer.close()
+    failures = []
+
+    async def client(offset: int):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for index in range(offset, requests, clients):
+            target = targets[index % len(targets)]
+            status, etag, _body = await fetch(reader, writer, target, etags.get(target))
+            if status != expected or not etag:
+                failures.append(f"{target}: {status}")
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(clients)))
+    elapsed = time.perf_counter() - start
+    if failures:
+        print(f"FAIL: {len(failures)} unexpected responses, e.g. {failures[0]}")
+        sys.exit(1)
+    return requests / elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Lasttest des lokalen Render-Servers")
+    arg_parser.add_argument("--scenes", type=int, default=500)
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--clients", type=int, default=8)
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--edits", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "course.vmd")
+        lines = generate_lines(CorpusSpec(scenes=args.scenes, languages=args.languages))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        lang = args.languages[-1]
+        document = f"/render/course.vmd?lang={lang}"
+        scenes = [f"/render/course.vmd?lang={lang}&scene={index}" for index in range(args.scenes)]
+
+        preview = start_server(root, args.workers)
+        port = preview.port
+        print(f"{args.scenes} scenes, {args.clients} clients, {args.requests} requests per phase, "
+              f"{args.workers} render threads")
+
+        first = time.perf_counter()
+        asyncio.run(load(port, [document], 1, 1, 200))
+        print(f"  first document (parse + render): {time.perf_counter() - first:.4f} s")
+        for name, targets, expected, conditional in (("document", [document], 200, False),
+                                                     ("scene", scenes, 200, False),
+                                                     ("304", [document] + scenes, 304, True)):
+            rate = asyncio.run(load(port, targets, args.clients, args.requests, expected, conditional))
+            print(f"  {name:<10} {rate:>10.0f} req/s")
+
+        # Nach jeder Änderung einer Szene ein neues Dokument anfordern
+        scene_line = next(index for index, line in enumerate(lines) if line.startswith("- "))
+
+        def edit(counter=[0]):
+            counter[0] += 1
+            lines[scene_line] = f"- edited {counter[0]}"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            asyncio.run(load(port, [document], 1, 1, 200))
+
+        rate = args.edits / sum(measure(edit, 1) for _ in range(args.edits))
+        print(f"  {'edit':<10} {rate:>10.1f} req/s")
+
+        cli = measure(lambda: subprocess.run([sys.executable, "-m", "vmd_interpreter.main", path, "--no-cache"],
+                                             check=True, stdout=subprocess.DEVNULL), 3)
+        print(f"  {'cli':<10} {1 / cli:>10.1f} req/s  (python -m vmd_interpreter.main, all languages)")
+        print(f"server stats: {preview.stats()}")
+
+
+if __name__ == "__main__":
+    main()
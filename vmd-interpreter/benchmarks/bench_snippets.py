@@ -0,0 +1,83 @@
+# benchmarks/bench_snippets.py
+#
+# Misst das Laden von Code-Snippets: Zerlegen und Hervorheben ohne Cache gegen
+# das Laden aus dem persistenten Snippet-Cache (neuer SnippetStore, wie bei jedem
+# Build-Lauf) und gegen wiederholte Zugriffe innerhalb eines Stores.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_snippets.py [--snippets 200] [--lines 200] [--repeat 3]
+#
+# Exit-Code 1, wenn der persistente Cache nicht schneller ist als neu zu zerlegen.
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure
+from vmd_interpreter.snippets import SnippetStore
+
+SNIPPET_LINES = [
+    "function step{n}(items, limit) {{  // [!label:start{n}]",
+    "    const result = [];  /* {{Zwischenergebnis}} */",
+    "    for (let i = 0; i < items.length && i < limit; i++) {{",
+    "        result.push(`Item ${{items[i]}} #{n}`);",
+    "    }}",
+    "    return result;",
+    "}}",
+]
+
+
+def write_snippets(directory: str, count: int, lines: int) -> list:
+    names = []
+    for index in range(count):
+        name = f"snippet{index}"
+        body = []
+        while len(body) < lines:
+            # Jede Datei mit eigenem Inhalt, sonst greift schon der Speicher-Cache des Stores
+            body.extend(line.format(n=f"{index}_{len(body)}") for line in SNIPPET_LINES)
+        with open(os.path.join(directory, name + ".js"), "w", encoding="utf-8") as f:
+            f.write("\n".join(body[:lines]) + "\n")
+        names.append(name)
+    return names
+
+
+def load_all(snippet_dir: str, cache_dir, names: list):
+    store = SnippetStore(snippet_dir, cache_dir)
+    for name in names:
+        store.get(name)
+    return store
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Snippet-Hervorhebung mit und ohne Cache")
+    arg_parser.add_argument("--snippets", type=int, default=200)
+    arg_parser.add_argument("--lines", type=int, default=200)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snippet_dir = os.path.join(tmp_dir, "snippets")
+        cache_dir = os.path.join(tmp_dir, "cache")
+        os.makedirs(snippet_dir)
+        names = write_snippets(snippet_dir, args.snippets, args.lines)
+
+        cold = measure(lambda: load_all(snippet_dir, None, names), args.repeat)
+        load_all(snippet_dir, cache_dir, names)  # Cache füllen
+        warm = measure(lambda: load_all(snippet_dir, cache_dir, names), args.repeat)
+        store = load_all(snippet_dir, cache_dir, names)
+        reuse = measure(lambda: [store.get(name) for name in names], args.repeat)
+
+    print(f"{args.snippets} snippets x {args.lines} lines")
+    print(f"  highlight (no cache):  {cold:.4f} s")
+    print(f"  persistent cache:      {warm:.4f} s  ({cold / warm:.1f}x)")
+    print(f"  same store (memory):   {reuse:.6f} s")
+    if warm >= cold:
+        print("FAIL: loading from the snippet cache is not faster than highlighting")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
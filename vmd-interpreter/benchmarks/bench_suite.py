@@ -0,0 +1,142 @@
+# benchmarks/bench_suite.py
+#
+# Benchmark-Suite: misst auf synthetischen Kursen (corpus.py) getrennt
+#   parse  - DSLParser.parse aus der Datei
+#   render - DSLRenderer.render bzw. render_languages (mehrere Sprachen)
+#   main   - die komplette Pipeline von vmd_interpreter.main (ohne Szenen-Cache)
+# jeweils Laufzeit, Durchsatz (Elemente pro Sekunde) und Spitzen-Speicher.
+# Die Ergebnisse werden als JSON geschrieben und mit einer Baseline verglichen.
+# Außerdem wird bei jedem Lauf geprüft, dass Parser und Streaming-Rendering mit
+# wachsender Eingabe keinen zusätzlichen Speicher brauchen (bench_memory.check_memory).
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/bench_suite.py --save-baseline          # Baseline auf dieser Maschine anlegen
+#   python benchmarks/bench_suite.py [--threshold 0.2]        # messen und vergleichen
+#
+# Exit-Code 1, wenn eine Phase um mehr als threshold langsamer ist als die Baseline
+# oder die Speicherprüfung fehlschlägt.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_memory import check_memory, measure_memory
+from corpus import CorpusSpec, write_document
+from harness import (DEFAULT_BASELINE, compare_throughput, environment, measure, peak_memory,
+                     read_json, write_json)
+from vmd_interpreter.inline import format_inline
+from vmd_interpreter.main import main as vmd_main
+from vmd_interpreter.parser import DSLParser
+from vmd_interpreter.renderer import DSLRenderer
+
+
+def parse_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return DSLParser(f).parse()
+
+
+def render(ast, languages):
+    # Ohne Vorwissen aus einem früheren Durchlauf messen
+    format_inline.cache_clear()
+    if len(languages) > 1:
+        return DSLRenderer(ast).render_languages(languages)
+    return DSLRenderer(ast).render()
+
+
+def run_main(path: str):
+    format_inline.cache_clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        vmd_main([path, "--no-cache", "--jobs", "1"])
+
+
+def run_phase(func, elements: int, repeat: int) -> dict:
+    seconds = measure(func, repeat)
+    return {
+        "seconds": seconds,
+        "elements_per_second": elements / seconds,
+        "peak_bytes": peak_memory(func),
+    }
+
+
+def run_benchmarks(scene_counts, languages, repeat: int, tmp_dir: str) -> dict:
+    runs = []
+    for scene_count in scene_counts:
+        spec = CorpusSpec(scenes=scene_count, languages=languages)
+        path = os.path.join(tmp_dir, f"synthetic_{scene_count}.vmd")
+        size = write_document(path, spec)
+        ast = parse_file(path)
+        elements = sum(len(scene.elements) for scene in ast.scenes)
+
+        phases = {
+            "parse": run_phase(lambda: parse_file(path), elements, repeat),
+            "render": run_phase(lambda: render(ast, list(languages)), elements, repeat),
+            "main": run_phase(lambda: run_main(path), elements, repeat),
+        }
+        runs.append({"scenes": scene_count, "elements": elements, "bytes": size,
+                     "corpus": spec.describe(), "phases": phases})
+        print_run(runs[-1])
+    return {"environment": environment(), "repeat": repeat, "runs": runs}
+
+
+def print_run(run: dict):
+    print(f"{run['scenes']} scenes, {run['elements']} elements, {run['bytes'] / 2**20:.1f}MB")
+    for phase, values in run["phases"].items():
+        print(f"  {phase:<7} {values['seconds']:>8.4f}s {values['elements_per_second']:>12.0f} elements/s"
+              f" {values['peak_bytes'] / 2**20:>8.1f}MB peak")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark-Suite für Parser, Renderer und CLI")
+    arg_parser.add_argument("--scenes", type=int, nargs="+", default=[1000, 5000])
+    arg_parser.add_argument("--languages", nargs="+", default=["DE", "EN"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--output", default="bench_results.json",
+                            help="JSON-Datei für die Ergebnisse (Standard: bench_results.json)")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                            help=f"Baseline für den Regressionsvergleich (Standard: {DEFAULT_BASELINE})")
+    arg_parser.add_argument("--threshold", type=float, default=0.2,
+                            help="Erlaubter Durchsatzverlust gegenüber der Baseline (Standard: 0.2 = 20%%)")
+    arg_parser.add_argument("--save-baseline", action="store_true",
+                            help="Ergebnisse zusätzlich als neue Baseline speichern")
+    arg_parser.add_argument("--memory-scenes", type=int, nargs="+", default=[1000, 4000, 16000],
+                            help="Kursgrößen für die Speicherprüfung")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = run_benchmarks(args.scenes, args.languages, args.repeat, tmp_dir)
+        memory = {scene_count: measure_memory(scene_count, tmp_dir) for scene_count in args.memory_scenes}
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+
+    problems = check_memory(memory)
+    if problems:
+        print("FAIL: memory grows with input size:")
+        for message in problems:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"Memory stays flat for {', '.join(map(str, sorted(memory)))} scenes")
+
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, skipping regression check (use --save-baseline)")
+        return
+
+    regressions = compare_throughput(results, read_json(args.baseline), args.threshold)
+    if regressions:
+        print(f"FAIL: throughput dropped by more than {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"No regression against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/corpus.py
+#
+# Generator für synthetische Kurse (.vmd) beliebiger Größe. Die Dokumente sind
+# deterministisch und enthalten alle Bausteine echter Kurse: mehrspaltige Slides,
+# Aufzählungen mit [!bulletN]-Markern, Bilder, Code- und Button-Zeilen,
+# Teleprompts mit [!show:...]-Verweisen, Quizze, Videos, Code-Elemente und
+# mehrere Sprachen.
+#
+# Aufruf (aus vmd-interpreter/):
+#   python benchmarks/corpus.py --scenes 5000 --languages DE EN -o /tmp/course.vmd
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import List, Sequence
+
+
+@dataclass
+class CorpusSpec:
+    scenes: int = 1000
+    languages: Sequence[str] = ("EN",)
+    bullets: int = 3            # Aufzählungspunkte pro Slide (bzw. pro Spalte)
+    narration_lines: int = 6    # Zeilen Sprechertext pro Teleprompt
+    column_every: int = 2       # jede n-te Szene hat zweispaltige Slides (0 = nie)
+    quiz_every: int = 5         # jede n-te Szene enthält ein Quiz (0 = nie)
+    video_every: int = 7        # ... ein Video
+    code_every: int = 9         # ... ein Code-Element
+
+    def describe(self) -> dict:
+        return {
+            "scenes": self.scenes,
+            "languages": list(self.languages),
+            "bullets": self.bullets,
+            "narration_lines": self.narration_lines,
+            "column_every": self.column_every,
+            "quiz_every": self.quiz_every,
+            "video_every": self.video_every,
+            "code_every": self.code_every,
+        }
+
+
+def _every(n: int, i: int) -> bool:
+    return n > 0 and i % n == 0
+
+
+def _bullets(count: int, offset: int = 0) -> List[str]:
+    return [f"[!bullet{offset + j}] - Point {offset + j} with **bold**, *italic* and `code` text"
+            for j in range(count)]
+
+
+def _slide_body(spec: CorpusSpec, i: int) -> List[str]:
+    if _every(spec.column_every, i):
+        return (["### Column (width=60)"] + _bullets(spec.bullets)
+                + ["", "### Column (width=40)", '### Image (source="images/figure.png")',
+                   "Caption for the figure & its source"])
+    lines = _bullets(spec.bullets)
+    lines.append("")
+    lines.append(f"Summary line {i} with 50% of the *details*.")
+    if i % 3 == 0:
+        lines.append(f'### Code (snippet="example{i}")')
+    if i % 4 == 0:
+        lines.append(f'### Button (name="more{i}", label="Learn More", action="https://example.com/{i}")')
+    return lines
+
+
+def generate_lines(spec: CorpusSpec) -> List[str]:
+    lines = ['---', 'title = "Synthetic Course"', 'author = "Benchmark"', '---', '']
+    for i in range(spec.scenes):
+        lines.append(f"# Scene: Scene {i}")
+        lines.append("")
+        body = _slide_body(spec, i)
+        for lang in spec.languages:
+            lines.append(f'## Slide (title="Slide {i}", lang="{lang}")')
+            lines.extend(body)
+            lines.append("")
+        if _every(spec.quiz_every, i):
+            lines += [f'## Quiz (name="quiz{i}", title="Check {i}")', "", "### Which answer is right?",
+                      "- Wrong answer", "+ Right answer", "- Another wrong answer", ""]
+        if _every(spec.video_every, i):
+            lines += [f'## Video (source="videos/scene{i}.mp4")', ""]
+        if _every(spec.code_every, i):
+            lines += [f'## Code (snippet="example{i}")', ""]
+        for lang in spec.languages:
+            lines.append(f'## Teleprompt (title="Scene {i}", lang="{lang}")')
+            for j in range(spec.narration_lines):
+                lines.append(f"Narration line {j} for this scene, read by the presenter. "
+                             f"[!show:bullet{j % max(spec.bullets, 1)}]")
+            lines.append("")
+    return lines
+
+
+def generate_document(scene_count: int = 1000, narration_lines: int = 6, **options) -> str:
+    """Synthetischer Kurs als String; options wie die Felder von CorpusSpec."""
+    spec = CorpusSpec(scenes=scene_count, narration_lines=narration_lines, **options)
+    return "\n".join(generate_lines(spec))
+
+
+def write_document(path: str, spec: CorpusSpec) -> int:
+    """Schreibt den Kurs nach path und liefert die Größe in Bytes."""
+    text = "\n".join(generate_lines(spec))
+    data = text.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Erzeugt einen synthetischen .vmd-Kurs")
+    arg_parser.add_argument("--scenes", type=int, default=1000)
+    arg_parser.add_argument("--languages", nargs="+", default=["EN"])
+    arg_parser.add_argument("--bullets", type=int, default=3)
+    arg_parser.add_argument("--narration-lines", type=int, default=6)
+    arg_parser.add_argument("--column-every", type=int, default=2)
+    arg_parser.add_argument("--quiz-every", type=int, default=5)
+    arg_parser.add_argument("--video-every", type=int, default=7)
+    arg_parser.add_argument("--code-every", type=int, default=9)
+    arg_parser.add_argument("-o", "--output", help="Zieldatei (Standard: stdout)")
+    args = arg_parser.parse_args()
+
+    spec = CorpusSpec(scenes=args.scenes, languages=args.languages, bullets=args.bullets,
+                      narration_lines=args.narration_lines, column_every=args.column_every,
+                      quiz_every=args.quiz_every, video_every=args.video_every, code_every=args.code_every)
+    if args.output:
+        size = write_document(args.output, spec)
+        print(f"{args.output}: {spec.scenes} scenes, {size / 2**20:.1f}MB")
+    else:
+        sys.stdout.write("\n".join(generate_lines(spec)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/harness.py
+#
+# Gemeinsame Hilfsfunktionen der Benchmarks: Zeitmessung, Spitzen-Speicher,
+# JSON-Ergebnisse und der Vergleich mit einer gespeicherten Baseline.
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+# Damit die Skripte direkt aus vmd-interpreter/ heraus laufen
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Beste Laufzeit von func() in Sekunden aus repeat Durchläufen."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func: Callable) -> int:
+    """Spitzen-Speicher (Bytes, tracemalloc) während func()."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def traced_memory(func: Callable) -> Tuple[Any, int, int]:
+    """(Ergebnis, danach noch belegte Bytes, Spitzen-Speicher) von func() laut tracemalloc."""
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        return result, current, peak
+    finally:
+        tracemalloc.stop()
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def write_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_throughput(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Vergleicht den Durchsatz (Elemente pro Sekunde) aller Phasen mit der Baseline.
+    Liefert eine Meldung je Phase, die um mehr als threshold (z.B. 0.2 = 20 %)
+    langsamer geworden ist. Messungen ohne Gegenstück in der Baseline werden übersprungen.
+    """
+    def key(run, phase):
+        return run["scenes"], tuple(run["corpus"]["languages"]), phase
+
+    reference = {key(run, phase): values["elements_per_second"]
+                 for run in baseline.get("runs", [])
+                 for phase, values in run["phases"].items()}
+    regressions = []
+    for run in results["runs"]:
+        for phase, values in run["phases"].items():
+            expected = reference.get(key(run, phase))
+            if not expected:
+                continue
+            ratio = values["elements_per_second"] / expected
+            if ratio < 1 - threshold:
+                regressions.append(f"{phase} @ {run['scenes']} scenes: "
+                                   f"{values['elements_per_second']:.0f} elements/s, "
+                                   f"baseline {expected:.0f} ({(1 - ratio) * 100:.0f}% slower)")
+    return regressions
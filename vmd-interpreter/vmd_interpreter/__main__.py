@@ -0,0 +1,5 @@
+# vmd_interpreter/__main__.py
+
+from vmd_interpreter.main import main
+
+main()
@@ -0,0 +1,205 @@
+# vmd_interpreter/assets.py
+
+import hashlib
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .dsl_ast import AST, ElementKind, Scene, SourceSpan
+from .symbols import content_span
+
+# Quelle einer Bildzeile im Slide-Inhalt: ### Image (source="bild.png")
+IMAGE_SOURCE_PATTERN = re.compile(r'source\s*=\s*[\'"](.*?)[\'"]')
+MEDIA_KINDS = (ElementKind.VIDEO, ElementKind.SCREENCAST)
+
+# Lesegröße beim Hashen
+HASH_CHUNK_SIZE = 1 << 20
+# Stat, Hashen und Kopieren warten vor allem auf das Dateisystem; mehr Threads als CPUs lohnen sich
+DEFAULT_THREADS = min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclass
+class Asset:
+    """Eine referenzierte Bild- oder Mediendatei und alle Stellen, die sie verwenden."""
+    source: str                          # Pfad wie in der .vmd-Datei angegeben
+    spans: List[SourceSpan] = field(default_factory=list)
+    path: str = ""                       # aufgelöster Pfad im Dateisystem
+    size: int = -1
+    digest: Optional[str] = None         # sha256 des Inhalts (hex)
+    error: Optional[str] = None          # z.B. "not found"
+    staged: Optional[str] = None         # Pfad in der Ausgabe (nach stage_assets)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class StageResult:
+    paths: Dict[str, str] = field(default_factory=dict)   # Quellpfad -> Pfad in der Ausgabe
+    copied: int = 0
+    unchanged: int = 0
+
+
+def is_remote(source: str) -> bool:
+    """URLs (http://, https://, ...) werden nicht als Dateien behandelt."""
+    return "://" in source
+
+
+def _scene_sources(scene: Scene) -> Iterator[Tuple[str, SourceSpan]]:
+    """(Quelle, Fundstelle) aller Bild- und Medienquellen einer Szene; URLs werden übersprungen."""
+    for element in scene.elements:
+        kind = element.kind
+        if kind is ElementKind.SLIDE:
+            content = element.content
+            if "Image" not in content:
+                continue
+            offset = 0
+            for line in content.split("\n"):
+                stripped = line.lstrip()
+                # wie render_slide: Zeilen mit "###" und "Image", Buttons ausgenommen
+                if stripped.startswith("###") and "Image" in line and "Button" not in line:
+                    match = IMAGE_SOURCE_PATTERN.search(line)
+                    if match and not is_remote(match.group(1)):
+                        yield match.group(1), content_span(element, offset + match.start(1), len(match.group(1)))
+                offset += len(line) + 1
+        elif kind in MEDIA_KINDS:
+            source = element.parameters.get("source", "")
+            if source and not is_remote(source):
+                yield source, element.span
+
+
+def scene_assets(scene: Scene) -> List[str]:
+    """Alle Bild- und Medienquellen, die eine Szene verwendet."""
+    return [source for source, _span in _scene_sources(scene)]
+
+
+def collect_assets(ast: AST) -> Dict[str, Asset]:
+    """
+    Sammelt alle Bild- (### Image in Slides) und Medienquellen (Video, Screencast)
+    in der Reihenfolge ihres ersten Auftretens; URLs werden übersprungen.
+    """
+    assets: Dict[str, Asset] = {}
+    for scene in ast.scenes:
+        for source, span in _scene_sources(scene):
+            asset = assets.get(source)
+            if asset is None:
+                asset = assets[source] = Asset(source)
+            asset.spans.append(span)
+    return assets
+
+
+def _inspect(asset: Asset, hash_files: bool):
+    try:
+        stat = os.stat(asset.path)
+    except OSError:
+        asset.error = "not found"
+        return
+    if not os.path.isfile(asset.path):
+        asset.error = "not a file"
+        return
+    asset.size = stat.st_size
+    if not hash_files:
+        return
+    digest = hashlib.sha256()
+    try:
+        with open(asset.path, "rb") as f:
+            while True:
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)  # gibt den GIL bei großen Blöcken frei
+    except OSError as e:
+        asset.error = f"unreadable ({e.strerror})"
+        return
+    asset.digest = digest.hexdigest()
+
+
+def resolve_assets(assets: Dict[str, Asset], base_dir: str, hash_files: bool = True,
+                   threads: int = DEFAULT_THREADS) -> List[Asset]:
+    """
+    Löst die Pfade relativ zu base_dir (Verzeichnis der .vmd-Datei) auf und prüft bzw.
+    hasht alle Dateien parallel in einem Thread-Pool. Liefert die Assets in ihrer
+    Reihenfolge; fehlende oder unlesbare Dateien haben ein gesetztes error.
+    """
+    items = list(assets.values())
+    for asset in items:
+        asset.path = os.path.normpath(os.path.join(base_dir, os.path.expanduser(asset.source)))
+    if len(items) <= 1 or threads <= 1:
+        for asset in items:
+            _inspect(asset, hash_files)
+    else:
+        # Erst hier importiert: renderer.py braucht nur scene_assets (Startzeit der CLI)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(threads, len(items))) as executor:
+            list(executor.map(lambda asset: _inspect(asset, hash_files), items))
+    return items
+
+
+def missing_assets(assets: List[Asset]) -> List[Asset]:
+    return [asset for asset in assets if not asset.ok]
+
+
+def format_missing(assets: List[Asset], vmd_file: str) -> str:
+    """Alle fehlenden Assets mit sämtlichen Fundstellen, eine Zeile je Fundstelle."""
+    missing = missing_assets(assets)
+    lines = [f"Error: {len(missing)} missing asset{'s' if len(missing) != 1 else ''}:"]
+    for asset in missing:
+        for span in asset.spans:
+            lines.append(f"  {vmd_file}:{span}: {asset.source} ({asset.error})")
+    return "\n".join(lines)
+
+
+def staged_name(asset: Asset) -> str:
+    """Inhaltsadressierter Dateiname: sha256 des Inhalts plus ursprüngliche Endung."""
+    return asset.digest + os.path.splitext(asset.path)[1].lower()
+
+
+def _stage(asset: Asset, target: str) -> bool:
+    # Gleicher Name heißt gleicher Inhalt: vorhandene Dateien werden nicht angefasst
+    try:
+        if os.path.getsize(target) == asset.size:
+            return False
+    except OSError:
+        pass
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        shutil.copyfile(asset.path, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def stage_assets(assets: List[Asset], asset_dir: str, output_dir: str,
+                 threads: int = DEFAULT_THREADS) -> StageResult:
+    """
+    Kopiert die (gehashten) Assets nach asset_dir/<sha256><Endung>; bereits vorhandene
+    Dateien werden übersprungen. Liefert die Zuordnung Quellpfad -> Pfad relativ zu
+    output_dir (dem Verzeichnis der .tex-Ausgabe), mit "/" als Trennzeichen.
+    """
+    result = StageResult()
+    os.makedirs(asset_dir, exist_ok=True)
+    targets: Dict[str, Asset] = {}
+    for asset in assets:
+        target = os.path.join(asset_dir, staged_name(asset))
+        asset.staged = os.path.relpath(target, output_dir or ".").replace(os.sep, "/")
+        result.paths[asset.source] = asset.staged
+        targets.setdefault(target, asset)  # gleicher Inhalt unter mehreren Namen: einmal kopieren
+
+    items = list(targets.items())
+    if len(items) <= 1 or threads <= 1:
+        copied = [_stage(asset, target) for target, asset in items]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(threads, len(items))) as executor:
+            copied = list(executor.map(lambda item: _stage(item[1], item[0]), items))
+    result.copied = sum(copied)
+    result.unchanged = len(copied) - result.copied
+    return result
@@ -0,0 +1,179 @@
+# vmd_interpreter/ast_cache.py
+
+import gc
+import hashlib
+import marshal
+import os
+from typing import Optional, Tuple
+
+from .cache import AST_DIR, default_cache_dir, record_size
+from .dsl_ast import AST, Element, Header, Parameters, Scene, SourceSpan
+from .metrics import Metrics, measure_phase
+from .parser import PARSER_VERSION, DSLParser
+
+# Dateikennung und Formatversion; muss erhöht werden, sobald sich der AST ändert.
+# Zusätzlich steht parser.PARSER_VERSION im Kopf, damit ein geänderter Parser keine
+# alten ASTs mehr liefert.
+MAGIC = b"VMDAST"
+FORMAT_VERSION = 1
+HEADER = MAGIC + bytes([FORMAT_VERSION, PARSER_VERSION, marshal.version])
+
+# (Größe, mtime in ns, sha256) der Quelldatei
+SourceKey = Tuple[int, int, bytes]
+
+
+class ASTCacheError(ValueError):
+    """Cache-Datei ist unlesbar, hat ein anderes Format oder passt nicht zur Quelle."""
+
+
+def _span(span: Optional[SourceSpan]):
+    return tuple(span) if span is not None else None
+
+
+def _encode(ast: AST):
+    header = ast.header
+    return (
+        (header.title, header.author, header.style, _span(header.span)),
+        [(scene.title, _span(scene.span),
+          [(element.type, tuple(element.parameters), tuple(element.parameters.values()),
+            element.content, _span(element.span))
+           for element in scene.elements])
+         for scene in ast.scenes],
+    )
+
+
+def _decode(payload) -> AST:
+    # Der AST enthält keine Zyklen; ohne die zyklische Speicherbereinigung, die bei
+    # hunderttausenden neuen Objekten sonst ständig anläuft, ist das Laden gut doppelt so schnell.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build(payload)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _build(payload) -> AST:
+    (title, author, style, span), scenes = payload
+    return AST(
+        header=Header(title, author, style, SourceSpan(*span) if span else None),
+        # marshal erhält internierte Strings; die Parameter-Tupel werden direkt übernommen
+        scenes=[Scene(scene_title, [Element(element_type, Parameters.from_tuples(keys, values), content,
+                                            SourceSpan(*element_span) if element_span else None)
+                                    for element_type, keys, values, content, element_span in elements],
+                      SourceSpan(*scene_span) if scene_span else None)
+                for scene_title, scene_span, elements in scenes],
+    )
+
+
+def dump_ast(ast: AST, path: str, source_key: Optional[SourceKey] = None):
+    """
+    Speichert den AST binär (marshal) in path. source_key verknüpft die Datei mit
+    einer Quelldatei (siehe source_key()); load_ast kann sie dann darauf prüfen.
+    """
+    data = HEADER + marshal.dumps((source_key, _encode(ast)))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read(path: str):
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(HEADER):
+        raise ASTCacheError(f"{path}: not an AST cache file of this version")
+    try:
+        return marshal.loads(data[len(HEADER):])
+    except (EOFError, ValueError, TypeError) as e:
+        raise ASTCacheError(f"{path}: corrupt AST cache file") from e
+
+
+def load_ast(path: str, source_key: Optional[SourceKey] = None) -> AST:
+    """
+    Lädt einen mit dump_ast gespeicherten AST. Mit source_key muss die Datei zu
+    dieser Quelle gehören, sonst wird ASTCacheError ausgelöst.
+    """
+    stored_key, payload = _read(path)
+    if source_key is not None and (stored_key is None or tuple(stored_key) != tuple(source_key)):
+        raise ASTCacheError(f"{path}: source has changed")
+    return _decode(payload)
+
+
+def source_key(vmd_file: str, content: Optional[bytes] = None) -> SourceKey:
+    stat = os.stat(vmd_file)
+    if content is None:
+        with open(vmd_file, "rb") as f:
+            content = f.read()
+    return stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).digest()
+
+
+def ast_cache_path(vmd_file: str, cache_dir: Optional[str] = None) -> str:
+    """Cache-Datei einer Quelle: <cache_dir>/ast/<Hash des absoluten Pfads>.ast"""
+    name = hashlib.sha1(os.path.abspath(vmd_file).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir or default_cache_dir(), AST_DIR, name + ".ast")
+
+
+def parse_cached(vmd_file: str, cache_dir: Optional[str] = None, metrics: Optional[Metrics] = None) -> AST:
+    """
+    Wie DSLParser(open(vmd_file)).parse(), verwendet aber einen gespeicherten AST,
+    solange sich die Quelle nicht geändert hat. Größe und mtime werden zuerst
+    verglichen; weicht nur die mtime ab, entscheidet der Inhalts-Hash.
+    Lesefehler der Quelle werden wie beim Parsen als OSError/UnicodeDecodeError gemeldet.
+    """
+    cache_path = ast_cache_path(vmd_file, cache_dir)
+    stat = os.stat(vmd_file)
+    content = None
+    with measure_phase(metrics, "load"):
+        try:
+            stored_key, payload = _read(cache_path)
+        except (OSError, ASTCacheError):
+            stored_key = None
+        if stored_key is not None and stored_key[0] == stat.st_size:
+            if stored_key[1] != stat.st_mtime_ns:
+                with open(vmd_file, "rb") as f:
+                    content = f.read()
+            if content is None or hashlib.sha256(content).digest() == stored_key[2]:
+                ast = _decode(payload)
+                if content is not None:
+                    # Nur die mtime hat sich geändert (z.B. touch): Schlüssel auffrischen
+                    _store(ast, cache_path, (stat.st_size, stat.st_mtime_ns, stored_key[2]))
+                else:
+                    _touch(cache_path)
+                if metrics is not None:
+                    metrics.count_ast(ast)
+                return ast
+
+    with measure_phase(metrics, "read"):
+        if content is None:
+            with open(vmd_file, "rb") as f:
+                content = f.read()
+        text = content.decode("utf-8")
+    ast = DSLParser(text, metrics=metrics).parse()
+    _store(ast, cache_path, (stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).digest()))
+    return ast
+
+
+def _touch(cache_path: str):
+    # Zugriffszeit für die LRU-Verdrängung (RenderCache.evict) aktualisieren
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+
+def _store(ast: AST, cache_path: str, key: SourceKey):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        dump_ast(ast, cache_path, key)
+        record_size(os.path.dirname(os.path.dirname(cache_path)), os.path.getsize(cache_path))
+    except OSError:
+        pass  # Ein nicht beschreibbarer Cache ist kein Fehler, nur langsamer.
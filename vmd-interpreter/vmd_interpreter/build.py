@@ -0,0 +1,356 @@
+# vmd_interpreter/build.py
+
+import glob
+import os
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from .assets import StageResult, collect_assets, format_missing, missing_assets, resolve_assets, stage_assets
+from .ast_cache import parse_cached
+from .cache import RenderCache
+from .dsl_ast import AST, ElementKind
+from .metrics import Metrics, measure_phase
+from .parser import DSLParser
+from .renderer import DSLRenderer
+from .snippets import SnippetStore, snippet_problems
+
+
+class BuildError(Exception):
+    """Fehler beim Übersetzen einer einzelnen .vmd-Datei."""
+
+
+@dataclass
+class BuildResult:
+    source: str
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    metrics: Optional[Metrics] = None
+    # Nur bei geteilter Ausgabe (--split)
+    manifest: Optional[str] = None
+    fragments: int = 0
+    fragments_changed: int = 0
+    # Nur mit asset_dir (--assets)
+    assets: Optional[StageResult] = None
+    # Nur mit snippet_dir (--snippets): neu hervorgehobene bzw. aus dem Cache geladene Snippets
+    snippets_highlighted: int = 0
+    snippets_cached: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_languages(ast: AST, vmd_file: str = "<input>") -> Set[str]:
+    """Sammelt die Sprachen aller Slides; jedes Slide braucht ein lang-Attribut."""
+    languages = set()
+    for scene in ast.scenes:
+        for element in scene.elements:
+            if element.kind is ElementKind.SLIDE:
+                lang = element.parameters.get("lang")
+                if not lang:
+                    raise BuildError(f"Error: Slide missing 'lang' attribute! ({vmd_file}:{element.span})")
+                languages.add(lang)
+    return languages
+
+
+# Puffergröße der Ausgabedateien; der Renderer schreibt blockweise hinein.
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def output_path(vmd_file: str, lang: Optional[str] = None) -> str:
+    stem = os.path.splitext(vmd_file)[0]
+    return stem + (f"_{lang}_output.tex" if lang else "_output.tex")
+
+
+def html_path(vmd_file: str) -> str:
+    return os.path.splitext(vmd_file)[0] + ".html"
+
+
+@contextmanager
+def open_atomic(path: str) -> Iterator[TextIO]:
+    """
+    Öffnet eine gepufferte Ausgabedatei, die erst nach erfolgreichem Schreiben
+    (über eine temporäre Datei und os.replace) an ihren Platz gelangt.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def make_renderer(ast: AST, target_lang: Optional[str] = None, cache: Optional[RenderCache] = None,
+                  metrics: Optional[Metrics] = None, render_jobs: int = 1,
+                  assets: Optional[Dict[str, str]] = None,
+                  snippets: Optional[SnippetStore] = None) -> DSLRenderer:
+    """DSLRenderer bzw. mit render_jobs > 1 ein ParallelRenderer mit so vielen Prozessen."""
+    if render_jobs > 1:
+        # Prozess-Pool und HTML-Backend nur bei Bedarf importieren (Startzeit der CLI)
+        from .parallel import ParallelRenderer
+        return ParallelRenderer(ast, target_lang=target_lang, cache=cache, metrics=metrics, assets=assets,
+                                snippets=snippets, jobs=render_jobs)
+    return DSLRenderer(ast, target_lang=target_lang, cache=cache, metrics=metrics, assets=assets,
+                       snippets=snippets)
+
+
+def prepare_assets(vmd_file: str, ast: AST, asset_dir: str, metrics: Optional[Metrics] = None) -> StageResult:
+    """
+    Prüft alle Bild- und Medienquellen der Datei und stellt sie inhaltsadressiert in
+    asset_dir bereit (relativ zum Verzeichnis der Quelle, falls nicht absolut).
+    Fehlende Dateien werden gesammelt vor dem Rendern als ein BuildError gemeldet.
+    """
+    base_dir = os.path.dirname(vmd_file)
+    with measure_phase(metrics, "assets"):
+        assets = resolve_assets(collect_assets(ast), base_dir)
+        if missing_assets(assets):
+            raise BuildError(format_missing(assets, vmd_file))
+        try:
+            return stage_assets(assets, os.path.join(base_dir, asset_dir), base_dir)
+        except OSError as e:
+            raise BuildError(f"Error staging assets: {e}") from e
+
+
+def prepare_snippets(vmd_file: str, ast: AST, snippet_dir: str, cache: Optional[RenderCache] = None,
+                     metrics: Optional[Metrics] = None) -> SnippetStore:
+    """
+    Lädt alle Snippets der Datei aus snippet_dir (relativ zum Verzeichnis der Quelle,
+    falls nicht absolut); Hervorhebungen werden im Verzeichnis von cache abgelegt.
+    Fehlende Snippets und unbekannte Zeilenmarken werden gesammelt vor dem Rendern
+    als ein BuildError gemeldet.
+    """
+    store = SnippetStore(os.path.join(os.path.dirname(vmd_file), snippet_dir),
+                         cache.cache_dir if cache is not None else None)
+    with measure_phase(metrics, "snippets"):
+        problems = snippet_problems(ast, store)
+    if problems:
+        lines = [f"Error: {len(problems)} snippet problem{'s' if len(problems) != 1 else ''}:"]
+        lines.extend(f"  {vmd_file}:{problem}" for problem in problems)
+        raise BuildError("\n".join(lines))
+    return store
+
+
+def write_html(vmd_file: str, ast: AST, assets: Optional[Dict[str, str]] = None,
+               snippets: Optional[SnippetStore] = None, metrics: Optional[Metrics] = None) -> str:
+    """Schreibt die HTML-Seite (alle Sprachen) neben die Quelle und liefert ihren Pfad."""
+    path = html_path(vmd_file)
+    with measure_phase(metrics, "html"):
+        try:
+            with open_atomic(path) as sink:
+                from .html_renderer import HTMLRenderer
+                HTMLRenderer(ast, assets=assets, snippets=snippets).render_to(sink)
+        except OSError as e:
+            raise BuildError(f"Error writing file: {e}") from e
+    if metrics is not None:
+        metrics.add_output(path)
+    return path
+
+
+def read_ast(vmd_file: str, metrics: Optional[Metrics] = None, cache: Optional[RenderCache] = None) -> AST:
+    """
+    Liest und parst eine .vmd-Datei; Lesefehler werden als BuildError gemeldet.
+    Mit cache wird ein gespeicherter AST aus dessen Verzeichnis wiederverwendet.
+    """
+    if metrics is not None:
+        metrics.source = vmd_file
+        metrics.files += 1
+    try:
+        if cache is not None:
+            return parse_cached(vmd_file, cache.cache_dir, metrics)
+        with open(vmd_file, "r", encoding="utf-8") as f:
+            if metrics is None:
+                # Parsen des DSL-Codes direkt aus der Datei (ein Durchlauf, ohne Kopie im Speicher)
+                ast = DSLParser(f).parse()
+            else:
+                # Beim Messen erst lesen, dann parsen, damit beide Phasen getrennt erscheinen
+                with metrics.phase("read"):
+                    text = f.read()
+                ast = DSLParser(text, metrics=metrics).parse()
+    except (OSError, UnicodeDecodeError) as e:
+        raise BuildError(f"Error reading file: {e}") from e
+    return ast
+
+
+def compile_file(vmd_file: str, cache: Optional[RenderCache] = None,
+                 metrics: Optional[Metrics] = None, render_jobs: int = 1,
+                 asset_dir: Optional[str] = None, snippet_dir: Optional[str] = None,
+                 html: bool = False, result: Optional[BuildResult] = None) -> List[str]:
+    """
+    Parst und rendert eine .vmd-Datei und schreibt die LaTeX-Ausgabe(n) neben die Quelle.
+    Liefert die geschriebenen Pfade; Fehler werden als BuildError gemeldet.
+    Mit metrics werden die Phasen read, parse, validate, render und write gemessen.
+    render_jobs > 1 rendert die Szenen parallel (siehe parallel.ParallelRenderer).
+    asset_dir: Bilder und Medien dorthin kopieren und ihre Pfade umschreiben (siehe
+    prepare_assets); das Ergebnis steht danach in result.assets.
+    snippet_dir: Code-Snippets von dort einsetzen (siehe prepare_snippets).
+    html: zusätzlich eine HTML-Seite aus demselben AST schreiben (siehe write_html).
+    """
+    ast = read_ast(vmd_file, metrics, cache)
+
+    # Überprüfe, ob alle Slide-Elemente ein gültiges lang-Attribut haben und sammle die Sprachen.
+    with measure_phase(metrics, "validate"):
+        languages = collect_languages(ast, vmd_file)
+    assets = None
+    if asset_dir is not None:
+        staged = prepare_assets(vmd_file, ast, asset_dir, metrics)
+        assets = staged.paths
+        if result is not None:
+            result.assets = staged
+    snippets = None
+    if snippet_dir is not None:
+        snippets = prepare_snippets(vmd_file, ast, snippet_dir, cache, metrics)
+
+    # Die Ausgabe wird blockweise direkt in die Dateien gestreamt.
+    try:
+        if len(languages) > 1:
+            # Mehrsprachigkeit: Ein Durchlauf über den AST erzeugt alle Sprachen gleichzeitig.
+            paths = {lang: output_path(vmd_file, lang) for lang in sorted(languages)}
+            with ExitStack() as stack:
+                sinks = {lang: stack.enter_context(open_atomic(path)) for lang, path in paths.items()}
+                make_renderer(ast, None, cache, metrics, render_jobs, assets, snippets).render_languages_to(sinks)
+            written = list(paths.values())
+        else:
+            # Nur eine Sprache: Ein einzelner Output.
+            path = output_path(vmd_file)
+            with open_atomic(path) as sink:
+                make_renderer(ast, None, cache, metrics, render_jobs, assets, snippets).render_to(sink)
+            written = [path]
+    except OSError as e:
+        raise BuildError(f"Error writing file: {e}") from e
+    if snippets is not None and result is not None:
+        result.snippets_highlighted = snippets.misses
+        result.snippets_cached = snippets.hits
+    if metrics is not None:
+        for path in written:
+            metrics.add_output(path)
+    if html:
+        written.append(write_html(vmd_file, ast, assets, snippets, metrics))
+    return written
+
+
+def build_file(vmd_file: str, cache_dir: Optional[str] = None, use_cache: bool = True,
+               collect_metrics: bool = False, split: bool = False,
+               include_changed_only: bool = False, render_jobs: int = 1,
+               asset_dir: Optional[str] = None, snippet_dir: Optional[str] = None,
+               html: bool = False) -> BuildResult:
+    """
+    Wie compile_file, meldet Fehler aber im Ergebnis statt als Exception (für Batch-Läufe).
+    split: geteilte Ausgabe mit einem Fragment je Szene (siehe split.compile_split).
+    """
+    result = BuildResult(source=vmd_file, metrics=Metrics() if collect_metrics else None)
+    cache = None
+    if use_cache:
+        try:
+            cache = RenderCache(cache_dir)
+        except OSError:
+            cache = None
+    try:
+        if split:
+            split_file(vmd_file, cache, result, include_changed_only, render_jobs, asset_dir, snippet_dir, html)
+        else:
+            result.outputs = compile_file(vmd_file, cache, result.metrics, render_jobs, asset_dir, snippet_dir,
+                                          html, result)
+    except BuildError as e:
+        result.error = str(e)
+    except Exception as e:
+        # Ein unerwarteter Fehler in einer Datei darf den Batch nicht abbrechen.
+        result.error = f"{type(e).__name__}: {e}"
+    if cache is not None:
+        result.cache_hits = cache.hits
+        result.cache_misses = cache.misses
+    return result
+
+
+def split_file(vmd_file: str, cache: Optional[RenderCache], result: BuildResult,
+               include_changed_only: bool = False, render_jobs: int = 1, asset_dir: Optional[str] = None,
+               snippet_dir: Optional[str] = None, html: bool = False):
+    # split baut auf diesem Modul auf und wird daher erst hier importiert
+    from .split import compile_split
+
+    ast = read_ast(vmd_file, result.metrics, cache)
+    with measure_phase(result.metrics, "validate"):
+        languages = collect_languages(ast, vmd_file)
+    if asset_dir is not None:
+        result.assets = prepare_assets(vmd_file, ast, asset_dir, result.metrics)
+    snippets = None
+    if snippet_dir is not None:
+        snippets = prepare_snippets(vmd_file, ast, snippet_dir, cache, result.metrics)
+    split_result = compile_split(vmd_file, ast, sorted(languages) if len(languages) > 1 else [],
+                                 cache, result.metrics, include_changed_only, render_jobs,
+                                 result.assets.paths if result.assets else None, snippets)
+    if snippets is not None:
+        result.snippets_highlighted = snippets.misses
+        result.snippets_cached = snippets.hits
+    # Nur tatsächlich neu geschriebene Master melden
+    result.outputs = [master for master in split_result.masters if master in split_result.written]
+    if html:
+        result.outputs.append(write_html(vmd_file, ast, result.assets.paths if result.assets else None,
+                                         snippets, result.metrics))
+    result.manifest = split_result.manifest
+    result.fragments = split_result.fragments
+    result.fragments_changed = split_result.changed
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    Löst Dateien, Verzeichnisse (rekursiv alle *.vmd) und Glob-Muster zu einer
+    sortierten Liste eindeutiger .vmd-Dateien auf.
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(glob.glob(os.path.join(pattern, "**", "*.vmd"), recursive=True))
+        elif glob.has_magic(pattern):
+            files.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            files.append(pattern)
+    return sorted(set(os.path.normpath(path) for path in files))
+
+
+def build_batch(vmd_files: List[str], jobs: Optional[int] = None,
+                cache_dir: Optional[str] = None, use_cache: bool = True,
+                collect_metrics: bool = False, split: bool = False,
+                include_changed_only: bool = False, render_jobs: int = 1,
+                asset_dir: Optional[str] = None, snippet_dir: Optional[str] = None,
+                html: bool = False) -> List[BuildResult]:
+    """
+    Übersetzt viele Dateien in einem Prozess-Pool (jobs=1: im aktuellen Prozess).
+    Die Ergebnisse haben dieselbe Reihenfolge wie vmd_files.
+    render_jobs > 1 rendert zusätzlich die Szenen jeder Datei parallel.
+    asset_dir: Bilder und Medien jeder Datei bereitstellen (siehe prepare_assets).
+    snippet_dir: Code-Snippets einsetzen (siehe prepare_snippets).
+    html: zusätzlich je Datei eine HTML-Seite schreiben.
+    """
+    if jobs == 1 or len(vmd_files) <= 1:
+        results = [build_file(path, cache_dir, use_cache, collect_metrics, split, include_changed_only,
+                              render_jobs, asset_dir, snippet_dir, html)
+                   for path in vmd_files]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(build_file, path, cache_dir, use_cache, collect_metrics,
+                                       split, include_changed_only, render_jobs, asset_dir, snippet_dir,
+                                       html)
+                       for path in vmd_files]
+            results = []
+            for path, future in zip(vmd_files, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # z.B. ein abgestürzter Worker-Prozess
+                    results.append(BuildResult(source=path, error=f"{type(e).__name__}: {e}"))
+    if use_cache:
+        # Verdrängung einmal am Ende statt in jedem Worker
+        try:
+            RenderCache(cache_dir).close()
+        except OSError:
+            pass
+    return results
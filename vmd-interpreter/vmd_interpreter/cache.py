@@ -0,0 +1,232 @@
+# vmd_interpreter/cache.py
+
+import hashlib
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from .dsl_ast import Scene
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Aufbau des Cache-Verzeichnisses; evict entfernt nur Dateien genau dieser Form:
+#   <xx>/<sha256>.tex             gerenderte Szenen
+#   ast/<sha1>.ast                gespeicherte ASTs (siehe ast_cache.py)
+#   snippets/<xx>/<sha256>.json   hervorgehobene Snippets (siehe snippets.py)
+#   CACHEDIR.TAG                  Markierung als Cache (https://bford.info/cachedir/)
+#   size                          Größenbilanz (siehe record_size)
+PREFIX_DIR_PATTERN = re.compile(r"[0-9a-f]{2}\Z")
+SCENE_FILE_PATTERN = re.compile(r"[0-9a-f]{64}\.tex\Z")
+AST_FILE_PATTERN = re.compile(r"[0-9a-f]{40}\.ast\Z")
+SNIPPET_FILE_PATTERN = re.compile(r"[0-9a-f]{64}\.json\Z")
+AST_DIR = "ast"
+SNIPPET_DIR = "snippets"
+SIZE_FILE = "size"
+CACHE_TAG = "CACHEDIR.TAG"
+CACHE_TAG_CONTENT = ("Signature: 8a477f597d28d172789f06886806bc55\n"
+                     "# This file marks the scene cache of vmd-interpreter.\n")
+
+
+def default_cache_dir() -> str:
+    """Standard-Cache-Verzeichnis (XDG_CACHE_HOME bzw. ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vmd-interpreter")
+
+
+def record_size(cache_dir: str, nbytes: int):
+    """
+    Vermerkt nbytes neu geschriebene Bytes in der Größenbilanz des Caches. Jeder Eintrag
+    ist eine angehängte Zeile (O_APPEND), so dass parallele Prozesse sich nicht
+    überschreiben. Ohne Bilanzdatei (noch nie gezählt) bleibt alles beim Alten: dann
+    zählt die nächste Verdrängung ohnehin nach.
+    """
+    try:
+        fd = os.open(os.path.join(cache_dir, SIZE_FILE), os.O_WRONLY | os.O_APPEND)
+    except OSError:
+        return
+    try:
+        os.write(fd, b"%d\n" % nbytes)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def scene_source(scene: Scene) -> str:
+    """
+    Quelltext einer Szene in kanonischer Form (Titel, Elementköpfe und Inhalte).
+    Alles, was das Rendering einer Szene beeinflusst, ist darin enthalten.
+    """
+    parts = [f"# Scene: {scene.title}"]
+    for element in scene.elements:
+        params = ", ".join(f'{k}="{v}"' for k, v in element.parameters.items())
+        parts.append(f"## {element.type} ({params})")
+        parts.append(element.content)
+    return "\n".join(parts)
+
+
+class RenderCache:
+    """
+    Festplatten-Cache für gerenderte Szenen.
+
+    Ein Eintrag ist über den Hash aus Szenen-Quelltext, Zielsprache und
+    Renderer-Version adressiert und enthält die von DSLRenderer.render_scene
+    erzeugten Zeilen. Überschreitet das Cache-Verzeichnis (samt gespeicherter ASTs
+    und Snippets) max_bytes, werden beim Schließen die am längsten nicht benutzten Einträge
+    entfernt.
+
+    Verdrängt wird nur in einem als Cache markierten Verzeichnis (CACHEDIR.TAG). Die
+    Markierung wird nur in einem leeren Verzeichnis oder einem, das nichts als
+    Cache-Einträge enthält, angelegt; zeigt cache_dir z.B. auf ein Projektverzeichnis,
+    wird dort zwar zwischengespeichert, aber nie etwas gelöscht.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.managed = self._claim()
+
+    def _claim(self) -> bool:
+        """Prüft bzw. setzt die Cache-Markierung; False heißt: nie verdrängen."""
+        tag_path = os.path.join(self.cache_dir, CACHE_TAG)
+        if os.path.isfile(tag_path):
+            return True
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return False
+        if not all(PREFIX_DIR_PATTERN.match(name) or name in (AST_DIR, SNIPPET_DIR, SIZE_FILE)
+                   for name in names):
+            return False
+        try:
+            with open(tag_path, "w", encoding="utf-8") as f:
+                f.write(CACHE_TAG_CONTENT)
+        except OSError:
+            return False
+        return True
+
+    def key(self, scene: Scene, target_lang: Optional[str], version: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{version}\0{target_lang or ''}\0".encode("utf-8"))
+        digest.update(scene_source(scene).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".tex")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                lines = f.read().split("\n")
+            # Zugriffszeit für die LRU-Verdrängung aktualisieren
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return lines
+
+    def put(self, key: str, lines: List[str]):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write("\n".join(lines))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+            record_size(self.cache_dir, size)
+        except OSError:
+            # Ein nicht beschreibbarer Cache ist kein Fehler, nur langsamer.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _entries(self) -> Iterator[Tuple[float, int, str]]:
+        """(mtime, Größe, Pfad) aller Einträge im Aufbau des Caches; fremde Dateien bleiben unberührt."""
+        def scan(directory: str, pattern) -> Iterator[Tuple[float, int, str]]:
+            try:
+                files = os.scandir(directory)
+            except OSError:
+                return
+            with files:
+                for entry in files:
+                    if not pattern.match(entry.name):
+                        continue
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+        def prefix_dirs(directory: str) -> List[str]:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                return []
+            return [os.path.join(directory, name) for name in names if PREFIX_DIR_PATTERN.match(name)]
+
+        for directory in prefix_dirs(self.cache_dir):
+            yield from scan(directory, SCENE_FILE_PATTERN)
+        yield from scan(os.path.join(self.cache_dir, AST_DIR), AST_FILE_PATTERN)
+        for directory in prefix_dirs(os.path.join(self.cache_dir, SNIPPET_DIR)):
+            yield from scan(directory, SNIPPET_FILE_PATTERN)
+
+    def _read_size(self) -> Optional[int]:
+        """Geschätzte Größe laut Bilanz: letzte Zählung plus seither geschriebene Bytes."""
+        try:
+            with open(os.path.join(self.cache_dir, SIZE_FILE), "rb") as f:
+                return sum(int(line) for line in f.read().split())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, total: int):
+        path = os.path.join(self.cache_dir, SIZE_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="ascii") as f:
+                f.write(f"{total}\n")
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Entfernt die ältesten Einträge, bis der Cache höchstens max_bytes groß ist.
+        Das Verzeichnis wird nur durchsucht, wenn die Größenbilanz fehlt oder über
+        max_bytes liegt; sie überschätzt eher (überschriebene oder von Hand gelöschte
+        Einträge zählen weiter) und wird dabei neu gesetzt.
+        """
+        if not self.managed:
+            return
+        estimate = self._read_size()
+        if estimate is not None and estimate <= self.max_bytes:
+            return
+        entries = list(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        if total > self.max_bytes:
+            entries.sort()
+            for _mtime, size, path in entries:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        # Während der Zählung angehängte Einträge gehen verloren; die nächste Zählung holt sie nach
+        self._write_size(total)
+
+    def close(self):
+        self.evict()
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
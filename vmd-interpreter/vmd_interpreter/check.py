@@ -0,0 +1,109 @@
+# vmd_interpreter/check.py
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .assets import collect_assets, missing_assets, resolve_assets
+from .build import expand_inputs
+from .parser import DSLParser
+from .snippets import SnippetStore, snippet_problems
+from .symbols import Diagnostic, SymbolIndex
+
+
+@dataclass
+class CheckResult:
+    source: str
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.diagnostics
+
+
+def check_file(vmd_file: str, snippet_dir: Optional[str] = None) -> CheckResult:
+    """
+    Parst eine .vmd-Datei mit Symbolverzeichnis, löst alle Verweise auf und prüft,
+    ob die referenzierten Bild- und Mediendateien existieren. Mit snippet_dir
+    (relativ zur Quelle) werden auch Snippet-Dateien und Zeilenmarken geprüft.
+    """
+    result = CheckResult(source=vmd_file)
+    index = SymbolIndex()
+    try:
+        with open(vmd_file, "r", encoding="utf-8") as f:
+            ast = DSLParser(f, symbols=index).parse()
+    except (OSError, UnicodeDecodeError) as e:
+        result.error = f"Error reading file: {e}"
+        return result
+    diagnostics = index.resolve()
+    assets = resolve_assets(collect_assets(ast), os.path.dirname(vmd_file), hash_files=False)
+    for asset in missing_assets(assets):
+        diagnostics.extend(Diagnostic(span, f"missing asset {asset.source} ({asset.error})") for span in asset.spans)
+    if snippet_dir is not None:
+        store = SnippetStore(os.path.join(os.path.dirname(vmd_file), snippet_dir))
+        diagnostics.extend(snippet_problems(ast, store, index))
+    diagnostics.sort(key=lambda diagnostic: (diagnostic.span.line, diagnostic.span.column))
+    result.diagnostics = diagnostics
+    return result
+
+
+def check_batch(vmd_files: List[str], jobs: Optional[int] = None,
+                snippet_dir: Optional[str] = None) -> List[CheckResult]:
+    """Prüft viele Dateien in einem Prozess-Pool (jobs=1: im aktuellen Prozess)."""
+    if jobs == 1 or len(vmd_files) <= 1:
+        return [check_file(path, snippet_dir) for path in vmd_files]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Dateien sind meist klein: in Paketen verschicken statt einzeln
+        chunksize = max(1, len(vmd_files) // (4 * (jobs or os.cpu_count() or 1)))
+        return list(executor.map(check_file, vmd_files, [snippet_dir] * len(vmd_files), chunksize=chunksize))
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m vmd_interpreter.main check",
+        description="Prüft Verweise ([!show:...], [!quiz:...], [!line:...], Button-Aktionen) "
+                    "sowie Bild- und Mediendateien in .vmd-Dateien, ohne LaTeX zu erzeugen."
+    )
+    arg_parser.add_argument("inputs", nargs="+", metavar="path_to_vmd_file",
+                            help=".vmd-Datei, Verzeichnis (rekursiv) oder Glob-Muster wie 'kurse/**/*.vmd'")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                            help="Anzahl paralleler Prozesse (Standard: Anzahl CPUs)")
+    arg_parser.add_argument("--snippets", metavar="DIR",
+                            help="Snippet-Dateien und Zeilenmarken ([!line:snippet-label]) gegen DIR "
+                                 "(relativ zur Quelle) prüfen")
+    arg_parser.add_argument("-q", "--quiet", action="store_true",
+                            help="Nur Probleme ausgeben, keine Zusammenfassung")
+    return arg_parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    vmd_files = expand_inputs(args.inputs)
+    if not vmd_files:
+        print("Error: no .vmd files found")
+        sys.exit(1)
+
+    results = check_batch(vmd_files, jobs=max(1, args.jobs), snippet_dir=args.snippets)
+    problems = 0
+    for result in results:
+        if result.error:
+            print(f"{result.source}: {result.error}")
+            problems += 1
+        for diagnostic in result.diagnostics:
+            print(f"{result.source}:{diagnostic}")
+        problems += len(result.diagnostics)
+
+    failed = sum(1 for result in results if not result.ok)
+    if not args.quiet:
+        print(f"Checked {len(results)} file{'s' if len(results) != 1 else ''}: "
+              f"{problems} problem{'s' if problems != 1 else ''} in {failed} file{'s' if failed != 1 else ''}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,142 @@
 # vmd_interpreter/dsl_ast.py
 
-from dataclasses import dataclass, field
-from typing import List, Dict
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
+class SourceSpan(NamedTuple):
+    line: int        # Startzeile (1-basiert)
+    column: int      # Startspalte (1-basiert)
+    end_line: int
+    end_column: int
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.column}"
+
+class ElementKind(Enum):
+    """Bekannte Elementtypen; wird beim Parsen einmal aus dem Typnamen bestimmt."""
+    SLIDE = "slide"
+    TELEPROMPT = "teleprompt"
+    CODE = "code"
+    VIDEO = "video"
+    SCREENCAST = "screencast"
+    QUIZ = "quiz"
+    OTHER = "other"    # Unbekannter bzw. von Dritten registrierter Typ
+
+# Typname (klein geschrieben) -> ElementKind
+ELEMENT_KINDS: Dict[str, ElementKind] = {
+    kind.value: kind for kind in ElementKind if kind is not ElementKind.OTHER
+}
+
+def element_kind(type_name: str) -> ElementKind:
+    return ELEMENT_KINDS.get(type_name.lower(), ElementKind.OTHER)
+
+class Parameters(Mapping):
+    """
+    Unveränderliche, kompakte Parameterliste eines Elements (key="value", ...).
+    Schlüssel und Werte liegen in zwei Tupeln und werden interniert, da sich
+    Namen wie "lang" oder "title" und Werte wie "DE" ständig wiederholen.
+    Verhält sich wie ein dict (get, items, in, ...).
+    """
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, items: Optional[Dict[str, str]] = None):
+        items = items or {}
+        self._keys: Tuple[str, ...] = tuple(sys.intern(key) for key in items)
+        self._values: Tuple[str, ...] = tuple(sys.intern(value) for value in items.values())
+
+    @classmethod
+    def from_tuples(cls, keys: Tuple[str, ...], values: Tuple[str, ...]) -> "Parameters":
+        """Baut Parameters direkt aus bereits internierten Schlüssel- und Werte-Tupeln."""
+        parameters = cls.__new__(cls)
+        parameters._keys = keys
+        parameters._values = values
+        return parameters
+
+    def get(self, key: str, default=None):
+        # Schneller als Mapping.get: kein Umweg über __getitem__ und KeyError
+        keys = self._keys
+        return self._values[keys.index(key)] if key in keys else default
+
+    def __getitem__(self, key: str) -> str:
+        keys = self._keys
+        if key in keys:
+            return self._values[keys.index(key)]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"Parameters({dict(self)!r})"
+
+    def __reduce__(self):
+        return Parameters, (dict(self),)
+
+NO_PARAMETERS = Parameters()
+
+def with_slots(cls):
+    """
+    Baut eine Dataclass mit __slots__ für ihre Felder neu auf, wie @dataclass(slots=True)
+    ab Python 3.10. Instanzen haben dann kein __dict__; die Standardwerte stehen im
+    erzeugten __init__ und dürfen nicht als Klassenattribute bleiben.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    if cls.__dataclass_params__.frozen:
+        # pickle/copy setzen Slots sonst per setattr, das bei frozen=True fehlschlägt
+        namespace["__getstate__"] = _frozen_getstate
+        namespace["__setstate__"] = _frozen_setstate
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+def _frozen_getstate(self):
+    return [getattr(self, f.name) for f in fields(self)]
+
+def _frozen_setstate(self, state):
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+@with_slots
 @dataclass
 class Header:
     title: str
     author: str
     style: str
+    span: Optional[SourceSpan] = None
 
+@with_slots
 @dataclass
 class Element:
-    type: str                  # z.B. "Slide", "Teleprompt", etc.
-    parameters: Dict[str, str] # Parameter wie title, lang etc.
+    type: str                  # z.B. "Slide", "Teleprompt", etc. (Schreibweise der Quelle)
+    parameters: Parameters     # Parameter wie title, lang etc.
     content: str               # Der Inhalt (Text, Bullet-Points, etc.)
+    span: Optional[SourceSpan] = None  # Position in der Quelldatei
+    kind: ElementKind = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Einmal beim Erzeugen bestimmen, statt bei jedem Rendern type.lower() zu vergleichen
+        self.kind = element_kind(self.type)
+        if not isinstance(self.parameters, Parameters):
+            self.parameters = Parameters(self.parameters) if self.parameters else NO_PARAMETERS
 
+@with_slots
 @dataclass
 class Scene:
     title: str
     elements: List[Element] = field(default_factory=list)
+    span: Optional[SourceSpan] = None
 
+@with_slots
 @dataclass
 class AST:
     header: Header
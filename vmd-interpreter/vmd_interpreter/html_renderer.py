@@ -0,0 +1,293 @@
+# vmd_interpreter/html_renderer.py
+
+import html
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from .dsl_ast import AST, ELEMENT_KINDS, Element, ElementKind, Scene
+from .inline import FORMAT_CACHE_SIZE
+from .layout import Block, Button, CodeBlock, Columns, Image, ItemList, Paragraph, lower_slide
+from .snippets import LINE_REFERENCE_PATTERN, SnippetStore
+
+# Inline-Formatierung wie in der Vorschau der VS-Code-Erweiterung (preview.ts):
+# **fett**, *kursiv*, `Code` und Marker, hier in einem Durchlauf
+HTML_INLINE_PATTERN = re.compile(r'\*\*([^*]+)\*\*|\*([^*]+)\*|`([^`]+)`|\[!([^\]]+)\]')
+HTML_INLINE_TEMPLATES = ("<strong>{}</strong>", "<em>{}</em>", "<code>{}</code>",
+                         '<span class="interactive-command">[{}]</span>')
+# Zeilen ohne diese Zeichen bleiben unverändert
+HTML_SPECIAL_PATTERN = re.compile(r'[*`\[&<>"\']')
+
+# Stil der Vorschau, ergänzt um Aufzählungen und Spalten
+STYLE = """
+body { font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 0; background-color: #f5f5f5; }
+.container { max-width: 900px; margin: 0 auto; padding: 20px; }
+.scene { background-color: white; border-radius: 5px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); margin-bottom: 20px; padding: 15px; }
+.scene-title { border-bottom: 1px solid #eee; font-size: 24px; margin-top: 0; padding-bottom: 10px; }
+.slide, .video, .screencast, .quiz, .code { border-left: 4px solid #007acc; margin: 15px 0; padding: 10px 15px; }
+.slide { border-color: #007acc; }
+.video { border-color: #e83e8c; }
+.screencast { border-color: #6f42c1; }
+.quiz { border-color: #28a745; }
+.code { border-color: #fd7e14; }
+.teleprompt { background-color: #f8f9fa; border-radius: 5px; font-style: italic; margin-top: 10px; padding: 10px; }
+.element-title { color: #333; font-size: 18px; margin-top: 0; }
+.image-preview { max-width: 100%; height: auto; border: 1px solid #ddd; margin: 10px 0; }
+.button { background-color: #007acc; border: none; border-radius: 3px; color: white; cursor: pointer; display: inline-block; margin: 5px; padding: 8px 15px; }
+.button:hover { background-color: #005999; }
+.quiz-question { font-weight: bold; margin: 10px 0 5px; }
+.quiz-options { list-style-type: none; padding-left: 15px; }
+.quiz-option { margin: 5px 0; }
+.quiz-option.correct { color: #28a745; font-weight: bold; }
+.code-snippet { background-color: #f5f5f5; border-radius: 3px; font-family: monospace; margin: 10px 0; padding: 10px; white-space: pre-wrap; }
+.columns { display: flex; gap: 15px; align-items: flex-start; }
+""".strip()
+
+# Render-Funktion für einen Elementtyp: (renderer, element) -> None
+HTMLElementHandler = Callable[["HTMLRenderer", Element], None]
+
+
+def escape(text: str) -> str:
+    return html.escape(text, quote=True)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_inline_html(text: str) -> str:
+    """**fett**, *kursiv*, `Code` und Marker wie [!show:name] nach HTML (Text wird maskiert)."""
+    if not HTML_SPECIAL_PATTERN.search(text):
+        return text  # Schneller Pfad: nichts zu tun
+    out: List[str] = []
+    pos = 0
+    for match in HTML_INLINE_PATTERN.finditer(text):
+        out.append(escape(text[pos:match.start()]))
+        index = match.lastindex
+        out.append(HTML_INLINE_TEMPLATES[index - 1].format(escape(match.group(index))))
+        pos = match.end()
+    out.append(escape(text[pos:]))
+    return "".join(out)
+
+
+class HTMLRenderer:
+    """
+    HTML-Backend: eine eigenständige HTML-Seite je Dokument, mit Aufbau und Stil
+    der Vorschau in der VS-Code-Erweiterung. Slides werden aus derselben
+    Layout-Zwischendarstellung (layout.lower_slide) erzeugt wie die LaTeX-Ausgabe.
+
+    Anders als DSLRenderer werden alle Sprachen in eine Seite geschrieben (die
+    Sprache steht im Titel jedes Slides); target_lang beschränkt die Slides wie dort.
+    """
+
+    def __init__(self, ast: AST, target_lang=None, assets: Optional[Dict[str, str]] = None,
+                 snippets: Optional[SnippetStore] = None):
+        self.ast = ast
+        self.target_lang = target_lang
+        self.assets = assets or {}
+        self.snippets = snippets
+        self.output_lines: List[str] = []
+
+    def render(self) -> str:
+        return "".join(self.iter_render())
+
+    def render_to(self, sink: TextIO):
+        for chunk in self.iter_render():
+            sink.write(chunk)
+
+    def iter_render(self) -> Iterator[str]:
+        """Erzeugt die Seite stückweise: Kopf, ein Block pro Szene, Abschluss."""
+        header = self.ast.header
+        yield "\n".join([
+            "<!DOCTYPE html>",
+            f'<html lang="{escape((self.target_lang or "en").lower())}">',
+            "<head>",
+            '<meta charset="UTF-8">',
+            '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
+            f"<title>{escape(header.title)}</title>",
+            "<style>",
+            STYLE,
+            "</style>",
+            "</head>",
+            "<body>",
+            '<div class="container">',
+            f"<h1>{escape(header.title)}</h1>",
+            f'<p class="author">{escape(header.author)}</p>',
+        ]) + "\n"
+        for scene in self.ast.scenes:
+            yield "\n".join(self.capture(self.render_scene, scene)) + "\n"
+        yield "</div>\n</body>\n</html>\n"
+
+    def capture(self, render_func, *args) -> List[str]:
+        """Führt eine render_*-Methode aus und liefert nur die dabei erzeugten Zeilen."""
+        saved = self.output_lines
+        self.output_lines = []
+        try:
+            render_func(*args)
+            return self.output_lines
+        finally:
+            self.output_lines = saved
+
+    def render_scene(self, scene: Scene):
+        self.output_lines.append('<div class="scene">')
+        self.output_lines.append(f'<h2 class="scene-title">{escape(scene.title)}</h2>')
+        for element in scene.elements:
+            self.render_element(element)
+        self.output_lines.append("</div>")
+
+    def render_element(self, element: Element):
+        handler = self.element_renderers.get(element.kind)
+        if handler is None:
+            # Nicht eingebauter Typ: evtl. über register_element ergänzt
+            handler = self.element_renderers.get(element.type.lower(), HTMLRenderer.render_unknown_element)
+        handler(self, element)
+
+    @classmethod
+    def register_element(cls, kind: Union[ElementKind, str]):
+        """
+        Decorator wie DSLRenderer.register_element, für die HTML-Ausgabe: die Funktion
+        erhält Renderer und Element und hängt HTML-Zeilen an renderer.output_lines an.
+        """
+        if isinstance(kind, str):
+            name = kind.lower()
+            kind = ELEMENT_KINDS.get(name, name)
+
+        def decorator(handler: HTMLElementHandler) -> HTMLElementHandler:
+            if "element_renderers" not in cls.__dict__:
+                cls.element_renderers = dict(cls.element_renderers)
+            cls.element_renderers[kind] = handler
+            return handler
+        return decorator
+
+    def format(self, text: str) -> str:
+        if self.snippets is not None and "[!line:" in text:
+            text = LINE_REFERENCE_PATTERN.sub(self._line_number, text)
+        return format_inline_html(text)
+
+    def _line_number(self, match) -> str:
+        line = self.snippets.line(match.group(1), match.group(2))
+        return match.group() if line is None else str(line)
+
+    def asset_path(self, source: str) -> str:
+        return self.assets.get(source, source)
+
+    def render_slide(self, element: Element):
+        layout = lower_slide(element)
+        if self.target_lang and layout.lang != self.target_lang:
+            return
+        lang = f" ({escape(layout.lang)})" if layout.lang else ""
+        self.output_lines.append('<div class="slide">')
+        self.output_lines.append(f'<h3 class="element-title">Slide: {escape(layout.title)}{lang}</h3>')
+        self.render_blocks(layout.blocks)
+        self.output_lines.append("</div>")
+
+    def render_teleprompt(self, element: Element):
+        title = escape(element.parameters.get("title", "Teleprompt"))
+        lang = element.parameters.get("lang")
+        self.output_lines.append('<div class="teleprompt">')
+        self.output_lines.append(f"<h4>Teleprompt: {title}{f' ({escape(lang)})' if lang else ''}</h4>")
+        for line in element.content.splitlines():
+            if line.strip():
+                self.output_lines.append(f"<p>{self.format(line)}</p>")
+        self.output_lines.append("</div>")
+
+    def render_code(self, element: Element):
+        name = element.parameters.get("snippet")
+        self.output_lines.append('<div class="code">')
+        self.output_lines.append(f'<h3 class="element-title">Code: {escape(name or "Code")}</h3>')
+        self.render_code_block(CodeBlock(name))
+        self.output_lines.append("</div>")
+
+    def render_media(self, element: Element):
+        kind = element.kind.value
+        source = element.parameters.get("source")
+        self.output_lines.append(f'<div class="{kind}">')
+        self.output_lines.append(f'<h3 class="element-title">{kind.capitalize()}: {escape(source or "No source")}</h3>')
+        if source:
+            self.output_lines.append(f'<video controls src="{escape(self.asset_path(source))}" '
+                                     f'style="max-width:100%"></video>')
+        self.output_lines.append("</div>")
+
+    def render_quiz(self, element: Element):
+        title = escape(element.parameters.get("title", "Untitled Quiz"))
+        name = element.parameters.get("name")
+        self.output_lines.append('<div class="quiz">')
+        self.output_lines.append(f'<h3 class="element-title">Quiz: {title}{f" ({escape(name)})" if name else ""}</h3>')
+        in_options = False
+        for line in element.content.splitlines():
+            stripped = line.strip()
+            if stripped.startswith("###"):
+                if in_options:
+                    self.output_lines.append("</ul>")
+                self.output_lines.append(f'<div class="quiz-question">{self.format(stripped.lstrip("#").strip())}</div>')
+                self.output_lines.append('<ul class="quiz-options">')
+                in_options = True
+            elif stripped.startswith(("-", "+")):
+                if not in_options:
+                    self.output_lines.append('<ul class="quiz-options">')
+                    in_options = True
+                option_class = "quiz-option correct" if stripped.startswith("+") else "quiz-option"
+                self.output_lines.append(f'<li class="{option_class}">{self.format(stripped[1:].strip())}</li>')
+        if in_options:
+            self.output_lines.append("</ul>")
+        self.output_lines.append("</div>")
+
+    def render_unknown_element(self, element: Element):
+        self.output_lines.append(f"<!-- Unbekannter Elementtyp: {escape(element.type.lower())} -->")
+
+    def render_blocks(self, blocks: Iterable[Block]):
+        """HTML-Backend der Layout-Zwischendarstellung (siehe layout.py)."""
+        renderers = self.block_renderers
+        for block in blocks:
+            renderers[type(block)](self, block)
+
+    def render_paragraph(self, block: Paragraph):
+        formatted = self.format(block.text)
+        if formatted.strip():
+            self.output_lines.append(f"<p>{formatted}</p>")
+
+    def render_item_list(self, block: ItemList):
+        self.output_lines.append("<ul>")
+        self.output_lines.extend(f"<li>{self.format(item)}</li>" for item in block.items)
+        self.output_lines.append("</ul>")
+
+    def render_image(self, block: Image):
+        self.output_lines.append(f'<img class="image-preview" src="{escape(self.asset_path(block.source))}" '
+                                 f'alt="Image" />')
+
+    def render_code_block(self, block: CodeBlock):
+        snippet = self.snippets.get(block.snippet) if self.snippets is not None and block.snippet else None
+        if snippet is None:
+            self.output_lines.append(f'<pre class="code-snippet">[Code-Snippet: {escape(block.snippet or "Code")}]</pre>')
+            return
+        code = "\n".join(snippet.text)
+        self.output_lines.append(f'<pre class="code-snippet">{escape(code)}</pre>')
+
+    def render_button(self, block: Button):
+        self.output_lines.append(f'<button class="button">{escape(block.label)}</button>')
+
+    def render_columns(self, block: Columns):
+        self.output_lines.append('<div class="columns">')
+        for column in block.columns:
+            self.output_lines.append(f'<div class="column" style="width:{column.width * 100:.0f}%">')
+            self.render_blocks(column.blocks)
+            self.output_lines.append("</div>")
+        self.output_lines.append("</div>")
+
+    # Elementtyp -> Render-Funktion; nicht aufgeführte Typen erscheinen als Kommentar
+    element_renderers: Dict[Union[ElementKind, str], HTMLElementHandler] = {
+        ElementKind.SLIDE: render_slide,
+        ElementKind.TELEPROMPT: render_teleprompt,
+        ElementKind.CODE: render_code,
+        ElementKind.VIDEO: render_media,
+        ElementKind.SCREENCAST: render_media,
+        ElementKind.QUIZ: render_quiz,
+    }
+
+    # Blocktyp der Zwischendarstellung -> HTML-Render-Funktion (renderer, block)
+    block_renderers: Dict[type, Callable[["HTMLRenderer", Block], None]] = {
+        Paragraph: render_paragraph,
+        ItemList: render_item_list,
+        Image: render_image,
+        CodeBlock: render_code_block,
+        Button: render_button,
+        Columns: render_columns,
+    }
+
@@ -0,0 +1,163 @@
+# vmd_interpreter/inline.py
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Zeichen mit Sonderbedeutung in LaTeX und ihre Ersetzung
+LATEX_ESCAPES = {
+    "&": "\\&",
+    "%": "\\%",
+    "$": "\\$",
+    "#": "\\#",
+    "_": "\\_",
+    "{": "\\{",
+    "}": "\\}",
+    "~": "\\textasciitilde{}",
+    "^": "\\textasciicircum{}",
+    "\\": "\\textbackslash{}",
+}
+
+ESCAPE_PATTERN = re.compile(r'[&%$#_{}~^\\]')
+# Zeilenumbrüche beenden einen %-Kommentar
+LINE_BREAK_PATTERN = re.compile(r'[\r\n]+')
+
+# Ein Durchlauf zerlegt die Zeile in Text und Sonder-Tokens:
+# Marker wie [!bullet0], Hervorhebungen (** und *), Inline-Code und LaTeX-Sonderzeichen.
+INLINE_TOKEN_PATTERN = re.compile(r'(\[![\w:,-]+\]|\*\*\*|\*\*|\*|`[^`]*`|[&%$#_{}~^\\])')
+
+FORMAT_CACHE_SIZE = 4096
+
+
+def escape_latex(text: str) -> str:
+    """Maskiert alle LaTeX-Sonderzeichen (für Titel, Namen, Inline-Code usw.)."""
+    return ESCAPE_PATTERN.sub(lambda match: LATEX_ESCAPES[match.group()], text)
+
+
+def latex_comment(text: str) -> str:
+    """
+    Text für eine %-Kommentarzeile (Szenentitel, Quellen, Namen usw.). Kommentare
+    setzt LaTeX nicht, daher wird nichts maskiert; nur Zeilenumbrüche, die den
+    Kommentar beenden würden, werden zu Leerzeichen.
+    """
+    if "\n" not in text and "\r" not in text:
+        return text
+    return LINE_BREAK_PATTERN.sub(" ", text)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_inline(text: str) -> str:
+    """
+    Wandelt eine Inhaltszeile in LaTeX um:
+    - Marker wie [!bullet0] oder [!show:name] werden entfernt
+    - **Text** -> \\textbf{Text}, *Text* -> \\textit{Text} (auch verschachtelt)
+    - `Code` -> \\texttt{Code}
+    - LaTeX-Sonderzeichen werden maskiert
+    Das Ergebnis wird gemerkt, da sich Zeilen über Sprachen und Folien wiederholen.
+    """
+    parts = INLINE_TOKEN_PATTERN.split(text)
+    if len(parts) == 1:
+        return text  # Schneller Pfad: nichts zu tun
+    if "***" in parts:
+        parts = _split_triple(parts)
+    out: List[str] = []
+    _emit(parts, _following(parts) if "*" in text else None, 0, len(parts), out)
+    return "".join(out)
+
+
+def _split_triple(parts: List[str]) -> List[str]:
+    """
+    "***" öffnet fett und kursiv bzw. schließt beides: ***x*** -> \\textbf{\\textit{x}}.
+    Öffnend ist es am Zeilenanfang und nach Leerraum; folgt als nächstes ein "**",
+    wird zuerst kursiv geöffnet (***a** b* -> \\textit{\\textbf{a} b}).
+    """
+    split: List[str] = []
+    for i, part in enumerate(parts):
+        if part != "***":
+            split.append(part)
+        elif not parts[i - 1] or parts[i - 1][-1].isspace():
+            following = next((token for token in parts[i + 2::2] if token in ("*", "**", "***")), None)
+            split.extend(("*", "", "**") if following == "**" else ("**", "", "*"))
+        else:
+            split.extend(("*", "", "**"))
+    return split
+
+
+def _following(parts: List[str]) -> Dict[str, List[int]]:
+    """
+    Für "*" und "**": je Index der Index des nächsten gleichen Tokens dahinter
+    (len(parts), falls keins folgt). Damit springt _find_close direkt zum nächsten
+    Kandidaten, statt für jedes öffnende Token die restliche Zeile zu durchsuchen.
+    """
+    end = len(parts)
+    following = {"*": [end] * (end + 1), "**": [end] * (end + 1)}
+    single, double = following["*"], following["**"]
+    next_single = next_double = end
+    for k in range(end - 1, -1, -1):
+        single[k] = next_single
+        double[k] = next_double
+        if parts[k] == "*" and k % 2:
+            next_single = k
+        elif parts[k] == "**" and k % 2:
+            next_double = k
+    return following
+
+
+def _emit(parts: List[str], following: Optional[Dict[str, List[int]]], lo: int, hi: int, out: List[str]):
+    # Gerade Indizes sind normaler Text, ungerade Indizes Sonder-Tokens.
+    i = lo
+    while i < hi:
+        part = parts[i]
+        if i % 2 == 0:
+            out.append(part)
+        elif part == "**":
+            close = _find_close(parts, following, "**", i, hi)
+            if close is None:
+                out.append(part)
+            else:
+                out.append("\\textbf{")
+                _emit(parts, following, i + 1, close, out)
+                out.append("}")
+                i = close
+        elif part == "*":
+            close = _find_close(parts, following, "*", i, hi)
+            if close is None:
+                out.append(part)
+            else:
+                out.append("\\textit{")
+                _emit(parts, following, i + 1, close, out)
+                out.append("}")
+                i = close
+        elif part[0] == "`":
+            out.append("\\texttt{" + escape_latex(part[1:-1]) + "}")
+        elif part[0] == "[":
+            pass  # Marker werden nicht dargestellt
+        else:
+            out.append(LATEX_ESCAPES[part])
+        i += 1
+
+
+def _find_close(parts: List[str], following: Dict[str, List[int]], marker: str, opener: int, hi: int):
+    """
+    Index des Tokens vor hi, das die Hervorhebung an opener schließt, oder None.
+    Der Inhalt darf nicht leer sein; bei "*" werden vollständige **...**-Paare
+    übersprungen.
+    """
+    same = following[marker]
+    double = following["**"]
+    k = same[opener]
+    d = double[opener] if marker == "*" else hi
+    while k < hi:
+        if d < k:
+            inner = _find_close(parts, following, "**", d, hi)
+            if inner is None:
+                d = hi  # dahinter gibt es kein vollständiges Paar mehr
+                continue
+            if inner > k:
+                k = same[inner]  # Kandidat liegt im **...**-Paar
+            d = double[inner]
+            continue
+        if k > opener + 2 or parts[opener + 1]:
+            return k
+        k = same[k]  # leerer Inhalt, nächster Kandidat
+    return None
@@ -0,0 +1,185 @@
+# vmd_interpreter/layout.py
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+from .dsl_ast import Element, with_slots
+from .snippets import code_line_snippet
+from .tokenizer import parse_parameters
+
+# Zwischendarstellung (IR) eines Slide-Inhalts.
+#
+# Der Inhalt eines Slides wird einmal in eine Folge typisierter Blöcke übersetzt
+# (lower_slide); die Backends (LaTeX in renderer.py, HTML in html_renderer.py)
+# erzeugen daraus nur noch ihre Ausgabe, ohne die Zeilen erneut zu untersuchen.
+# Alle Knoten sind unveränderlich und werden über Slides, Sprachen und Backends
+# hinweg geteilt.
+
+# Bullet mit Marker: "[!bullet0] - Text"
+BULLET_MARKER_PATTERN = re.compile(r'\[![\w:,-]+\]\s*-')
+IMAGE_SOURCE_PATTERN = re.compile(r'source\s*=\s*[\'"](.*?)[\'"]')
+COLUMN_WIDTH_PATTERN = re.compile(r'width\s*=\s*(\d+)', re.IGNORECASE)
+SUBELEMENT_PARAMS_PATTERN = re.compile(r'\((.*)\)')
+
+LAYOUT_CACHE_SIZE = 4096
+
+
+@with_slots
+@dataclass(frozen=True)
+class Paragraph:
+    text: str                   # Zeile wie in der Quelle (Markdown, Marker)
+
+
+@with_slots
+@dataclass(frozen=True)
+class ItemList:
+    items: Tuple[str, ...]      # Text der Aufzählungspunkte, ohne "-" bzw. "[!bulletN] -"
+
+
+@with_slots
+@dataclass(frozen=True)
+class Image:
+    source: str
+
+
+@with_slots
+@dataclass(frozen=True)
+class CodeBlock:
+    snippet: Optional[str]      # Name aus snippet="...", falls angegeben
+
+
+@with_slots
+@dataclass(frozen=True)
+class Button:
+    label: str
+    name: Optional[str] = None
+    action: Optional[str] = None
+
+
+@with_slots
+@dataclass(frozen=True)
+class Column:
+    width: float                # Anteil an der Gesamtbreite (Summe aller Spalten: 1)
+    blocks: Tuple["Block", ...]
+
+
+@with_slots
+@dataclass(frozen=True)
+class Columns:
+    columns: Tuple[Column, ...]
+
+
+Block = Union[Paragraph, ItemList, Image, CodeBlock, Button, Columns]
+
+
+@with_slots
+@dataclass(frozen=True)
+class SlideLayout:
+    title: str
+    lang: Optional[str]
+    blocks: Tuple[Block, ...]
+
+
+def _is_column_start(stripped: str) -> bool:
+    return stripped.startswith("### column") or stripped.startswith("### Column")
+
+
+def _bullet_text(line: str) -> Optional[str]:
+    """Text eines Aufzählungspunkts ("- Text" oder "[!bullet0] - Text"), sonst None."""
+    stripped = line.lstrip()
+    if stripped.startswith("-"):
+        if "[!" in line:
+            return BULLET_MARKER_PATTERN.sub('', stripped).strip()
+        return stripped[1:].strip()
+    if "[!" in line and BULLET_MARKER_PATTERN.search(line):
+        return BULLET_MARKER_PATTERN.sub('', stripped).strip()
+    return None
+
+
+def _lower_lines(lines: List[str]) -> Tuple[Block, ...]:
+    blocks: List[Block] = []
+    items: List[str] = []
+    # Buttons innerhalb einer Aufzählung beenden sie nicht; sie folgen nach der Liste
+    buttons: List[Button] = []
+    for line in lines:
+        if line.lstrip().startswith("###"):
+            # Unterelemente: Buttons, Spaltenköpfe, Bilder und Code
+            if "Button" in line:
+                params = SUBELEMENT_PARAMS_PATTERN.search(line)
+                parameters = parse_parameters(params.group(1) if params else None)
+                button = Button(parameters.get("label", "Button"), parameters.get("name"), parameters.get("action"))
+                (buttons if items else blocks).append(button)
+                continue
+            if "column" in line.lower():
+                continue
+            if "Image" in line:
+                match = IMAGE_SOURCE_PATTERN.search(line)
+                if match:
+                    block = Image(match.group(1))
+                else:
+                    continue  # Bild ohne Quelle: wird übergangen
+            elif "Code" in line:
+                block = CodeBlock(code_line_snippet(line))
+            else:
+                block = None
+            if block is not None:
+                if items:
+                    blocks.append(ItemList(tuple(items)))
+                    blocks.extend(buttons)
+                    items, buttons = [], []
+                blocks.append(block)
+                continue
+        text = _bullet_text(line)
+        if text is not None:
+            items.append(text)
+            continue
+        if items:
+            blocks.append(ItemList(tuple(items)))
+            blocks.extend(buttons)
+            items, buttons = [], []
+        blocks.append(Paragraph(line))
+    if items:
+        blocks.append(ItemList(tuple(items)))
+        blocks.extend(buttons)
+    return tuple(blocks)
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def lower_content(content: str) -> Tuple[Block, ...]:
+    """
+    Übersetzt den Inhalt eines Slides in Blöcke. Ab zwei Spalten mit width
+    ("### Column (width=60)") wird der Inhalt auf die Spalten verteilt; Text vor
+    der ersten Spalte entfällt dann. Das Ergebnis wird gemerkt, da sich Inhalte
+    über Sprachen und Ausgabeformate wiederholen.
+    """
+    lines = content.splitlines()
+    widths = []
+    if "### column" in content or "### Column" in content:
+        for line in lines:
+            if _is_column_start(line.lstrip()):
+                match = COLUMN_WIDTH_PATTERN.search(line)
+                if match:
+                    widths.append(int(match.group(1)))
+    if len(widths) < 2:
+        return _lower_lines(lines)
+
+    # Jeder Spaltenkopf beginnt einen Abschnitt; Abschnitte ohne eigene Breite
+    # (Spaltenköpfe ohne width) belegen trotzdem die nächste Breite.
+    sections: List[List[str]] = [[] for _ in widths]
+    index = -1
+    for line in lines:
+        if _is_column_start(line.lstrip()):
+            index += 1
+        elif 0 <= index < len(sections):
+            sections[index].append(line)
+    total = sum(widths)
+    return (Columns(tuple(Column(width / total, _lower_lines(section))
+                          for width, section in zip(widths, sections))),)
+
+
+def lower_slide(element: Element) -> SlideLayout:
+    """Zwischendarstellung eines Slide-Elements (Titel, Sprache und Inhalt)."""
+    parameters = element.parameters
+    return SlideLayout(parameters.get("title", "Slide"), parameters.get("lang"), lower_content(element.content))
@@ -0,0 +1,153 @@
+# vmd_interpreter/lazy.py
+
+import mmap
+from typing import Dict, Iterator, List, Optional
+
+from .dsl_ast import AST, Header, Scene
+from .parser import DSLParser
+from .tokenizer import SCENE_MARKER
+
+SCENE_MARKER_BYTES = SCENE_MARKER.encode("ascii")
+
+
+class LazyDocument:
+    """
+    Eine .vmd-Datei, die per mmap eingeblendet und nur bei Bedarf geparst wird.
+
+    Der Header wird aus dem Text vor der ersten Szene gelesen, ohne den Rest der
+    Datei anzufassen. Beim ersten Zugriff auf die Szenen sucht ein Durchlauf die
+    Byte-Offsets aller "# Scene:"-Zeilen; die Elemente einer Szene werden erst
+    geparst, wenn die Szene angefordert wird, und zwar nur aus ihrem Ausschnitt
+    der Datei. Das Ergebnis entspricht DSLParser(...).parse() derselben Datei.
+
+        with LazyDocument("kurs.vmd") as doc:
+            print(doc.header.title, len(doc))
+            scene = doc.scene(42)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._data = b""  # leere Datei lässt sich nicht einblenden
+        self._header: Optional[Header] = None
+        self._first_scene: Optional[int] = None
+        self._offsets: Optional[List[int]] = None   # Byte-Offset jeder "# Scene:"-Zeile
+        self._lines: List[int] = []                 # Zeilennummern, soweit schon gezählt
+        self._scenes: Dict[int, Scene] = {}
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "LazyDocument":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _is_scene_line(self, pos: int) -> int:
+        """Zeilenanfang, falls der Marker bei pos am Zeilenanfang (nach Einrückung) steht, sonst -1."""
+        line_start = self._data.rfind(b"\n", 0, pos) + 1
+        if self._data[line_start:pos].strip(b" \t"):
+            return -1
+        return line_start
+
+    def _find_scene(self, start: int) -> int:
+        """Zeilenanfang der nächsten "# Scene:"-Zeile ab start, sonst -1."""
+        # find() sucht in C über die eingeblendeten Bytes; nur Treffer werden in Python geprüft
+        data = self._data
+        pos = data.find(SCENE_MARKER_BYTES, start)
+        while pos >= 0:
+            line_start = self._is_scene_line(pos)
+            if line_start >= 0:
+                return line_start
+            pos = data.find(SCENE_MARKER_BYTES, pos + len(SCENE_MARKER_BYTES))
+        return -1
+
+    @property
+    def header(self) -> Header:
+        """Header des Dokuments; liest nur den Text bis zur ersten Szene."""
+        if self._header is None:
+            if self._first_scene is None:
+                first = self._find_scene(0)
+                self._first_scene = len(self._data) if first < 0 else first
+            prologue = self._data[:self._first_scene].decode("utf-8")
+            self._header = DSLParser(prologue).parse_header()
+        return self._header
+
+    def offsets(self) -> List[int]:
+        """Byte-Offsets der "# Scene:"-Zeilen (ein Durchlauf beim ersten Aufruf)."""
+        if self._offsets is None:
+            offsets = []
+            pos = self._find_scene(0)
+            while pos >= 0:
+                offsets.append(pos)
+                # Suche hinter dem Marker fortsetzen; die nächste Zeile beginnt frühestens dort
+                pos = self._find_scene(pos + len(SCENE_MARKER_BYTES))
+            self._offsets = offsets
+            self._first_scene = offsets[0] if offsets else len(self._data)
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets())
+
+    def _scene_bytes(self, index: int):
+        offsets = self.offsets()
+        end = offsets[index + 1] if index + 1 < len(offsets) else len(self._data)
+        return self._data[offsets[index]:end]
+
+    def _line_of(self, index: int) -> int:
+        # Zeilennummern werden fortlaufend bis zur angefragten Szene gezählt
+        offsets = self.offsets()
+        lines = self._lines
+        while len(lines) <= index:
+            if lines:
+                previous = len(lines) - 1
+                lines.append(lines[-1] + self._data[offsets[previous]:offsets[previous + 1]].count(b"\n"))
+            else:
+                lines.append(1 + self._data[:offsets[0]].count(b"\n"))
+        return lines[index]
+
+    def title(self, index: int) -> str:
+        """Titel der Szene, ohne ihre Elemente zu parsen."""
+        start = self.offsets()[index]
+        end = self._data.find(b"\n", start)
+        line = self._data[start:end if end >= 0 else len(self._data)].decode("utf-8")
+        return line.split(SCENE_MARKER, 1)[1].strip()
+
+    def titles(self) -> List[str]:
+        return [self.title(index) for index in range(len(self))]
+
+    def scene(self, index: int) -> Scene:
+        """Die Szene mit Index index; ihre Elemente werden beim ersten Zugriff geparst."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"scene index {index} out of range")
+        scene = self._scenes.get(index)
+        if scene is None:
+            text = self._scene_bytes(index).decode("utf-8")
+            scene = DSLParser(text, first_line=self._line_of(index)).parse().scenes[0]
+            self._scenes[index] = scene
+        return scene
+
+    def find_scene(self, title: str) -> Optional[Scene]:
+        for index in range(len(self)):
+            if self.title(index) == title:
+                return self.scene(index)
+        return None
+
+    def __getitem__(self, index: int) -> Scene:
+        return self.scene(index)
+
+    def __iter__(self) -> Iterator[Scene]:
+        for index in range(len(self)):
+            yield self.scene(index)
+
+    def to_ast(self) -> AST:
+        """Materialisiert alle Szenen (wie DSLParser.parse)."""
+        return AST(header=self.header, scenes=list(self))
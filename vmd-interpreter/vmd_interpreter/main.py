@@ -1,63 +1,149 @@
 # vmd_interpreter/main.py
 
-import sys
+import argparse
 import os
-from vmd_interpreter.parser import DSLParser
-from vmd_interpreter.renderer import DSLRenderer
+import sys
+import time
+from vmd_interpreter.build import build_batch, expand_inputs
+from vmd_interpreter.cache import default_cache_dir
+from vmd_interpreter.metrics import Metrics
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m vmd_interpreter.main",
+        description="Erzeugt LaTeX-Beamer-Folien aus .vmd-Dateien. "
+                    "'check <Dateien>' prüft nur die Verweise (siehe 'check --help'), "
+                    "'serve [Verzeichnis]' startet den lokalen Render-Server (siehe 'serve --help')."
+    )
+    arg_parser.add_argument("inputs", nargs="+", metavar="path_to_vmd_file",
+                            help=".vmd-Datei, Verzeichnis (rekursiv) oder Glob-Muster wie 'kurse/**/*.vmd'")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                            help="Anzahl paralleler Prozesse im Batch-Betrieb (Standard: Anzahl CPUs)")
+    arg_parser.add_argument("--render-jobs", type=int, default=1, metavar="N",
+                            help="Szenen einer Datei in N Prozessen parallel rendern (Standard: 1, seriell); "
+                                 "lohnt sich bei sehr großen Dateien")
+    arg_parser.add_argument("--assets", metavar="DIR",
+                            help="Bilder und Medien prüfen, inhaltsadressiert nach DIR (relativ zur Quelle) "
+                                 "kopieren und ihre Pfade in der Ausgabe umschreiben; fehlende Dateien "
+                                 "brechen den Build vor dem Rendern ab")
+    arg_parser.add_argument("--snippets", metavar="DIR",
+                            help="Code-Snippets (snippet=\"name\") aus DIR (relativ zur Quelle) hervorgehoben "
+                                 "einsetzen; fehlende Snippets und Zeilenmarken brechen den Build ab")
+    arg_parser.add_argument("--html", action="store_true",
+                            help="Zusätzlich eine HTML-Seite (<name>.html, alle Sprachen) im Stil der "
+                                 "VS-Code-Vorschau schreiben")
+    arg_parser.add_argument("--watch", action="store_true",
+                            help="Datei beobachten und bei Änderungen nur geänderte Szenen neu bauen")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Szenen-Cache nicht verwenden, alles neu rendern")
+    arg_parser.add_argument("--cache-dir", default=None,
+                            help=f"Verzeichnis des Szenen-Caches (Standard: {default_cache_dir()})")
+    arg_parser.add_argument("--split", action="store_true",
+                            help="Ein Master-Dokument mit \\include und eine .tex-Datei je Szene erzeugen; "
+                                 "unveränderte Szenen-Dateien werden nicht neu geschrieben")
+    arg_parser.add_argument("--include-changed-only", action="store_true",
+                            help="Mit --split: \\includeonly nennt nur die in diesem Lauf geänderten Szenen")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="Zeiten je Phase, Elementanzahlen, Renderzeit je Sprache und die "
+                                 "langsamsten Szenen ausgeben")
+    arg_parser.add_argument("--metrics-json", metavar="PATH",
+                            help="Dieselben Messwerte als JSON nach PATH schreiben")
+    arg_parser.add_argument("--profile-dump", metavar="PATH",
+                            help="cProfile-Statistik nach PATH schreiben (erzwingt --jobs 1)")
+    return arg_parser.parse_args(argv)
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python -m vmd_interpreter.main <path_to_vmd_file>")
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Unterbefehle und selten genutzte Betriebsarten werden erst bei Bedarf importiert,
+    # damit ein einfacher Build-Aufruf schnell startet (asyncio, ssl, cProfile, ...)
+    # Unterbefehl "check": nur Verweise prüfen, kein LaTeX erzeugen
+    if argv and argv[0] == "check":
+        from vmd_interpreter.check import main as check_main
+        check_main(argv[1:])
+        return
+    # Unterbefehl "serve": lokaler HTTP-Server statt eines einzelnen Builds
+    if argv and argv[0] == "serve":
+        from vmd_interpreter.server import main as serve_main
+        serve_main(argv[1:])
+        return
+    args = parse_args(argv)
+    vmd_files = expand_inputs(args.inputs)
+    if not vmd_files:
+        print("Error: no .vmd files found")
         sys.exit(1)
-    
-    vmd_file = sys.argv[1]
-    try:
-        with open(vmd_file, "r", encoding="utf-8") as f:
-            dsl_text = f.read()
-    except Exception as e:
-        print(f"Error reading file: {e}")
+
+    collect_metrics = bool(args.profile or args.metrics_json)
+    if args.watch:
+        if len(vmd_files) != 1:
+            print("Error: --watch expects exactly one .vmd file")
+            sys.exit(1)
+        if collect_metrics or args.profile_dump or args.split or args.assets or args.snippets or args.html:
+            print("Error: --split, --assets, --snippets, --html, --profile, --metrics-json and --profile-dump "
+                  "cannot be used with --watch")
+            sys.exit(1)
+        from vmd_interpreter.watch import watch
+        watch(vmd_files[0])
+        return
+
+    # cProfile sieht nur den eigenen Prozess, daher ohne Prozess-Pool
+    jobs = 1 if args.profile_dump else max(1, args.jobs)
+    profiler = None
+    if args.profile_dump:
+        import cProfile
+        profiler = cProfile.Profile()
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    results = build_batch(vmd_files, jobs=jobs, cache_dir=args.cache_dir,
+                          use_cache=not args.no_cache, collect_metrics=collect_metrics,
+                          split=args.split, include_changed_only=args.include_changed_only,
+                          render_jobs=1 if args.profile_dump else max(1, args.render_jobs),
+                          asset_dir=args.assets, snippet_dir=args.snippets, html=args.html)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_dump)
+    total_wall = time.perf_counter() - start
+
+    batch = len(vmd_files) > 1
+    for result in results:
+        for output_file in result.outputs:
+            print(f"{'HTML' if output_file.endswith('.html') else 'LaTeX'} output written to {output_file}")
+        if result.manifest:
+            print(f"Scene files: {result.fragments_changed} of {result.fragments} changed "
+                  f"(manifest: {result.manifest})")
+        if result.assets is not None:
+            print(f"Assets: {result.assets.copied} copied, {result.assets.unchanged} unchanged")
+        if args.snippets and result.ok:
+            print(f"Snippets: {result.snippets_highlighted} highlighted, {result.snippets_cached} from cache")
+        if not result.ok:
+            print(f"{result.source}: {result.error}" if batch else result.error)
+
+    if not args.no_cache and any(result.cache_hits or result.cache_misses for result in results):
+        hits = sum(result.cache_hits for result in results)
+        misses = sum(result.cache_misses for result in results)
+        print(f"Scene cache: {hits} hits, {misses} misses")
+
+    if collect_metrics:
+        metrics = Metrics()
+        for result in results:
+            if result.metrics is not None:
+                metrics.merge(result.metrics)
+        if args.profile:
+            print(metrics.report())
+            print(f"Total wall time: {total_wall * 1000:.1f} ms")
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json, total_wall_seconds=total_wall, jobs=jobs)
+            print(f"Metrics written to {args.metrics_json}")
+    if args.profile_dump:
+        print(f"Profile written to {args.profile_dump} (view with: python -m pstats {args.profile_dump})")
+
+    failed = [result for result in results if not result.ok]
+    if batch:
+        print(f"Built {len(results)} files: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+        for result in failed:
+            print(f"  FAILED {result.source}")
+    if failed:
         sys.exit(1)
-    
-    # Parsen des DSL-Codes
-    parser = DSLParser(dsl_text)
-    ast = parser.parse()
-
-    # Überprüfe, ob alle Slide-Elemente ein gültiges lang-Attribut haben und sammle die Sprachen.
-    languages = set()
-    for scene in ast.scenes:
-        for element in scene.elements:
-            if element.type.lower() == "slide":
-                lang = element.parameters.get("lang")
-                if not lang:
-                    print("Error: Slide missing 'lang' attribute!")
-                    sys.exit(1)
-                languages.add(lang)
-
-    if len(languages) > 1:
-        # Mehrsprachigkeit: Für jede Sprache wird ein eigener Output erzeugt.
-        for lang in languages:
-            renderer = DSLRenderer(ast, target_lang=lang)
-            output = renderer.render()
-            
-            # Erstelle den Ausgabepfad
-            output_file = os.path.splitext(vmd_file)[0] + f"_{lang}_output.tex"
-            
-            # Schreibe die Ausgabe
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(output)
-            print(f"LaTeX output written to {output_file}")
-    else:
-        # Nur eine Sprache: Ein einzelner Output.
-        renderer = DSLRenderer(ast, target_lang=None)
-        output = renderer.render()
-        
-        # Erstelle den Ausgabepfad
-        output_file = os.path.splitext(vmd_file)[0] + "_output.tex"
-        
-        # Schreibe die Ausgabe
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(output)
-        print(f"LaTeX output written to {output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,159 @@
+# vmd_interpreter/metrics.py
+
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .dsl_ast import AST, ElementKind, Scene
+
+# Phasen in der Reihenfolge der Pipeline (für Bericht und JSON)
+PHASES = ("load", "read", "parse", "validate", "assets", "snippets", "render", "write", "html")
+SLOWEST_SCENES = 10
+
+
+class Metrics:
+    """
+    Sammelt Laufzeit- und Mengenangaben eines Builds: Wall- und CPU-Zeit je Phase,
+    Szenen und Elemente nach Typ, Renderzeit je Sprache, geschriebene Bytes und
+    die langsamsten Szenen.
+
+    DSLParser und DSLRenderer nehmen optional ein Metrics-Objekt entgegen
+    (metrics=...); ohne dieses laufen sie ohne jede Messung. Die Objekte sind
+    picklebar und lassen sich mit merge() über mehrere Dateien zusammenfassen.
+    """
+
+    def __init__(self, slowest: int = SLOWEST_SCENES):
+        self.source: Optional[str] = None  # aktuelle Quelldatei (für Ortsangaben)
+        self.files = 0
+        self.phases: Dict[str, List[float]] = {}      # Phase -> [Wall, CPU] in Sekunden
+        self.scenes = 0
+        self.elements: Dict[str, int] = {}            # Elementtyp -> Anzahl
+        self.languages: Dict[str, float] = {}         # Sprache -> Renderzeit in Sekunden
+        self.output_bytes: Dict[str, int] = {}        # Ausgabepfad -> Größe
+        self.slowest = slowest
+        self._scene_times: List[Tuple[float, str, str]] = []  # Min-Heap (Sekunden, Titel, Ort)
+
+    @contextmanager
+    def phase(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add_phase(self, name: str, wall: float, cpu: float):
+        totals = self.phases.setdefault(name, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    def count_ast(self, ast: AST):
+        self.scenes += len(ast.scenes)
+        for scene in ast.scenes:
+            for element in scene.elements:
+                name = element.type.lower() if element.kind is ElementKind.OTHER else element.kind.value
+                self.elements[name] = self.elements.get(name, 0) + 1
+
+    def add_scene(self, scene: Scene, seconds: float):
+        location = f"{self.source}:{scene.span}" if self.source else str(scene.span)
+        entry = (seconds, scene.title, location)
+        if len(self._scene_times) < self.slowest:
+            heapq.heappush(self._scene_times, entry)
+        elif seconds > self._scene_times[0][0]:
+            heapq.heapreplace(self._scene_times, entry)
+
+    def add_language(self, lang: Optional[str], seconds: float):
+        key = lang or "default"
+        self.languages[key] = self.languages.get(key, 0.0) + seconds
+
+    def add_output(self, path: str):
+        try:
+            self.output_bytes[path] = os.path.getsize(path)
+        except OSError:
+            pass
+
+    def consume(self, chunks: Iterable[Tuple[object, str]], sinks: Dict[object, TextIO]):
+        """
+        Schreibt (Ziel, Block)-Paare in sinks und bucht die Zeit getrennt auf die
+        Phasen "render" (Erzeugen der Blöcke) und "write" (sink.write).
+        """
+        write_wall = write_cpu = 0.0
+        wall, cpu = time.perf_counter(), time.process_time()
+        for key, chunk in chunks:
+            chunk_wall, chunk_cpu = time.perf_counter(), time.process_time()
+            sinks[key].write(chunk)
+            write_wall += time.perf_counter() - chunk_wall
+            write_cpu += time.process_time() - chunk_cpu
+        self.add_phase("render", time.perf_counter() - wall - write_wall, time.process_time() - cpu - write_cpu)
+        self.add_phase("write", write_wall, write_cpu)
+
+    def merge(self, other: "Metrics"):
+        self.files += other.files
+        for name, (wall, cpu) in other.phases.items():
+            self.add_phase(name, wall, cpu)
+        self.scenes += other.scenes
+        for name, count in other.elements.items():
+            self.elements[name] = self.elements.get(name, 0) + count
+        for lang, seconds in other.languages.items():
+            self.languages[lang] = self.languages.get(lang, 0.0) + seconds
+        self.output_bytes.update(other.output_bytes)
+        for entry in other._scene_times:
+            if len(self._scene_times) < self.slowest:
+                heapq.heappush(self._scene_times, entry)
+            elif entry[0] > self._scene_times[0][0]:
+                heapq.heapreplace(self._scene_times, entry)
+
+    def slowest_scenes(self) -> List[Tuple[float, str, str]]:
+        return sorted(self._scene_times, reverse=True)
+
+    def _ordered_phases(self) -> List[str]:
+        return [name for name in PHASES if name in self.phases] + \
+               sorted(name for name in self.phases if name not in PHASES)
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "phases": {name: {"wall_seconds": self.phases[name][0], "cpu_seconds": self.phases[name][1]}
+                       for name in self._ordered_phases()},
+            "scenes": self.scenes,
+            "elements": dict(sorted(self.elements.items())),
+            "render_seconds_by_language": dict(sorted(self.languages.items())),
+            "output_bytes": self.output_bytes,
+            "total_output_bytes": sum(self.output_bytes.values()),
+            "slowest_scenes": [{"seconds": seconds, "title": title, "location": location}
+                               for seconds, title, location in self.slowest_scenes()],
+        }
+
+    def write_json(self, path: str, **extra):
+        data = self.to_dict()
+        data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    def report(self) -> str:
+        files = f" ({self.files} file{'s' if self.files != 1 else ''})" if self.files else ""
+        lines = [f"Profile{files}:",
+                 f"  {'phase':<10} {'wall [ms]':>10} {'cpu [ms]':>10}"]
+        for name in self._ordered_phases():
+            wall, cpu = self.phases[name]
+            lines.append(f"  {name:<10} {wall * 1000:>10.1f} {cpu * 1000:>10.1f}")
+        counts = ", ".join(f"{name} {count}" for name, count in sorted(self.elements.items()))
+        lines.append(f"Scenes: {self.scenes}, elements: {sum(self.elements.values())}"
+                     + (f" ({counts})" if counts else ""))
+        if self.languages:
+            lines.append("Render time per language: " + ", ".join(
+                f"{lang} {seconds * 1000:.1f} ms" for lang, seconds in sorted(self.languages.items())))
+        lines.append(f"Output: {len(self.output_bytes)} files, {sum(self.output_bytes.values())} bytes")
+        if self._scene_times:
+            lines.append("Slowest scenes:")
+            for seconds, title, location in self.slowest_scenes():
+                lines.append(f"  {seconds * 1000:>8.2f} ms  {title} ({location})")
+        return "\n".join(lines)
+
+
+def measure_phase(metrics: Optional[Metrics], name: str):
+    """metrics.phase(name), oder ein leerer Kontext, wenn nicht gemessen wird."""
+    return metrics.phase(name) if metrics is not None else nullcontext()
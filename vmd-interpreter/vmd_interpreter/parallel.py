@@ -0,0 +1,140 @@
+# vmd_interpreter/parallel.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from .cache import RenderCache
+from .dsl_ast import AST, Scene
+from .metrics import Metrics
+from .renderer import DSLRenderer
+from .snippets import SnippetStore
+
+# Szenen je Arbeitspaket: etwa so viele Pakete wie CHUNKS_PER_JOB * jobs, damit
+# ungleich große Szenen die Prozesse trotzdem gleichmäßig auslasten.
+CHUNKS_PER_JOB = 4
+MIN_CHUNK_SCENES = 8
+
+
+def partition(count: int, jobs: int, chunk_scenes: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Teilt count Szenen in zusammenhängende Bereiche (start, end) auf."""
+    if chunk_scenes is None:
+        chunk_scenes = max(MIN_CHUNK_SCENES, -(-count // (jobs * CHUNKS_PER_JOB)))
+    return [(start, min(start + chunk_scenes, count)) for start in range(0, count, chunk_scenes)]
+
+
+class RenderJob:
+    """Alles, was ein Arbeitsprozess zum Rendern von Szenen eines Dokuments braucht."""
+
+    def __init__(self, renderer_class: Type[DSLRenderer], ast: AST, target_lang: Optional[str],
+                 languages: List[str], cache: Optional[RenderCache], collect_metrics: bool,
+                 source: Optional[str], assets: Dict[str, str], snippets: Optional[SnippetStore]):
+        self.renderer_class = renderer_class
+        self.ast = ast
+        self.target_lang = target_lang
+        self.languages = languages
+        self.cache = cache
+        self.collect_metrics = collect_metrics
+        self.source = source
+        self.assets = assets
+        self.snippets = snippets
+
+
+# Auftrag des aktuellen Arbeitsprozesses (gesetzt von init_worker)
+_worker_job: Optional[RenderJob] = None
+
+
+def init_worker(job: RenderJob):
+    # Unter fork erbt der Prozess den AST, ohne dass er serialisiert wird; die
+    # einzelnen Aufträge bestehen dann nur noch aus Szenen-Bereichen.
+    global _worker_job
+    _worker_job = job
+
+
+def render_chunk(start: int, end: int, job: Optional[RenderJob] = None):
+    """
+    Rendert die Szenen start..end-1 mit einem eigenen Renderer. Ohne job wird der
+    Auftrag des Arbeitsprozesses verwendet (siehe init_worker).
+    Liefert ([{Sprache: Zeilen}, ...], Cache-Treffer, Cache-Fehlschläge, Metrics oder None).
+    """
+    job = job or _worker_job
+    cache = None
+    if job.cache is not None:
+        # Eigene Zähler je Paket (bei Threads wird der Auftrag geteilt)
+        cache = RenderCache(job.cache.cache_dir, job.cache.max_bytes)
+    metrics = None
+    if job.collect_metrics:
+        metrics = Metrics()
+        metrics.source = job.source
+    renderer = job.renderer_class(AST(header=job.ast.header, scenes=job.ast.scenes[start:end]),
+                                  target_lang=job.target_lang, cache=cache, metrics=metrics, assets=job.assets,
+                                  snippets=job.snippets)
+    # Immer der serielle Weg: auch ParallelRenderer-Unterklassen rendern hier selbst
+    blocks = [scene_blocks for _scene, scene_blocks in DSLRenderer.iter_scene_blocks(renderer, job.languages)]
+    if cache is None:
+        return blocks, 0, 0, metrics
+    return blocks, cache.hits, cache.misses, metrics
+
+
+class ParallelRenderer(DSLRenderer):
+    """
+    DSLRenderer, der die Szenen eines Dokuments in Paketen parallel rendert.
+
+    Jedes Paket wird in einem Arbeitsprozess mit eigenem Renderer (eigene
+    output_lines, eigene Cache- und Metrics-Objekte) gerendert; die Ergebnisse
+    werden in der Reihenfolge der Szenen wieder zusammengesetzt. Die Ausgabe ist
+    damit Byte für Byte dieselbe wie bei DSLRenderer.
+
+    jobs:         Anzahl der Prozesse (Standard: Anzahl CPUs); bei 1 oder nur einer
+                  Szene wird seriell gerendert.
+    chunk_scenes: Szenen je Paket (Standard: siehe partition()).
+    threads:      Threads statt Prozesse. Wegen des GIL nur sinnvoll, wenn die
+                  Element-Renderer selbst blockieren oder den GIL freigeben.
+
+    Über register_element ergänzte Elementtypen müssen in den Arbeitsprozessen
+    bekannt sein. Unter Linux (fork) gilt das automatisch; sonst muss das Modul mit
+    der Registrierung beim Import geladen werden.
+    """
+
+    def __init__(self, ast: AST, target_lang=None, cache=None, metrics: Optional[Metrics] = None,
+                 assets: Optional[Dict[str, str]] = None, snippets: Optional[SnippetStore] = None,
+                 jobs: Optional[int] = None, chunk_scenes: Optional[int] = None, threads: bool = False):
+        super().__init__(ast, target_lang=target_lang, cache=cache, metrics=metrics, assets=assets,
+                         snippets=snippets)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_scenes = chunk_scenes
+        self.threads = threads
+
+    def iter_scene_blocks(self, languages=()) -> Iterator[Tuple[Scene, Dict[str, List[str]]]]:
+        languages = list(languages)
+        scenes = self.ast.scenes
+        if self.jobs <= 1 or len(scenes) <= 1:
+            yield from super().iter_scene_blocks(languages)
+            return
+
+        chunks = partition(len(scenes), self.jobs, self.chunk_scenes)
+        workers = min(self.jobs, len(chunks))
+        job = RenderJob(type(self), self.ast, self.target_lang, languages, self.cache, self.metrics is not None,
+                        self.metrics.source if self.metrics is not None else None, self.assets, self.snippets)
+        if self.threads:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            task_job = job
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(job,))
+            task_job = None
+        futures = []
+        try:
+            futures = [executor.submit(render_chunk, start, end, task_job) for start, end in chunks]
+            for (start, end), future in zip(chunks, futures):
+                blocks, hits, misses, chunk_metrics = future.result()
+                if self.cache is not None:
+                    self.cache.hits += hits
+                    self.cache.misses += misses
+                if chunk_metrics is not None:
+                    self.metrics.merge(chunk_metrics)
+                yield from zip(scenes[start:end], blocks)
+        finally:
+            # Bricht der Aufrufer ab, noch nicht gestartete Blöcke verwerfen
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
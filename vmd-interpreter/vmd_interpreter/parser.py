@@ -1,86 +1,100 @@
 # vmd_interpreter/parser.py
 
-import re
-from .dsl_ast import Header, Element, Scene, AST
-from typing import List
+from .dsl_ast import NO_PARAMETERS, Header, Element, Scene, AST
+from .metrics import Metrics
+from .tokenizer import DSLTokenizer, Token, HEADER, SCENE, ELEMENT
+from typing import TYPE_CHECKING, List, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+    from .symbols import SymbolIndex
+
+# Muss erhöht werden, sobald Tokenizer oder Parser für dieselbe Eingabe einen anderen
+# AST erzeugen (macht die gespeicherten ASTs in ast_cache.py ungültig).
+PARSER_VERSION = 1
 
 class DSLParser:
-    def __init__(self, input_text: str):
+    def __init__(self, input_text: Union[str, TextIO], first_line: int = 1,
+                 metrics: Optional[Metrics] = None, symbols: Optional["SymbolIndex"] = None):
+        """
+        input_text: Der DSL-Code als String oder ein Text-Stream (z.B. ein geöffnetes
+                    Datei-Handle). Ein Stream kann nur einmal geparst werden.
+        first_line: Zeilennummer der ersten Zeile, falls nur ein Ausschnitt geparst wird.
+        metrics:    Optionales Metrics-Objekt; parse() bucht dann die Phase "parse"
+                    und zählt Szenen und Elemente nach Typ.
+        symbols:    Optionales SymbolIndex-Objekt; parse() trägt darin alle benannten
+                    Elemente und Verweise des Dokuments ein (siehe symbols.py).
+        """
         self.input_text = input_text
+        self.first_line = first_line
+        self.metrics = metrics
+        self.symbols = symbols
+
+    def tokens(self):
+        return iter(DSLTokenizer(self.input_text, first_line=self.first_line))
 
     def parse(self) -> AST:
-        header = self.parse_header()
-        scenes = self.parse_scenes()
-        return AST(header=header, scenes=scenes)
+        if self.metrics is None:
+            ast = self._parse()
+        else:
+            with self.metrics.phase("parse"):
+                ast = self._parse()
+            self.metrics.count_ast(ast)
+        if self.symbols is not None:
+            self.symbols.add_ast(ast)
+        return ast
+
+    def _parse(self) -> AST:
+        # Ein einziger Durchlauf über die Tokens baut Header und Szenen auf.
+        header = None
+        scenes = []
+        scene = None
+        for token in self.tokens():
+            if token.kind == ELEMENT:
+                scene.elements.append(Element(token.value, token.parameters, token.content, token.span))
+            elif token.kind == SCENE:
+                scene = Scene(title=token.value, span=token.span)
+                scenes.append(scene)
+            elif token.kind == HEADER and header is None:
+                header = self._header(token)
+        for scene in scenes:
+            # Eine Szene reicht bis zum Ende ihres letzten Elements
+            if scene.elements:
+                last = scene.elements[-1].span
+                scene.span = scene.span._replace(end_line=last.end_line, end_column=last.end_column)
+        return AST(header=header or self._header(None), scenes=scenes)
 
     def parse_header(self) -> Header:
-        header_pattern = r'^---\s*(.*?)\s*---'
-        match = re.search(header_pattern, self.input_text, re.DOTALL | re.MULTILINE)
-        header_data = {}
-        if match:
-            header_content = match.group(1)
-            for line in header_content.splitlines():
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    header_data[key.strip()] = value.strip().strip('"')
+        # Liest nur bis zum Header bzw. bis zur ersten Szene.
+        for token in self.tokens():
+            if token.kind == HEADER:
+                return self._header(token)
+            if token.kind == SCENE:
+                break
+        return self._header(None)
+
+    def parse_scenes(self) -> List[Scene]:
+        return self.parse().scenes
+
+    def parse_elements(self, scene_text: str) -> List[Element]:
+        # Elemente eines einzelnen Szenen-Inhalts (ohne "# Scene:"-Zeile) parsen.
+        tokens = DSLTokenizer("# Scene:\n" + scene_text)
+        return [self._element(token) for token in tokens if token.kind == ELEMENT]
+
+    @staticmethod
+    def _header(token: Optional[Token]) -> Header:
+        header_data = token.parameters if token else NO_PARAMETERS
         return Header(
             title=header_data.get("title", "Untitled"),
             author=header_data.get("author", "Unknown"),
-            style=header_data.get("style", "")
+            style=header_data.get("style", ""),
+            span=token.span if token else None
         )
 
-    def parse_scenes(self) -> List[Scene]:
-        # Die Szenen werden am Marker "# Scene:" getrennt.
-        scene_pattern = r'# Scene:\s*(.*)'
-        scene_splits = re.split(scene_pattern, self.input_text)
-        scenes = []
-        # Die Aufteilung liefert z.B.: [Text vor erster Szene, Szene-Titel1, Szene-Content1, Szene-Titel2, Szene-Content2, ...]
-        for i in range(1, len(scene_splits), 2):
-            scene_title = scene_splits[i].strip()
-            scene_content = scene_splits[i+1]
-            scene = Scene(title=scene_title, elements=self.parse_elements(scene_content))
-            scenes.append(scene)
-        return scenes
-
-    def parse_elements(self, scene_text: str) -> List[Element]:
-        elements = []
-        # Ein Element beginnt mit einer Zeile, die mit "##" gefolgt vom Elementtyp startet.
-        element_pattern = r'^(##\s*(\w+)(?:\s*\((.*?)\))?)\s*$'
-        lines = scene_text.splitlines()
-        current_element = None
-        current_lines = []
-        for line in lines:
-            match = re.match(element_pattern, line.strip())
-            if match:
-                # Falls bereits ein Element begonnen hat, wird es abgeschlossen.
-                if current_element:
-                    element = Element(
-                        type=current_element['type'],
-                        parameters=current_element['parameters'],
-                        content="\n".join(current_lines).strip()
-                    )
-                    elements.append(element)
-                # Neues Element initialisieren
-                element_type = match.group(2)
-                params_str = match.group(3)
-                parameters = {}
-                if params_str:
-                    # Erwartetes Format: key="value", key2="value2", ...
-                    for param in params_str.split(','):
-                        if '=' in param:
-                            k, v = param.split('=', 1)
-                            parameters[k.strip()] = v.strip().strip('"')
-                current_element = {'type': element_type, 'parameters': parameters}
-                current_lines = []
-            else:
-                if current_element is not None:
-                    current_lines.append(line)
-        # Das letzte Element hinzufügen
-        if current_element:
-            element = Element(
-                type=current_element['type'],
-                parameters=current_element['parameters'],
-                content="\n".join(current_lines).strip()
-            )
-            elements.append(element)
-        return elements
+    @staticmethod
+    def _element(token: Token) -> Element:
+        return Element(
+            type=token.value,
+            parameters=token.parameters,
+            content=token.content,
+            span=token.span
+        )
@@ -1,32 +1,211 @@
 # vmd_interpreter/renderer.py
 
-import re
-from .dsl_ast import AST, Scene, Element
+import hashlib
+import io
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from .dsl_ast import AST, ELEMENT_KINDS, Element, ElementKind, Scene
+from .assets import scene_assets
+from .inline import escape_latex, format_inline, latex_comment
+from .layout import Block, Button, CodeBlock, Columns, Image, ItemList, Paragraph, lower_slide
+from .metrics import Metrics
+from .snippets import LINE_REFERENCE_PATTERN, SNIPPET_PREAMBLE, Snippet, SnippetStore, scene_snippets
+
+# Muss erhöht werden, sobald sich die erzeugte Ausgabe ändert (macht den Szenen-Cache ungültig).
+RENDERER_VERSION = "4"
+
+# Render-Funktion für einen Elementtyp: (renderer, element) -> None
+ElementHandler = Callable[["DSLRenderer", Element], None]
 
 class DSLRenderer:
-    def __init__(self, ast: AST, target_lang=None):
+    def __init__(self, ast: AST, target_lang=None, cache=None, metrics: Optional[Metrics] = None,
+                 assets: Optional[Dict[str, str]] = None, snippets: Optional[SnippetStore] = None):
         """
         target_lang: Falls angegeben, werden nur Slides gerendert, deren lang-Attribut
                      mit target_lang übereinstimmt.
+        cache:       Optionaler RenderCache; unveränderte Szenen werden daraus übernommen.
+        metrics:     Optionales Metrics-Objekt für Renderzeiten je Szene und Sprache sowie
+                     die Phasen "render" und "write". Ohne metrics wird nichts gemessen.
+        assets:      Optionale Zuordnung Quellpfad -> Pfad in der Ausgabe (siehe assets.py);
+                     Bilder und Medienquellen werden damit umgeschrieben.
+        snippets:    Optionaler SnippetStore; Code-Elemente und "### Code"-Zeilen zeigen
+                     dann den hervorgehobenen Code statt eines Platzhalters.
         """
         self.ast = ast
         self.target_lang = target_lang
+        self.cache = cache
+        self.metrics = metrics
+        self.assets = assets or {}
+        self.snippets = snippets
         self.output_lines = []
 
+    def scene_version(self, scene: Scene) -> str:
+        """
+        Renderer-Version für den Cache-Schlüssel einer Szene, samt der umgeschriebenen
+        Pfade ihrer Assets und dem Inhalt ihrer Snippets. Beides ändert die Ausgabe, nicht
+        aber den Szenen-Quelltext; andere Assets und Snippets der Datei zählen nicht.
+        """
+        version = RENDERER_VERSION
+        if self.assets:
+            paths = sorted((source, self.assets[source]) for source in scene_assets(scene) if source in self.assets)
+            if paths:
+                version += "+" + hashlib.sha256(repr(paths).encode("utf-8")).hexdigest()[:16]
+        if self.snippets is not None:
+            names = scene_snippets(scene)
+            if names:
+                version += "+" + self.snippets.version(names)
+        return version
+
     def render(self) -> str:
-        self.render_header()
+        if self.metrics is None:
+            return "".join(self.iter_render())
+        with self.metrics.phase("render"):
+            return "".join(self.iter_render())
+
+    def iter_render(self) -> Iterator[str]:
+        """
+        Erzeugt das Dokument stückweise: erst den Header, dann einen Block pro Szene.
+        Im Speicher liegt dabei immer nur der aktuelle Block.
+        """
+        yield "\n".join(self.capture(self.render_header))
+        target_lang = self.target_lang
+        for _scene, blocks in self.iter_scene_blocks():
+            yield "\n" + "\n".join(blocks[target_lang])
+        yield "\n\\end{document}"
+
+    def render_to(self, sink: TextIO):
+        """Schreibt das Dokument blockweise in einen beliebigen Text-Stream."""
+        if self.metrics is not None:
+            self.metrics.consume(((None, chunk) for chunk in self.iter_render()), {None: sink})
+            return
+        for chunk in self.iter_render():
+            sink.write(chunk)
+
+    def iter_render_languages(self, languages: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Rendert alle angegebenen Sprachen in einem einzigen Durchlauf über den AST und
+        liefert (Sprache, Block)-Paare. Jedes Slide landet nur im Block seiner Sprache;
+        sprachunabhängige Teile (Header, Kommentare, Code-Platzhalter usw.) werden
+        einmal gerendert und in alle Ausgaben übernommen.
+        """
+        languages = list(languages)
+        header = "\n".join(self.capture(self.render_header))
+        for lang in languages:
+            yield lang, header
+        if not languages:
+            return
+        for _scene, blocks in self.iter_scene_blocks(languages):
+            for lang in languages:
+                yield lang, "\n" + "\n".join(blocks[lang])
+        for lang in languages:
+            yield lang, "\n\\end{document}"
+
+    def render_languages_to(self, sinks: Dict[str, TextIO]):
+        """Wie render_to, aber für mehrere Sprachen: {Sprache: Text-Stream}."""
+        if self.metrics is not None:
+            self.metrics.consume(self.iter_render_languages(sinks), sinks)
+            return
+        for lang, chunk in self.iter_render_languages(sinks):
+            sinks[lang].write(chunk)
+
+    def render_languages(self, languages: Iterable[str]) -> Dict[str, str]:
+        """Rendert alle angegebenen Sprachen in einem Durchlauf. Liefert {Sprache: LaTeX-Dokument}."""
+        sinks = {lang: io.StringIO() for lang in languages}
+        self.render_languages_to(sinks)
+        return {lang: sink.getvalue() for lang, sink in sinks.items()}
+
+    def iter_scene_blocks(self, languages: Iterable[str] = ()) -> Iterator[Tuple[Scene, Dict[str, List[str]]]]:
+        """
+        Liefert je Szene die gerenderten Zeilen als (Szene, {Sprache: Zeilen}).
+        Ohne languages gibt es einen Eintrag unter target_lang (wie bei render).
+        Alle Ausgabewege (render, render_languages, geteilte Ausgabe) rendern die
+        Szenen über diese Methode; parallel.ParallelRenderer ersetzt nur sie.
+        """
+        languages = list(languages)
+        metrics = self.metrics
         for scene in self.ast.scenes:
-            self.render_scene(scene)
-        self.output_lines.append("\\end{document}")
-        return "\n".join(self.output_lines)
+            start = time.perf_counter() if metrics is not None else 0.0
+            if languages:
+                blocks = self.render_scene_languages(scene, languages)
+            else:
+                blocks = {self.target_lang: self.capture(self.render_scene, scene)}
+            if metrics is not None:
+                metrics.add_scene(scene, time.perf_counter() - start)
+            yield scene, blocks
+
+    def render_master(self, fragments: List[str], include_only: Optional[List[str]] = None) -> str:
+        """
+        Master-Dokument der geteilten Ausgabe: die Präambel aus render_header, ein
+        \\includeonly (Standard: alle Fragmente) und ein \\include je Szenen-Fragment.
+        fragments sind Pfade relativ zum Master, ohne ".tex".
+        """
+        header = self.capture(self.render_header)
+        begin = header.index("\\begin{document}")
+        lines = header[:begin]
+        lines.append("\\includeonly{" + ",".join(fragments if include_only is None else include_only) + "}")
+        lines.extend(header[begin:])
+        lines.extend(f"\\include{{{name}}}" for name in fragments)
+        lines.append("\\end{document}")
+        return "\n".join(lines) + "\n"
+
+    def render_scene_languages(self, scene: Scene, languages) -> Dict[str, List[str]]:
+        # Sprachen mit Cache-Eintrag werden übernommen, nur die übrigen neu gerendert;
+        # die Ausgabe einer Sprache hängt nicht von den anderen ab.
+        cached: Dict[str, List[str]] = {}
+        if self.cache is not None:
+            version = self.scene_version(scene)
+            keys = {lang: self.cache.key(scene, lang, version) for lang in languages}
+            for lang, key in keys.items():
+                lines = self.cache.get(key)
+                if lines is not None:
+                    cached[lang] = lines
+            if len(cached) == len(keys):
+                return cached
+
+        outputs = {lang: [] for lang in languages if lang not in cached}
+        # Sprachunabhängige Zeilen seit dem letzten Slide
+        shared = [f"% Scene: {latex_comment(scene.title)}"]
+        for element in scene.elements:
+            if element.kind is not ElementKind.SLIDE:
+                shared.extend(self.capture(self.render_element, element))
+                continue
+            target = outputs.get(element.parameters.get("lang"))
+            if target is None:
+                continue  # Sprache wird nicht ausgegeben
+            for lines in outputs.values():
+                lines.extend(shared)
+            shared = []
+            # Über die Registry wie in render_element, damit registrierte Slide-Handler auch hier gelten
+            target.extend(self.capture(self.element_handler(element), self, element))
+        shared.append("")  # Trennung
+        for lines in outputs.values():
+            lines.extend(shared)
+
+        if self.cache is not None:
+            for lang, lines in outputs.items():
+                self.cache.put(keys[lang], lines)
+        outputs.update(cached)
+        return outputs
+
+    def capture(self, render_func, *args) -> List[str]:
+        """Führt eine render_*-Methode aus und liefert nur die dabei erzeugten Zeilen."""
+        saved = self.output_lines
+        self.output_lines = []
+        try:
+            render_func(*args)
+            return self.output_lines
+        finally:
+            self.output_lines = saved
 
     def render_header(self):
         header = self.ast.header
         self.output_lines.append("% Generierte LaTeX-Präsentation")
         self.output_lines.append("\\documentclass[aspectratio=169]{beamer}")
         self.output_lines.append("\\usepackage{thwsbeamertheme}")
-        self.output_lines.append(f"\\title{{{header.title}}}")
-        self.output_lines.append(f"\\author{{{header.author}}}")
+        if self.snippets is not None:
+            self.output_lines.extend(SNIPPET_PREAMBLE)
+        self.output_lines.append(f"\\title{{{escape_latex(header.title)}}}")
+        self.output_lines.append(f"\\author{{{escape_latex(header.author)}}}")
         self.output_lines.append("\\begin{document}")
         self.output_lines.append("\\begin{frame}")
         self.output_lines.append("\\titlepage")
@@ -34,276 +213,219 @@ class DSLRenderer:
         self.output_lines.append("")  # Trennung
 
     def render_scene(self, scene: Scene):
-        self.output_lines.append(f"% Scene: {scene.title}")
+        if self.cache is not None:
+            key = self.cache.key(scene, self.target_lang, self.scene_version(scene))
+            lines = self.cache.get(key)
+            if lines is None:
+                lines = self.capture(self._render_scene_uncached, scene)
+                self.cache.put(key, lines)
+            self.output_lines.extend(lines)
+        else:
+            self._render_scene_uncached(scene)
+
+    def _render_scene_uncached(self, scene: Scene):
+        self.output_lines.append(f"% Scene: {latex_comment(scene.title)}")
         for element in scene.elements:
             self.render_element(element)
         self.output_lines.append("")  # Trennung
 
+    def element_handler(self, element: Element) -> ElementHandler:
+        """Render-Funktion für ein Element aus element_renderers (siehe register_element)."""
+        handler = self.element_renderers.get(element.kind)
+        if handler is None:
+            # Nicht eingebauter Typ: evtl. über register_element ergänzt
+            handler = self.element_renderers.get(element.type.lower(), DSLRenderer.render_unknown_element)
+        return handler
+
     def render_element(self, element: Element):
-        t = element.type.lower()
-        if t == "slide":
-            # Überprüfe Sprache, wenn target_lang gesetzt ist:
-            lang = element.parameters.get("lang")
-            if self.target_lang and lang != self.target_lang:
-                return  # Dieses Slide wird nicht gerendert
+        # Slides anderer Sprachen schon hier auslassen, damit auch ein registrierter
+        # Slide-Handler nur die ausgegebenen Slides sieht (wie in render_scene_languages)
+        if (element.kind is ElementKind.SLIDE and self.target_lang
+                and element.parameters.get("lang") != self.target_lang):
+            return
+        self.element_handler(element)(self, element)
+
+    @classmethod
+    def register_element(cls, kind: Union[ElementKind, str]):
+        """
+        Decorator, der eine Render-Funktion für einen Elementtyp registriert, z.B.
+
+            @DSLRenderer.register_element("diagram")
+            def render_diagram(renderer, element):
+                renderer.output_lines.append(...)
+
+        Die Funktion erhält den Renderer und das Element und hängt ihre Zeilen an
+        renderer.output_lines an. Eingebaute Typen können so auch ersetzt werden; ein
+        Slide-Handler erhält nur Slides der gerade ausgegebenen Sprache.
+        Registrierungen an einer Unterklasse gelten nur für diese.
+        """
+        if isinstance(kind, str):
+            name = kind.lower()
+            kind = ELEMENT_KINDS.get(name, name)
+
+        def decorator(handler: ElementHandler) -> ElementHandler:
+            if "element_renderers" not in cls.__dict__:
+                cls.element_renderers = dict(cls.element_renderers)
+            cls.element_renderers[kind] = handler
+            return handler
+        return decorator
+
+    def render_slide_element(self, element: Element):
+        # Die Sprache ist bereits geprüft (render_element bzw. render_scene_languages);
+        # Renderzeit je Sprache, nur wenn gemessen wird
+        if self.metrics is None:
             self.render_slide(element)
-        elif t == "teleprompt":
-            # Escape ampersand in titles
-            title = element.parameters.get('title', 'Kein Titel').replace('&', '\\&')
-            self.output_lines.append(f"% TODO: Teleprompt-Element wird in LaTeX nicht dargestellt")
-            self.output_lines.append(f"% Titel: {title}")
-            pass
-        elif t == "code":
-            # Code-Elemente werden als Platzhalter dargestellt
-            self.render_code_placeholder(element)
-        elif t == "video" or t == "screencast":
-            # Video/Screencast-Elemente werden nicht in LaTeX gerendert
-            self.output_lines.append(f"% TODO: {t.capitalize()}-Element wird in LaTeX nicht dargestellt")
-            source = element.parameters.get('source', 'Keine Quelle angegeben').replace('&', '\\&')
-            self.output_lines.append(f"% Quelle: {source}")
-            pass
-        elif t == "quiz":
-            # Quiz-Elemente werden nicht in LaTeX gerendert
-            self.output_lines.append(f"% TODO: Quiz-Element wird in LaTeX nicht dargestellt")
-            name = element.parameters.get('name', 'Kein Name').replace('&', '\\&')
-            self.output_lines.append(f"% Name: {name}")
-            pass
-        # Button-Elemente werden komplett ignoriert (nicht in LaTeX einfügen, nicht einmal als Kommentar)
-        else:
-            # Unbekannte Elementtypen als Kommentar einfügen
-            self.output_lines.append(f"% Unbekanntes Element-Typ: {t}")
-            pass
+            return
+        start = time.perf_counter()
+        self.render_slide(element)
+        self.metrics.add_language(element.parameters.get("lang"), time.perf_counter() - start)
+
+    def render_teleprompt(self, element: Element):
+        # Kommentarzeilen werden nicht maskiert (siehe latex_comment)
+        title = latex_comment(element.parameters.get('title', 'Kein Titel'))
+        self.output_lines.append(f"% TODO: Teleprompt-Element wird in LaTeX nicht dargestellt")
+        self.output_lines.append(f"% Titel: {title}")
+
+    def render_media(self, element: Element):
+        # Video/Screencast-Elemente werden nicht in LaTeX gerendert
+        self.output_lines.append(f"% TODO: {element.kind.value.capitalize()}-Element wird in LaTeX nicht dargestellt")
+        source = latex_comment(self.asset_path(element.parameters.get('source', 'Keine Quelle angegeben')))
+        self.output_lines.append(f"% Quelle: {source}")
+
+    def render_quiz(self, element: Element):
+        # Quiz-Elemente werden nicht in LaTeX gerendert
+        self.output_lines.append(f"% TODO: Quiz-Element wird in LaTeX nicht dargestellt")
+        name = latex_comment(element.parameters.get('name', 'Kein Name'))
+        self.output_lines.append(f"% Name: {name}")
+
+    def render_unknown_element(self, element: Element):
+        # Unbekannte Elementtypen als Kommentar einfügen (auch Button-Elemente)
+        self.output_lines.append(f"% Unbekanntes Element-Typ: {latex_comment(element.type.lower())}")
+
+    def asset_path(self, source: str) -> str:
+        """Pfad einer Bild- oder Mediendatei in der Ausgabe (bereitgestellt oder wie angegeben)."""
+        return self.assets.get(source, source)
 
     def apply_markdown_formatting(self, text: str) -> str:
-        # First remove all [!name] patterns
-        text = re.sub(r'\[![\w:,-]+\]', '', text)
-        
-        # Then apply standard markdown formatting
-        # **Text** -> \textbf{Text}
-        text = re.sub(r'\*\*(.+?)\*\*', r'\\textbf{\1}', text)
-        # *Text* -> \textit{Text}
-        text = re.sub(r'\*(.+?)\*', r'\\textit{\1}', text)
-        
-        # Escape ampersands
-        text = text.replace('&', '\\&')
-        
-        return text
+        # Marker entfernen, **fett**/*kursiv*/`Code` umsetzen und LaTeX maskieren (ein Durchlauf)
+        if self.snippets is not None and "[!line:" in text:
+            # [!line:snippet-label] wird zur Zeilennummer im Snippet
+            text = LINE_REFERENCE_PATTERN.sub(self._line_number, text)
+        return format_inline(text)
+
+    def _line_number(self, match) -> str:
+        line = self.snippets.line(match.group(1), match.group(2))
+        return match.group() if line is None else str(line)
+
+    def render_code(self, element: Element):
+        """Rendert ein Code-Element als Folie mit seinem Snippet (ohne Snippet: Platzhalter)."""
+        name = element.parameters.get("snippet")
+        snippet = self.snippets.get(name) if self.snippets is not None and name else None
+        if snippet is None:
+            self.render_code_placeholder(element)
+            return
+        self.output_lines.append("\\begin{frame}[fragile]")
+        self.output_lines.append("  \\frametitle{Code: " + escape_latex(name) + "}")
+        self.render_snippet(snippet, "  ")
+        self.output_lines.append("\\end{frame}")
+
+    def render_snippet(self, snippet: Snippet, indent: str):
+        # Verbatim übernimmt Leerzeichen wörtlich: Code-Zeilen und \end{Verbatim} ohne Einrückung
+        self.output_lines.append(indent + "\\begin{Verbatim}[commandchars=\\\\\\{\\},numbers=left,"
+                                          "fontsize=\\small,frame=single]")
+        self.output_lines.extend(snippet.lines)
+        self.output_lines.append("\\end{Verbatim}")
+
+    def render_placeholder_box(self, indent: str):
+        self.output_lines.append(f"{indent}\\begin{{center}}")
+        self.output_lines.append(f"{indent}  \\colorbox{{gray!20}}{{\\begin{{minipage}}{{0.9\\textwidth}}")
+        self.output_lines.append(f"{indent}    \\vspace{{1em}}")
+        self.output_lines.append(f"{indent}    \\centering")
+        self.output_lines.append(f"{indent}    \\textbf{{Code-Snippet not implemented}}")
+        self.output_lines.append(f"{indent}    \\vspace{{1em}}")
+        self.output_lines.append(f"{indent}  \\end{{minipage}}}}")
+        self.output_lines.append(f"{indent}\\end{{center}}")
 
     def render_code_placeholder(self, element: Element):
         """Rendert einen Platzhalter für Code-Elemente"""
-        snippet_name = element.parameters.get("snippet", "Code").replace('&', '\\&')
+        snippet_name = escape_latex(element.parameters.get("snippet", "Code"))
         self.output_lines.append("\\begin{frame}[fragile]")
         self.output_lines.append("  \\frametitle{Code: " + snippet_name + "}")
         
         # Grauer Box mit "not available now" Text
-        self.output_lines.append("  \\begin{center}")
-        self.output_lines.append("    \\colorbox{gray!20}{\\begin{minipage}{0.9\\textwidth}")
-        self.output_lines.append("      \\vspace{1em}")
-        self.output_lines.append("      \\centering")
-        self.output_lines.append("      \\textbf{Code-Snippet not implemented}")
-        self.output_lines.append("      \\vspace{1em}")
-        self.output_lines.append("    \\end{minipage}}")
-        self.output_lines.append("  \\end{center}")
+        self.render_placeholder_box("  ")
         
         self.output_lines.append("\\end{frame}")
 
     def render_slide(self, element: Element):
-        title = element.parameters.get("title", "Slide").replace('&', '\\&')
+        layout = lower_slide(element)
         self.output_lines.append("\\begin{frame}[fragile]")
-        self.output_lines.append(f"  \\frametitle{{{title}}}")
+        self.output_lines.append(f"  \\frametitle{{{escape_latex(layout.title)}}}")
         self.output_lines.append("  % Slide content:")
-        
-        # Prüfe, ob die Folie Spalten enthält
-        lines = element.content.splitlines()
-        columns = []
-        column_widths = []
-        
-        # Erste Prüfung auf Columns
-        for line in lines:
-            if line.lstrip().startswith("### column") or line.lstrip().startswith("### Column"):
-                # Spalte gefunden
-                width_match = re.search(r'width\s*=\s*(\d+)', line, re.IGNORECASE)
-                if width_match:
-                    columns.append(line)
-                    column_widths.append(int(width_match.group(1)))
-        
-        # Wenn mehr als eine Spalte gefunden wurde, verarbeite sie speziell
-        if len(columns) >= 2:
-            # Berechne proportionale Breiten
-            total_width = sum(column_widths)
-            proportional_widths = [w / total_width for w in column_widths]
-            
-            # Sammle Inhalt für jede Spalte
-            column_contents = [[] for _ in range(len(columns))]
-            current_column_idx = -1
-            
-            for line in lines:
-                # Neue Spalte beginnt
-                if line.lstrip().startswith("### column") or line.lstrip().startswith("### Column"):
-                    current_column_idx += 1
-                    continue
-                
-                # Wenn wir in einer Spalte sind, sammeln wir den Inhalt
-                if current_column_idx >= 0 and current_column_idx < len(column_contents):
-                    column_contents[current_column_idx].append(line)
-            
-            # Starte die Spaltendefinition mit Top-Alignment
-            self.output_lines.append("  \\begin{columns}[t]")
-            
-            # Jetzt rendern wir jede Spalte
-            for idx, content in enumerate(column_contents):
-                width_percentage = proportional_widths[idx]
-                self.output_lines.append(f"  \\begin{{column}}{{.{int(width_percentage * 100)}\\textwidth}}")
-                
-                # Verarbeite den Inhalt dieser Spalte
-                in_itemize = False
-                for line in content:
-                    # Ignoriere Button- und andere spezielle Zeilen
-                    if line.lstrip().startswith("###") and "Button" in line:
-                        continue
-                        
-                    # Code-Box für "### Code" Zeilen einfügen
-                    if line.lstrip().startswith("###") and "Code" in line:
-                        # Schließe vorherige Itemize-Umgebung wenn nötig
-                        if in_itemize:
-                            self.output_lines.append("    \\end{itemize}")
-                            in_itemize = False
-                        
-                        # Füge Code-Box ein
-                        self.output_lines.append("    \\begin{center}")
-                        self.output_lines.append("      \\colorbox{gray!20}{\\begin{minipage}{0.9\\textwidth}")
-                        self.output_lines.append("        \\vspace{1em}")
-                        self.output_lines.append("        \\centering")
-                        self.output_lines.append("        \\textbf{Code-Snippet not implemented}")
-                        self.output_lines.append("        \\vspace{1em}")
-                        self.output_lines.append("      \\end{minipage}}")
-                        self.output_lines.append("    \\end{center}")
-                        continue
-                        
-                    # Bilder einfügen
-                    if line.lstrip().startswith("###") and "Image" in line:
-                        # Quelle des Bildes extrahieren
-                        source_match = re.search(r'source\s*=\s*[\'"](.*?)[\'"]', line)
-                        if source_match:
-                            image_source = source_match.group(1)
-                            # Schließe vorherige Itemize-Umgebung wenn nötig
-                            if in_itemize:
-                                self.output_lines.append("    \\end{itemize}")
-                                in_itemize = False
-                            
-                            # Füge Bild ein
-                            self.output_lines.append("    \\begin{center}")
-                            self.output_lines.append(f"      \\includegraphics[width=0.7\\textwidth]{{{image_source}}}")
-                            self.output_lines.append("    \\end{center}")
-                        continue
-                        
-                    # Aufzählungspunkte - entweder mit direktem "-" Start oder mit "[!bullet]" Präfix
-                    if line.lstrip().startswith("-") or re.search(r'\[![\w:,-]+\]\s*-', line):
-                        # Entferne [!bullet] falls vorhanden
-                        if "[!" in line:
-                            bullet_text = re.sub(r'\[![\w:,-]+\]\s*-', '', line.lstrip()).strip()
-                        else:
-                            bullet_text = line.lstrip()[1:].strip()
-                        
-                        bullet_text = self.apply_markdown_formatting(bullet_text)
-                        if not in_itemize:
-                            self.output_lines.append("    \\begin{itemize}")
-                            in_itemize = True
-                        self.output_lines.append(f"      \\item {bullet_text}")
-                    else:
-                        # Schließe itemize wenn nötig
-                        if in_itemize:
-                            self.output_lines.append("    \\end{itemize}")
-                            in_itemize = False
-                        
-                        # Verarbeite andere Inhalte
-                        formatted_line = self.apply_markdown_formatting(line)
-                        if formatted_line.strip() == "":
-                            self.output_lines.append("    \\vspace{1em}")
-                        else:
-                            self.output_lines.append(f"    {formatted_line}")
-                
-                # Schließe letzte itemize-Umgebung falls nötig
-                if in_itemize:
-                    self.output_lines.append("    \\end{itemize}")
-                    
-                # Schließe die Spalte
-                self.output_lines.append("  \\end{column}")
-            
-            # Schließe die Spalten-Umgebung
-            self.output_lines.append("  \\end{columns}")
-        
-        # Keine Spalten gefunden oder nur eine Spalte - normales Rendering
-        else:
-            in_itemize = False
-            for line_idx, line in enumerate(lines):
-                # Ignoriere Button-Zeilen und Column-Definitionen
-                if (line.lstrip().startswith("###") and "Button" in line) or \
-                   (line.lstrip().startswith("###") and ("column" in line.lower() or "Column" in line)):
-                    continue
-                    
-                # Bilder einfügen
-                if line.lstrip().startswith("###") and "Image" in line:
-                    # Quelle des Bildes extrahieren
-                    source_match = re.search(r'source\s*=\s*[\'"](.*?)[\'"]', line)
-                    if source_match:
-                        image_source = source_match.group(1)
-                        # Schließe vorherige Itemize-Umgebung wenn nötig
-                        if in_itemize:
-                            self.output_lines.append("  \\end{itemize}")
-                            in_itemize = False
-                        
-                        # Füge Bild ein
-                        self.output_lines.append("  \\begin{center}")
-                        self.output_lines.append(f"    \\includegraphics[width=0.7\\textwidth]{{{image_source}}}")
-                        self.output_lines.append("  \\end{center}")
-                    continue
-                    
-                # Code-Box für "### Code" Zeilen einfügen
-                if line.lstrip().startswith("###") and "Code" in line:
-                    # Schließe vorherige Itemize-Umgebung wenn nötig
-                    if in_itemize:
-                        self.output_lines.append("  \\end{itemize}")
-                        in_itemize = False
-                    
-                    # Füge Code-Box ein
-                    self.output_lines.append("  \\begin{center}")
-                    self.output_lines.append("    \\colorbox{gray!20}{\\begin{minipage}{0.9\\textwidth}")
-                    self.output_lines.append("      \\vspace{1em}")
-                    self.output_lines.append("      \\centering")
-                    self.output_lines.append("      \\textbf{Code-Snippet not implemented}")
-                    self.output_lines.append("      \\vspace{1em}")
-                    self.output_lines.append("    \\end{minipage}}")
-                    self.output_lines.append("  \\end{center}")
-                    continue
-                
-                # Aufzählungspunkte - mit direktem "-" Start oder mit "[!bullet]" Präfix
-                if line.lstrip().startswith("-") or re.search(r'\[![\w:,-]+\]\s*-', line):
-                    # Entferne [!bullet] falls vorhanden
-                    if "[!" in line:
-                        bullet_text = re.sub(r'\[![\w:,-]+\]\s*-', '', line.lstrip()).strip()
-                    else:
-                        bullet_text = line.lstrip()[1:].strip()
-                    
-                    bullet_text = self.apply_markdown_formatting(bullet_text)
-                    if not in_itemize:
-                        self.output_lines.append("  \\begin{itemize}")
-                        in_itemize = True
-                    self.output_lines.append(f"    \\item {bullet_text}")
-                # Leere Zeilen oder andere Inhalte
-                else:
-                    if in_itemize:
-                        self.output_lines.append("  \\end{itemize}")
-                        in_itemize = False
-                    
-                    formatted_line = self.apply_markdown_formatting(line)
-                    if formatted_line.strip() == "":
-                        # Vollständige Leerzeile einfügen (statt eines kleinen Abstands)
-                        self.output_lines.append("  \\vspace{1em}")
-                    else:
-                        self.output_lines.append(f"  {formatted_line}")
-            
-            if in_itemize:
-                self.output_lines.append("  \\end{itemize}")
-        
+        self.render_blocks(layout.blocks, "  ")
         self.output_lines.append("\\end{frame}")
+
+    def render_blocks(self, blocks: Iterable[Block], indent: str):
+        """LaTeX-Backend der Layout-Zwischendarstellung (siehe layout.py)."""
+        renderers = self.block_renderers
+        for block in blocks:
+            renderers[type(block)](self, block, indent)
+
+    def render_paragraph(self, block: Paragraph, indent: str):
+        formatted_line = self.apply_markdown_formatting(block.text)
+        if formatted_line.strip() == "":
+            # Vollständige Leerzeile einfügen (statt eines kleinen Abstands)
+            self.output_lines.append(f"{indent}\\vspace{{1em}}")
+        else:
+            self.output_lines.append(f"{indent}{formatted_line}")
+
+    def render_item_list(self, block: ItemList, indent: str):
+        self.output_lines.append(f"{indent}\\begin{{itemize}}")
+        for item in block.items:
+            self.output_lines.append(f"{indent}  \\item {self.apply_markdown_formatting(item)}")
+        self.output_lines.append(f"{indent}\\end{{itemize}}")
+
+    def render_image(self, block: Image, indent: str):
+        self.output_lines.append(f"{indent}\\begin{{center}}")
+        self.output_lines.append(f"{indent}  \\includegraphics[width=0.7\\textwidth]{{{self.asset_path(block.source)}}}")
+        self.output_lines.append(f"{indent}\\end{{center}}")
+
+    def render_code_block(self, block: CodeBlock, indent: str):
+        # Snippet oder, ohne SnippetStore bzw. Datei, ein grauer Platzhalter
+        snippet = self.snippets.get(block.snippet) if self.snippets is not None and block.snippet else None
+        if snippet is not None:
+            self.render_snippet(snippet, indent)
+        else:
+            self.render_placeholder_box(indent)
+
+    def render_button(self, block: Button, indent: str):
+        pass  # Buttons sind interaktiv und erscheinen nicht in LaTeX
+
+    def render_columns(self, block: Columns, indent: str):
+        # Spalten mit Top-Alignment und proportionalen Breiten
+        self.output_lines.append(f"{indent}\\begin{{columns}}[t]")
+        for column in block.columns:
+            self.output_lines.append(f"{indent}\\begin{{column}}{{.{int(column.width * 100)}\\textwidth}}")
+            self.render_blocks(column.blocks, indent + "  ")
+            self.output_lines.append(f"{indent}\\end{{column}}")
+        self.output_lines.append(f"{indent}\\end{{columns}}")
+
+    # Blocktyp der Zwischendarstellung -> LaTeX-Render-Funktion (renderer, block, Einrückung)
+    block_renderers: Dict[type, Callable[["DSLRenderer", Block, str], None]] = {
+        Paragraph: render_paragraph,
+        ItemList: render_item_list,
+        Image: render_image,
+        CodeBlock: render_code_block,
+        Button: render_button,
+        Columns: render_columns,
+    }
+
+    # Elementtyp -> Render-Funktion (ElementKind bzw. kleingeschriebener Typname)
+    element_renderers: Dict[Union[ElementKind, str], ElementHandler] = {
+        ElementKind.SLIDE: render_slide_element,
+        ElementKind.TELEPROMPT: render_teleprompt,
+        ElementKind.CODE: render_code,
+        ElementKind.VIDEO: render_media,
+        ElementKind.SCREENCAST: render_media,
+        ElementKind.QUIZ: render_quiz,
+    }
@@ -0,0 +1,482 @@
+# vmd_interpreter/server.py
+
+import argparse
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .build import BuildError, collect_languages
+from .cache import scene_source
+from .dsl_ast import AST, Scene
+from .html_renderer import HTMLRenderer
+from .parser import DSLParser
+from .renderer import RENDERER_VERSION, DSLRenderer
+
+# Vorschau-/Render-Server für Review-Werkzeuge: statt für jede Anfrage
+# "python -m vmd_interpreter.main" zu starten und die .tex-Datei zurückzulesen,
+# hält der Server geparste Dokumente im Speicher und liefert Dokumente, einzelne
+# Szenen und Sprachausgaben per HTTP, jeweils mit ETag und bedingtem GET.
+#
+#   GET /render/<pfad.vmd>[?lang=EN][&scene=N][&format=tex|html]
+#   GET /scenes/<pfad.vmd>     Szenenliste (JSON)
+#   GET /stats                 Cache-Zähler (JSON)
+#
+# Pfade sind relativ zum Wurzelverzeichnis des Servers. Der Server lauscht nur auf
+# Loopback-Adressen und beantwortet nur Anfragen, deren Host-Kopfzeile localhost
+# oder eine Loopback-Adresse nennt.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+AST_CACHE_SIZE = 32                         # geparste Dateien
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024     # gerenderte Antworten, nach ETag
+SCENE_CACHE_SIZE = 16384                    # gerenderte LaTeX-Szenen
+MAX_HEADER_BYTES = 64 * 1024
+
+CONTENT_TYPES = {
+    "tex": "text/x-tex; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "json": "application/json",
+    "text": "text/plain; charset=utf-8",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def is_local_host_header(value: Optional[str]) -> bool:
+    """
+    Prüft die Host-Kopfzeile ("localhost:8765", "127.0.0.1", "[::1]:8765"). Nur
+    Loopback-Namen sind erlaubt: sonst könnte eine fremde Webseite per DNS-Rebinding
+    (ihr Name zeigt plötzlich auf 127.0.0.1) Dateien unter der Wurzel lesen.
+    """
+    if not value:
+        return False
+    host = value.strip()
+    if host.startswith("["):
+        end = host.find("]")
+        if end < 0:
+            return False
+        host = host[1:end]
+    elif host.count(":") == 1:
+        host = host.split(":")[0]
+    return is_loopback(host.lower().rstrip("."))
+
+
+@dataclass
+class Document:
+    """Geparste .vmd-Datei, adressiert über den Hash ihres Inhalts."""
+    digest: str
+    ast: AST
+    languages: List[str]
+    scene_digests: List[str]        # Hash des Quelltexts je Szene (cache.scene_source)
+    error: Optional[str] = None     # z.B. Slide ohne lang-Attribut
+    _etags: Dict[Tuple, str] = field(default_factory=dict)
+
+    def etag(self, fmt: str, lang: Optional[str], scene: Optional[int]) -> str:
+        """
+        ETag einer Ausgabe. Eine Szene hängt nur von ihrem Quelltext, der Sprache und
+        dem Format ab; Änderungen an anderen Szenen lassen ihr ETag unverändert.
+        """
+        key = (fmt, lang, scene)
+        tag = self._etags.get(key)
+        if tag is None:
+            digest = hashlib.sha256(f"{RENDERER_VERSION}\0{fmt}\0{lang or ''}\0".encode("utf-8"))
+            if scene is None:
+                header = self.ast.header
+                digest.update(f"{header.title}\0{header.author}\0".encode("utf-8"))
+                digest.update("".join(self.scene_digests).encode("ascii"))
+            else:
+                digest.update(self.scene_digests[scene].encode("ascii"))
+            tag = self._etags[key] = f'"{digest.hexdigest()[:32]}"'
+        return tag
+
+
+class SceneMemo:
+    """
+    Speicher-Cache für gerenderte LaTeX-Szenen mit der Schnittstelle von RenderCache
+    (key/get/put). Nach einer Änderung rendert ein neues Dokument nur die geänderten
+    Szenen. Wird aus den Render-Threads benutzt, daher mit Sperre.
+    """
+
+    def __init__(self, max_entries: int = SCENE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, scene: Scene, target_lang: Optional[str], version: str) -> str:
+        digest = hashlib.sha256(f"{version}\0{target_lang or ''}\0".encode("utf-8"))
+        digest.update(scene_source(scene).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return lines
+
+    def put(self, key: str, lines: List[str]):
+        with self._lock:
+            self._entries[key] = lines
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def parse_document(content: bytes, digest: str, name: str) -> Document:
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Error reading file: {e}") from e
+    ast = DSLParser(text).parse()
+    scene_digests = [hashlib.sha256(scene_source(scene).encode("utf-8")).hexdigest() for scene in ast.scenes]
+    try:
+        return Document(digest, ast, sorted(collect_languages(ast, name)), scene_digests)
+    except BuildError as e:
+        return Document(digest, ast, [], scene_digests, error=str(e))
+
+
+def render_output(document: Document, fmt: str, lang: Optional[str], scene: Optional[int],
+                  scenes: SceneMemo) -> bytes:
+    """Rendert ein Dokument bzw. eine Szene (ohne Seitenrahmen) für eine Sprache."""
+    ast = document.ast
+    if fmt == "html":
+        renderer = HTMLRenderer(ast, target_lang=lang)
+        if scene is None:
+            return renderer.render().encode("utf-8")
+        return ("\n".join(renderer.capture(renderer.render_scene, ast.scenes[scene])) + "\n").encode("utf-8")
+    renderer = DSLRenderer(ast, target_lang=lang, cache=scenes)
+    if scene is None:
+        return renderer.render().encode("utf-8")
+    return ("\n".join(renderer.capture(renderer.render_scene, ast.scenes[scene])) + "\n").encode("utf-8")
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Schwache Validatoren (W/"...") gelten beim bedingten GET als gleich
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+class PreviewServer:
+    """
+    HTTP/1.1-Server auf asyncio (mit Keep-Alive). Geparste Dokumente liegen in einem
+    LRU-Cache nach Inhalts-Hash, gerenderte Antworten in einem LRU-Cache nach ETag.
+    Lesen, Parsen und Rendern laufen in einem Thread-Pool, damit die Ereignisschleife
+    währenddessen bedingte und bereits gerenderte Anfragen beantwortet; gleiche
+    Render-Aufträge gleichzeitiger Anfragen werden nur einmal ausgeführt.
+    """
+
+    def __init__(self, root: str = ".", workers: int = DEFAULT_WORKERS,
+                 ast_cache_size: int = AST_CACHE_SIZE, response_cache_bytes: int = RESPONSE_CACHE_BYTES):
+        self.root = os.path.realpath(root)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="vmd-render")
+        self.ast_cache_size = ast_cache_size
+        self.response_cache_bytes = response_cache_bytes
+        self.scenes = SceneMemo()
+        # Inhalts-Hash -> Dokument
+        self._documents: "OrderedDict[str, Document]" = OrderedDict()
+        # Pfad -> (Größe, mtime in ns, Inhalts-Hash); erspart das Lesen unveränderter Dateien
+        self._stats: Dict[str, Tuple[int, int, str]] = {}
+        # ETag -> (Content-Type, Inhalt)
+        self._responses: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._response_bytes = 0
+        # Laufende Aufträge im Thread-Pool, damit gleiche Anfragen sie teilen
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self.counters = {"requests": 0, "not_modified": 0, "parsed": 0, "rendered": 0,
+                         "ast_hits": 0, "response_hits": 0}
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Startet den Server; mit port=0 wählt das System einen freien Port (siehe self.port)."""
+        if not is_loopback(host):
+            raise ValueError(f"refusing to listen on non-loopback address {host}")
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    def close(self):
+        if sys.version_info >= (3, 9):
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        else:  # cancel_futures erst ab Python 3.9: wartende Aufträge laufen noch aus
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, key: Tuple, func, *args):
+        """Führt func im Thread-Pool aus; gleichzeitige Aufrufe mit gleichem key teilen sich das Ergebnis."""
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            self._pending[key] = future
+            future.add_done_callback(lambda _future: self._pending.pop(key, None))
+        # Bricht ein Client ab, läuft der gemeinsame Auftrag für die anderen weiter
+        return await asyncio.shield(future)
+
+    def resolve(self, relative: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, unquote(relative)))
+        if os.path.commonpath([self.root, path]) != self.root or not path.endswith(".vmd"):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"not a .vmd file below the server root: {relative}")
+        return path
+
+    async def document(self, path: str) -> Document:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no such file: {os.path.relpath(path, self.root)}")
+        known = self._stats.get(path)
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            document = self._documents.get(known[2])
+            if document is not None:
+                self._documents.move_to_end(known[2])
+                self.counters["ast_hits"] += 1
+                return document
+
+        try:
+            content = await self._run(("read", path), _read_bytes, path)
+        except OSError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Error reading file: {e}") from e
+        digest = hashlib.sha256(content).hexdigest()
+        self._stats[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        document = self._documents.get(digest)
+        if document is not None:
+            # Gleicher Inhalt (z.B. nur touch oder eine Kopie): AST wiederverwenden
+            self._documents.move_to_end(digest)
+            self.counters["ast_hits"] += 1
+            return document
+        document = await self._run(("parse", digest), parse_document, content, digest,
+                                  os.path.relpath(path, self.root))
+        if digest not in self._documents:
+            self.counters["parsed"] += 1
+            self._documents[digest] = document
+            while len(self._documents) > self.ast_cache_size:
+                self._documents.popitem(last=False)
+        return document
+
+    async def render(self, document: Document, fmt: str, lang: Optional[str], scene: Optional[int],
+                     etag: str) -> bytes:
+        cached = self._responses.get(etag)
+        if cached is not None:
+            self._responses.move_to_end(etag)
+            self.counters["response_hits"] += 1
+            return cached[1]
+        body = await self._run(("render", etag), render_output, document, fmt, lang, scene, self.scenes)
+        if etag not in self._responses:
+            self.counters["rendered"] += 1
+            self._store(etag, CONTENT_TYPES[fmt], body)
+        return body
+
+    def _store(self, etag: str, content_type: str, body: bytes):
+        if len(body) > self.response_cache_bytes:
+            return
+        self._responses[etag] = (content_type, body)
+        self._response_bytes += len(body)
+        while self._response_bytes > self.response_cache_bytes:
+            _etag, (_type, old) = self._responses.popitem(last=False)
+            self._response_bytes -= len(old)
+
+    async def respond(self, method: str, target: str,
+                      headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Beantwortet eine Anfrage: (Status, Kopfzeilen, Inhalt)."""
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"method {method} not allowed")
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route, _, relative = url.path.lstrip("/").partition("/")
+
+        if route == "stats" and not relative:
+            body = json.dumps(self.stats(), indent=2).encode("utf-8")
+            return HTTPStatus.OK, {"Content-Type": CONTENT_TYPES["json"], "Cache-Control": "no-store"}, body
+        if route not in ("render", "scenes"):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown path {url.path}")
+
+        document = await self.document(self.resolve(relative))
+        if route == "scenes":
+            etag = f'"{document.digest[:32]}"'
+            if _matches(headers.get("if-none-match"), etag):
+                return HTTPStatus.NOT_MODIFIED, {"ETag": etag}, b""
+            body = json.dumps({
+                "title": document.ast.header.title,
+                "languages": document.languages,
+                "scenes": [{"index": index, "title": scene.title, "digest": digest[:32]}
+                           for index, (scene, digest) in enumerate(zip(document.ast.scenes,
+                                                                       document.scene_digests))],
+            }, indent=2).encode("utf-8")
+            return HTTPStatus.OK, {"Content-Type": CONTENT_TYPES["json"], "ETag": etag}, body
+
+        fmt = query.get("format", "tex")
+        if fmt not in ("tex", "html"):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"unknown format {fmt} (expected tex or html)")
+        if document.error is not None:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, document.error)
+        lang = query.get("lang")
+        if lang is not None and lang not in document.languages:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown language {lang} "
+                                                  f"(available: {', '.join(document.languages) or '-'})")
+        scene = query.get("scene")
+        if scene is not None:
+            if not scene.isdigit() or int(scene) >= len(document.ast.scenes):
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"no scene {scene} "
+                                                      f"(document has {len(document.ast.scenes)})")
+            scene = int(scene)
+
+        etag = document.etag(fmt, lang, scene)
+        if _matches(headers.get("if-none-match"), etag):
+            self.counters["not_modified"] += 1
+            return HTTPStatus.NOT_MODIFIED, {"ETag": etag}, b""
+        body = await self.render(document, fmt, lang, scene, etag)
+        return HTTPStatus.OK, {"Content-Type": CONTENT_TYPES[fmt], "ETag": etag}, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                {"Content-Type": CONTENT_TYPES["text"]}, b"request header too large\n", False)
+                    await writer.drain()
+                    break
+                keep_alive = await self._handle_request(head, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head: bytes, writer: asyncio.StreamWriter) -> bool:
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            self._write(writer, HTTPStatus.BAD_REQUEST, {"Content-Type": CONTENT_TYPES["text"]},
+                        b"malformed request line\n", False)
+            return False
+        method, target, version = parts
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+            keep_alive = False  # Anfragen mit Inhalt werden nicht unterstützt
+
+        self.counters["requests"] += 1
+        try:
+            if not is_local_host_header(headers.get("host")):
+                raise HTTPError(HTTPStatus.FORBIDDEN, "Host header must name localhost or a loopback address")
+            status, response_headers, body = await self.respond(method, target, headers)
+        except HTTPError as e:
+            status, response_headers, body = e.status, {"Content-Type": CONTENT_TYPES["text"]}, \
+                (e.message + "\n").encode("utf-8")
+        except Exception as e:  # Fehler beim Parsen/Rendern: Server läuft weiter
+            status, response_headers, body = HTTPStatus.INTERNAL_SERVER_ERROR, \
+                {"Content-Type": CONTENT_TYPES["text"]}, f"Error: {e}\n".encode("utf-8")
+        if "ETag" in response_headers:
+            # Clients sollen vor jeder Verwendung nachfragen (bedingtes GET)
+            response_headers.setdefault("Cache-Control", "no-cache")
+        self._write(writer, status, response_headers, b"" if method == "HEAD" else body, keep_alive,
+                    len(body))
+        return keep_alive
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes,
+               keep_alive: bool, length: Optional[int] = None):
+        lines = [f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if status != HTTPStatus.NOT_MODIFIED:
+            lines.append(f"Content-Length: {len(body) if length is None else length}")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    def stats(self) -> dict:
+        return dict(self.counters, documents=len(self._documents), responses=len(self._responses),
+                    response_bytes=self._response_bytes, scene_hits=self.scenes.hits,
+                    scene_misses=self.scenes.misses)
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def serve(root: str = ".", host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS):
+    """Startet den Server und bedient Anfragen bis Strg+C."""
+    preview = PreviewServer(root, workers=workers)
+
+    async def run():
+        server = await preview.start(host, port)
+        print(f"Serving {preview.root} on http://{host}:{preview.port}/ (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Server stopped")
+    finally:
+        preview.close()
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m vmd_interpreter.main serve",
+        description="Lokaler HTTP-Server, der .vmd-Dateien unterhalb von root auf Anfrage rendert: "
+                    "/render/<pfad.vmd>?lang=EN&scene=N&format=tex|html, /scenes/<pfad.vmd>, /stats"
+    )
+    arg_parser.add_argument("root", nargs="?", default=".",
+                            help="Verzeichnis, dessen .vmd-Dateien ausgeliefert werden (Standard: .)")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST,
+                            help=f"Loopback-Adresse (Standard: {DEFAULT_HOST}); andere Adressen werden abgelehnt")
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                            help=f"Port (Standard: {DEFAULT_PORT}, 0: freier Port)")
+    arg_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                            help=f"Threads zum Lesen, Parsen und Rendern (Standard: {DEFAULT_WORKERS})")
+    return arg_parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not is_loopback(args.host):
+        print(f"Error: --host must be a loopback address (e.g. {DEFAULT_HOST}), got {args.host}")
+        sys.exit(1)
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory")
+        sys.exit(1)
+    serve(args.root, args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
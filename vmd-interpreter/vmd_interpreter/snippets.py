@@ -0,0 +1,372 @@
+# vmd_interpreter/snippets.py
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .cache import SNIPPET_DIR, record_size
+from .dsl_ast import AST, ElementKind, Scene, SourceSpan
+from .symbols import SNIPPET, Diagnostic, SymbolIndex, content_span
+from .tokenizer import parse_parameters
+
+# Muss erhöht werden, sobald sich die Hervorhebung ändert (macht den Snippet-Cache ungültig).
+SNIPPET_VERSION = "2"
+
+# Code-Zeile im Slide-Inhalt: ### Code (snippet="name")
+CODE_LINE_PATTERN = re.compile(r'###[ \t]*Code\b[ \t]*(?:\((.*)\))?')
+# Zeilenverweis im Text: [!line:snippet-label]
+LINE_REFERENCE_PATTERN = re.compile(r'\[!line:(\w+)-(\w+)\]')
+# Zeilenmarke im Snippet, samt unmittelbar davorstehendem Kommentarzeichen:
+#   return greeting;  // [!label:return]
+# Steht die Marke allein in einer Zeile, gilt sie für die nächste Zeile.
+LABEL_PATTERN = re.compile(r'[ \t]*(?:#|//|--|/\*)?[ \t]*\[!label:(\w+)\][ \t]*(?:\*/)?')
+
+# Präambel für hervorgehobene Snippets (fancyvrb mit Befehlszeichen, wie bei minted)
+SNIPPET_PREAMBLE = [
+    "\\usepackage{fancyvrb}",
+    "\\newcommand{\\VmdKeyword}[1]{\\textcolor{blue!70!black}{\\textbf{#1}}}",
+    "\\newcommand{\\VmdString}[1]{\\textcolor{red!60!black}{#1}}",
+    "\\newcommand{\\VmdComment}[1]{\\textcolor{gray}{\\textit{#1}}}",
+    "\\newcommand{\\VmdNumber}[1]{\\textcolor{orange!80!black}{#1}}",
+    "\\newcommand{\\VmdBs}{\\char`\\\\}",
+    "\\newcommand{\\VmdOb}{\\char`\\{}",
+    "\\newcommand{\\VmdCb}{\\char`\\}}",
+]
+
+# Innerhalb von Verbatim[commandchars=\\\{\}] sind nur diese Zeichen besonders
+VERBATIM_ESCAPES = {"\\": "\\VmdBs{}", "{": "\\VmdOb{}", "}": "\\VmdCb{}"}
+VERBATIM_ESCAPE_PATTERN = re.compile(r'[\\{}]')
+TOKEN_MACROS = {"comment": "\\VmdComment", "string": "\\VmdString", "number": "\\VmdNumber"}
+
+
+class Language(NamedTuple):
+    name: str
+    keywords: frozenset
+    pattern: str    # Quelltext der Regex; erst beim Hervorheben übersetzt (re-Cache)
+
+
+def _language(name: str, keywords: str, line_comment: str = "//", block_comments: bool = True,
+              triple_quotes: bool = False, template_strings: bool = False) -> Language:
+    comments = [re.escape(line_comment) + r'[^\n]*']
+    if block_comments:
+        comments.append(r'/\*[\s\S]*?\*/')
+    strings = []
+    if triple_quotes:
+        strings += [r'"""[\s\S]*?"""', r"'''[\s\S]*?'''"]
+    strings += [r'"(?:[^"\\\n]|\\.)*"', r"'(?:[^'\\\n]|\\.)*'"]
+    if template_strings:
+        strings.append(r'`(?:[^`\\]|\\.)*`')
+    pattern = (
+        f'(?P<comment>{"|".join(comments)})'
+        f'|(?P<string>{"|".join(strings)})'
+        r'|(?P<number>\b\d[\w.]*)'
+        r'|(?P<word>[A-Za-z_$][\w$]*)'
+    )
+    return Language(name, frozenset(keywords.split()), pattern)
+
+
+_C_KEYWORDS = ("auto break case char const continue default do double else enum extern float for goto if "
+               "inline int long register return short signed sizeof static struct switch typedef union "
+               "unsigned void volatile while")
+_JS_KEYWORDS = ("async await break case catch class const continue debugger default delete do else export "
+                "extends false finally for function if import in instanceof let new null of return static "
+                "super switch this throw true try typeof undefined var void while yield")
+
+LANGUAGES: Dict[str, Language] = {
+    "python": _language("python", "and as assert async await break class continue def del elif else except "
+                                  "False finally for from global if import in is lambda None nonlocal not or "
+                                  "pass raise return True try while with yield",
+                        line_comment="#", block_comments=False, triple_quotes=True),
+    "javascript": _language("javascript", _JS_KEYWORDS, template_strings=True),
+    "typescript": _language("typescript", _JS_KEYWORDS + " interface type enum implements private public "
+                                                         "protected readonly namespace declare as",
+                            template_strings=True),
+    "java": _language("java", "abstract boolean break byte case catch char class continue default do double "
+                              "else enum extends false final finally float for if implements import "
+                              "instanceof int interface long new null package private protected public "
+                              "return short static super switch this throw throws true try void while var"),
+    "c": _language("c", _C_KEYWORDS),
+    "cpp": _language("cpp", _C_KEYWORDS + " bool catch class delete false namespace new nullptr private "
+                                          "protected public template this throw true try using virtual"),
+    "go": _language("go", "break case chan const continue default defer else fallthrough for func go goto "
+                          "if import interface map package range return select struct switch type var "
+                          "nil true false"),
+    "rust": _language("rust", "as break const continue crate else enum false fn for if impl in let loop "
+                              "match mod move mut pub ref return self Self static struct super trait true "
+                              "type unsafe use where while"),
+    "bash": _language("bash", "if then else elif fi case esac for while until do done in function return "
+                              "local export", line_comment="#", block_comments=False),
+}
+
+# Dateiendung -> Sprache; unbekannte Endungen werden nur maskiert, nicht hervorgehoben
+EXTENSIONS = {
+    ".py": "python", ".js": "javascript", ".mjs": "javascript", ".jsx": "javascript",
+    ".ts": "typescript", ".tsx": "typescript", ".java": "java", ".c": "c", ".h": "c",
+    ".cpp": "cpp", ".cc": "cpp", ".hpp": "cpp", ".go": "go", ".rs": "rust", ".sh": "bash",
+}
+
+
+def escape_verbatim(text: str) -> str:
+    return VERBATIM_ESCAPE_PATTERN.sub(lambda match: VERBATIM_ESCAPES[match.group()], text)
+
+
+def strip_labels(text: str) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Entfernt die Zeilenmarken [!label:name] aus dem Snippet-Text. Liefert die
+    verbleibenden Zeilen und {Marke: Zeilennummer (1-basiert)}; bei doppelten
+    Marken gilt die erste.
+    """
+    lines: List[str] = []
+    labels: Dict[str, int] = {}
+    pending: List[str] = []
+    for line in text.expandtabs(4).splitlines():
+        if "[!label:" not in line:
+            lines.append(line)
+        else:
+            names = LABEL_PATTERN.findall(line)
+            line = LABEL_PATTERN.sub("", line).rstrip()
+            if not line.strip():
+                pending.extend(names)  # Marke allein in der Zeile: gilt für die nächste
+                continue
+            lines.append(line)
+            pending.extend(names)
+        for name in pending:
+            labels.setdefault(name, len(lines))
+        pending = []
+    for name in pending:
+        labels.setdefault(name, len(lines))  # Marke am Ende: letzte Zeile
+    return lines, labels
+
+
+def highlight(lines: List[str], language: Optional[Language]) -> List[str]:
+    """
+    Hebt Schlüsselwörter, Zeichenketten, Kommentare und Zahlen hervor und liefert
+    eine Zeile je Eingabezeile für Verbatim[commandchars=\\\\\\{\\}]. Über mehrere
+    Zeilen reichende Tokens werden je Zeile einzeln eingeschlossen.
+    """
+    text = "\n".join(lines)
+    if language is None:
+        return escape_verbatim(text).split("\n")
+    out: List[str] = []
+    pos = 0
+    keywords = language.keywords
+    for match in re.compile(language.pattern).finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == "word":
+            if token not in keywords:
+                continue
+            macro = "\\VmdKeyword"
+        else:
+            macro = TOKEN_MACROS[kind]
+        out.append(escape_verbatim(text[pos:match.start()]))
+        out.append("\n".join(f"{macro}{{{escape_verbatim(part)}}}" if part else ""
+                             for part in token.split("\n")))
+        pos = match.end()
+    out.append(escape_verbatim(text[pos:]))
+    return "".join(out).split("\n")
+
+
+@dataclass
+class Snippet:
+    name: str
+    path: str
+    language: Optional[str]
+    digest: str                                           # sha256 des Dateiinhalts (hex)
+    lines: List[str] = field(default_factory=list)        # hervorgehobene Zeilen (LaTeX)
+    text: List[str] = field(default_factory=list)         # dieselben Zeilen ohne Hervorhebung
+    labels: Dict[str, int] = field(default_factory=dict)  # Marke -> Zeilennummer
+
+    def line(self, label: str) -> Optional[int]:
+        return self.labels.get(label)
+
+
+class SnippetStore:
+    """
+    Code-Snippets aus einem Verzeichnis: snippet="name" verweist auf die Datei
+    name.<Endung> (auch in Unterverzeichnissen, z.B. "js/greet"), die Endung
+    bestimmt die Sprache.
+
+    Hervorhebung und Zeilenmarken werden je Dateiinhalt berechnet und, mit
+    cache_dir, als JSON unter cache_dir/snippets abgelegt. Derselbe Snippet in
+    mehreren Szenen, Sprachen oder Kursen wird so nur einmal zerlegt. Die Einträge
+    zählen zur Größengrenze des Szenen-Caches (RenderCache.evict).
+    """
+
+    def __init__(self, snippet_dir: str, cache_dir: Optional[str] = None):
+        self.snippet_dir = snippet_dir
+        self.cache_dir = os.path.join(cache_dir, SNIPPET_DIR) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._files: Optional[Dict[str, str]] = None
+        self._snippets: Dict[str, Optional[Snippet]] = {}
+        self._highlighted: Dict[str, tuple] = {}   # Cache-Schlüssel -> (Zeilen, Text, Marken)
+
+    def files(self) -> Dict[str, str]:
+        """{Snippet-Name: Pfad}; das Verzeichnis wird beim ersten Aufruf einmal gelesen."""
+        if self._files is None:
+            files: Dict[str, str] = {}
+            for root, dirs, names in os.walk(self.snippet_dir):
+                dirs.sort()
+                for filename in sorted(names):
+                    path = os.path.join(root, filename)
+                    relative = os.path.relpath(path, self.snippet_dir).replace(os.sep, "/")
+                    files.setdefault(os.path.splitext(relative)[0], path)
+                    files.setdefault(relative, path)  # auch mit Endung eindeutig ansprechbar
+            self._files = files
+        return self._files
+
+    def get(self, name: str) -> Optional[Snippet]:
+        """Der Snippet name, oder None, falls es keine passende Datei gibt."""
+        if name in self._snippets:
+            return self._snippets[name]
+        snippet = None
+        path = self.files().get(name)
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                snippet = self._load(name, path, data)
+            except (OSError, UnicodeDecodeError):
+                snippet = None
+        self._snippets[name] = snippet
+        return snippet
+
+    def _load(self, name: str, path: str, data: bytes) -> Snippet:
+        language = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        digest = hashlib.sha256(data).hexdigest()
+        key = hashlib.sha256(f"{SNIPPET_VERSION}\0{language or ''}\0{digest}".encode("utf-8")).hexdigest()
+        entry = self._highlighted.get(key)
+        if entry is None:
+            entry = self._read_cache(key)
+            if entry is None:
+                self.misses += 1
+                text, labels = strip_labels(data.decode("utf-8"))
+                entry = (highlight(text, LANGUAGES.get(language)), text, labels)
+                self._write_cache(key, entry)
+            else:
+                self.hits += 1
+            self._highlighted[key] = entry
+        lines, text, labels = entry
+        return Snippet(name, path, language, digest, lines, text, labels)
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _read_cache(self, key: str) -> Optional[tuple]:
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = data["lines"], data["text"], data["labels"]
+            # Zugriffszeit für die LRU-Verdrängung (RenderCache.evict) aktualisieren
+            os.utime(path)
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, key: str, entry: tuple):
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"lines": entry[0], "text": entry[1], "labels": entry[2]}, f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+            record_size(os.path.dirname(self.cache_dir), size)
+        except OSError:
+            # Wie beim Szenen-Cache: ohne schreibbaren Cache wird nur jedes Mal neu zerlegt
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def line(self, name: str, label: str) -> Optional[int]:
+        """Zeilennummer der Marke label im Snippet name, oder None."""
+        snippet = self.get(name)
+        return snippet.line(label) if snippet is not None else None
+
+    def version(self, names: Iterable[str]) -> str:
+        """Kurzer Hash über die Inhalte der genannten Snippets (für Cache-Schlüssel)."""
+        digest = hashlib.sha256()
+        for name in sorted(set(names)):
+            snippet = self.get(name)
+            digest.update(f"{name}\0{snippet.digest if snippet else '-'}\0".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+
+def code_line_snippet(line: str) -> Optional[str]:
+    """Name aus einer "### Code (snippet=...)"-Zeile, sonst None."""
+    match = CODE_LINE_PATTERN.search(line)
+    if match is None:
+        return None
+    return parse_parameters(match.group(1)).get("snippet") or None
+
+
+def scene_snippets(scene: Scene) -> List[str]:
+    """Alle Snippets, die eine Szene zeigt oder über [!line:...] anspricht."""
+    names = []
+    for element in scene.elements:
+        if element.kind is ElementKind.CODE:
+            name = element.parameters.get("snippet")
+            if name:
+                names.append(name)
+        content = element.content
+        if "Code" in content:
+            names.extend(name for name in map(code_line_snippet, content.split("\n")) if name)
+        if "[!line:" in content:
+            names.extend(match.group(1) for match in LINE_REFERENCE_PATTERN.finditer(content))
+    return names
+
+
+def collect_snippets(ast: AST) -> Dict[str, List[SourceSpan]]:
+    """Alle gezeigten Snippets mit ihren Fundstellen, in der Reihenfolge des ersten Auftretens."""
+    snippets: Dict[str, List[SourceSpan]] = {}
+    for scene in ast.scenes:
+        for element in scene.elements:
+            if element.kind is ElementKind.CODE:
+                name = element.parameters.get("snippet")
+                if name:
+                    snippets.setdefault(name, []).append(element.span)
+            elif element.kind is ElementKind.SLIDE and "Code" in element.content:
+                offset = 0
+                for line in element.content.split("\n"):
+                    # wie render_slide: Zeilen mit "###" und "Code"
+                    if line.lstrip().startswith("###") and "Code" in line:
+                        name = code_line_snippet(line)
+                        if name:
+                            snippets.setdefault(name, []).append(content_span(element, offset, len(line)))
+                    offset += len(line) + 1
+    return snippets
+
+
+def snippet_problems(ast: AST, store: SnippetStore, index: Optional[SymbolIndex] = None) -> List[Diagnostic]:
+    """
+    Fehlende Snippet-Dateien und unbekannte Zeilenmarken in [!line:snippet-label],
+    nach Position sortiert. index: bereits aufgebautes
+    Symbolverzeichnis des AST (sonst wird eines erzeugt).
+    """
+    problems = []
+    for name, spans in collect_snippets(ast).items():
+        if store.get(name) is None:
+            problems.extend(Diagnostic(span, f'snippet "{name}" not found in {store.snippet_dir}') for span in spans)
+    if index is None:
+        index = SymbolIndex()
+        index.add_ast(ast)
+    for reference in index.references:
+        if reference.kind != SNIPPET or not reference.label:
+            continue
+        snippet = store.get(reference.name)
+        if snippet is not None and snippet.line(reference.label) is None:
+            problems.append(Diagnostic(reference.span, f'{reference.text} references unknown label "{reference.label}" '
+                                             f'in snippet "{reference.name}"'))
+    problems.sort(key=lambda problem: (problem.span.line, problem.span.column))
+    return problems
@@ -0,0 +1,163 @@
+# vmd_interpreter/split.py
+
+import glob
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from .build import BuildError, make_renderer, open_atomic, output_path
+from .cache import RenderCache
+from .dsl_ast import AST, Scene
+from .metrics import Metrics, measure_phase
+from .snippets import SnippetStore
+
+# Dateiname eines Szenen-Fragments: scene_<Titel>_<Hash des Titels>. Er hängt nicht
+# von der Position ab, sodass Einfügen oder Löschen anderer Szenen die Dateien (und
+# .aux-Dateien) unveränderter Szenen nicht umbenennt.
+FRAGMENT_PREFIX = "scene_"
+FRAGMENT_SLUG_LENGTH = 40
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass
+class SplitResult:
+    masters: List[str] = field(default_factory=list)    # Master-Dokumente (eines je Sprache)
+    written: List[str] = field(default_factory=list)    # tatsächlich geschriebene Dateien
+    manifest: Optional[str] = None
+    fragments: int = 0
+    changed: int = 0
+
+
+def fragment_dir(vmd_file: str, lang: Optional[str] = None) -> str:
+    """Verzeichnis der Szenen-Fragmente, z.B. kurs_DE_scenes/ neben kurs_DE_output.tex."""
+    return output_path(vmd_file, lang)[:-len("_output.tex")] + "_scenes"
+
+
+def manifest_path(vmd_file: str) -> str:
+    return os.path.splitext(vmd_file)[0] + "_manifest.json"
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Schreibt content nur, wenn sich die Datei dadurch ändert; Änderungszeit und
+    LaTeX-Hilfsdateien unveränderter Fragmente bleiben so erhalten.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open_atomic(path) as f:
+        f.write(content)
+    return True
+
+
+def fragment_names(scenes: Iterable[Scene]) -> List[str]:
+    """
+    Fragmentnamen der Szenen, z.B. "scene_key_components_3fa2c1": der Titel in
+    Kleinbuchstaben (nur a-z und 0-9, höchstens FRAGMENT_SLUG_LENGTH Zeichen) und die
+    ersten Stellen seines SHA-1, der Titel mit gleichem Kurznamen unterscheidet.
+    Szenen mit gleichem Titel werden in ihrer Reihenfolge mit _2, _3, ... ergänzt.
+    """
+    names = []
+    seen: Dict[str, int] = {}
+    for scene in scenes:
+        ascii_title = unicodedata.normalize("NFKD", scene.title).encode("ascii", "ignore").decode("ascii")
+        slug = SLUG_PATTERN.sub("_", ascii_title.lower()).strip("_")[:FRAGMENT_SLUG_LENGTH].rstrip("_")
+        digest = hashlib.sha1(scene.title.encode("utf-8")).hexdigest()[:6]
+        name = f"{FRAGMENT_PREFIX}{slug}_{digest}" if slug else f"{FRAGMENT_PREFIX}{digest}"
+        count = seen[name] = seen.get(name, 0) + 1
+        names.append(name if count == 1 else f"{name}_{count}")
+    return names
+
+
+def remove_stale_fragments(directory: str, keep: Set[str]) -> List[str]:
+    """Löscht Fragmente (samt .aux) von Szenen, die es nicht mehr gibt (Name nicht in keep)."""
+    removed = []
+    for path in glob.glob(os.path.join(directory, FRAGMENT_PREFIX + "*.tex")):
+        stem = os.path.basename(path)[:-len(".tex")]
+        if stem in keep:
+            continue
+        os.remove(path)
+        removed.append(path)
+        try:
+            os.remove(os.path.join(directory, stem + ".aux"))
+        except OSError:
+            pass
+    return sorted(removed)
+
+
+def compile_split(vmd_file: str, ast: AST, languages: List[str], cache: Optional[RenderCache] = None,
+                  metrics: Optional[Metrics] = None, include_changed_only: bool = False,
+                  render_jobs: int = 1, assets: Optional[Dict[str, str]] = None,
+                  snippets: Optional[SnippetStore] = None) -> SplitResult:
+    """
+    Geteilte Ausgabe: ein Master-Dokument je Sprache mit \\include-Anweisungen und
+    eine .tex-Datei je Szene. Nur geänderte Dateien werden geschrieben; das Manifest
+    (<name>_manifest.json) hält fest, welche Fragmente sich in diesem Lauf geändert haben.
+
+    include_changed_only: \\includeonly im Master nennt nur die geänderten Fragmente,
+    sodass LaTeX nur diese neu setzt.
+    render_jobs > 1 rendert die Szenen parallel (siehe parallel.ParallelRenderer).
+    assets: Zuordnung Quellpfad -> bereitgestellter Pfad (siehe build.prepare_assets).
+    snippets: Code-Snippets (siehe build.prepare_snippets).
+    """
+    targets = languages or [None]
+    base_dir = os.path.dirname(vmd_file)
+    renderer = make_renderer(ast, None, cache, metrics, render_jobs, assets, snippets)
+    result = SplitResult()
+    manifest = {"source": vmd_file, "outputs": {}}
+    names: Dict[Optional[str], List[str]] = {lang: [] for lang in targets}
+    changed: Dict[Optional[str], List[str]] = {lang: [] for lang in targets}
+
+    try:
+        for lang in targets:
+            os.makedirs(fragment_dir(vmd_file, lang), exist_ok=True)
+
+        fragments = fragment_names(ast.scenes)
+        blocks = renderer.iter_scene_blocks(languages)
+        for name in fragments:
+            with measure_phase(metrics, "render"):
+                _scene, scene_lines = next(blocks)
+            with measure_phase(metrics, "write"):
+                for lang in targets:
+                    directory = fragment_dir(vmd_file, lang)
+                    path = os.path.join(directory, name + ".tex")
+                    # Pfad relativ zum Master, mit "/" auch unter Windows
+                    names[lang].append(os.path.basename(directory) + "/" + name)
+                    if write_if_changed(path, "\n".join(scene_lines[lang])):
+                        changed[lang].append(names[lang][-1])
+                        result.written.append(path)
+
+        with measure_phase(metrics, "write"):
+            for lang in targets:
+                master = output_path(vmd_file, lang)
+                result.masters.append(master)
+                include_only = changed[lang] if include_changed_only else None
+                if write_if_changed(master, renderer.render_master(names[lang], include_only)):
+                    result.written.append(master)
+                removed = remove_stale_fragments(fragment_dir(vmd_file, lang), set(fragments))
+                manifest["outputs"][lang or "default"] = {
+                    "master": os.path.relpath(master, base_dir or "."),
+                    "fragments": names[lang],
+                    "changed": changed[lang],
+                    "removed": [os.path.relpath(path, base_dir or ".") for path in removed],
+                }
+                if metrics is not None:
+                    metrics.add_output(master)
+
+            result.manifest = manifest_path(vmd_file)
+            with open_atomic(result.manifest) as f:
+                json.dump(manifest, f, indent=2)
+                f.write("\n")
+    except OSError as e:
+        raise BuildError(f"Error writing file: {e}") from e
+
+    result.fragments = len(ast.scenes) * len(targets)
+    result.changed = sum(len(paths) for paths in changed.values())
+    return result
@@ -0,0 +1,251 @@
+# vmd_interpreter/symbols.py
+
+import gc
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .dsl_ast import AST, Element, ElementKind, Scene, SourceSpan
+from .tokenizer import parse_parameters
+
+# Symbolarten
+BUTTON = "button"
+BULLET = "bullet"
+QUIZ = "quiz"
+SNIPPET = "snippet"
+SCENE = "scene"
+
+# Befehle im Text: [!show:name], [!hide:a,b], [!quiz:name], [!line:snippet-label]
+COMMANDS = ("show", "hide", "quiz", "line")
+
+# Eine Fundstelle im Inhalt eines Elements:
+#  - Unterelement am Zeilenanfang: ### Button (name="...") bzw. ### Code (snippet="...")
+#  - Bullet-Definition am Zeilenanfang: [!bullet0] - Text
+#  - Befehl an beliebiger Stelle: [!show:name]
+# Gesucht wird in "\n" + Inhalt; das führende "\n" statt "^" erlaubt dem Regex-Modul
+# eine schnelle Literal-Suche (wie MARKER_LINE_PATTERN im Tokenizer).
+CONTENT_PATTERN = re.compile(
+    r'\n[ \t]*###[ \t]*(\w+)[ \t]*(?:\((.*)\))?'
+    r'|\n[ \t]*\[!(bullet\d+)\]'
+    r'|\[!(\w+):([^\]\n]*)\]'
+)
+
+# Buttons verweisen mit action="scene: Titel" auf eine Szene
+SCENE_ACTION = "scene:"
+
+
+def content_span(element: Element, offset: int, length: int) -> SourceSpan:
+    """
+    Position von element.content[offset:offset + length] in der Quelldatei.
+    Der Inhalt ist gestrippt; Spalten in seiner ersten Zeile zählen daher ab dem
+    ersten Zeichen, das kein Leerzeichen ist.
+    """
+    content = element.content
+    line = element.span.end_line - content.count("\n") + content.count("\n", 0, offset)
+    column = offset - content.rfind("\n", 0, offset)
+    return SourceSpan(line, column, line, column + length - 1)
+
+
+class Symbol(NamedTuple):
+    kind: str                       # BUTTON, BULLET, QUIZ, SNIPPET oder SCENE
+    name: str
+    scene: int                      # Index der Szene (0-basiert)
+    source: Union[Scene, Element]   # Definierende Szene bzw. Element
+    offset: int = -1                # Position im Inhalt von source (-1: source selbst)
+    length: int = 0
+
+    @property
+    def span(self) -> SourceSpan:
+        # Positionen werden erst bei Bedarf berechnet; meist wird nur nachgeschlagen.
+        if self.offset < 0:
+            return self.source.span
+        return content_span(self.source, self.offset, self.length)
+
+
+class Reference(NamedTuple):
+    kind: str                       # Art des referenzierten Symbols
+    name: str
+    scene: int
+    source: Element                 # Element, in dessen Inhalt der Verweis steht
+    offset: int
+    length: int
+    label: str = ""                 # Nur bei [!line:snippet-label]: die Zeilenmarke
+
+    @property
+    def span(self) -> SourceSpan:
+        return content_span(self.source, self.offset, self.length)
+
+    @property
+    def text(self) -> str:
+        """Der Verweis wie in der Quelle, z.B. "[!show:learnMore]"."""
+        return self.source.content[self.offset:self.offset + self.length]
+
+
+class Diagnostic(NamedTuple):
+    span: SourceSpan
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.span}: {self.message}"
+
+
+class SymbolIndex:
+    """
+    Verzeichnis der benannten Elemente eines Dokuments (Buttons, Bullets, Quizze,
+    Code-Snippets, Szenen) und aller Verweise darauf, jeweils mit Quellposition.
+
+    Bullets gelten nur innerhalb ihrer Szene, alle anderen Namen im ganzen Dokument.
+    resolve() prüft alle Verweise mit je einem Dictionary-Zugriff, also in linearer Zeit.
+
+        index = SymbolIndex()
+        ast = DSLParser(text, symbols=index).parse()
+        for diagnostic in index.resolve():
+            print(diagnostic)
+    """
+
+    def __init__(self):
+        # Intern werden Symbole und Verweise als einfache Tupel in der Feldreihenfolge
+        # von Symbol bzw. Reference gehalten: ein Tupel ist deutlich schneller erzeugt
+        # als ein NamedTuple, und Positionen werden meist nie gebraucht.
+        # (Art, Name, Szene bei Bullets sonst -1) -> erste Definition
+        self._symbols: Dict[Tuple[str, str, int], tuple] = {}
+        self._references: List[tuple] = []
+        self.problems: List[Diagnostic] = []   # Syntaxfehler in Befehlen
+        self.scene_count = 0
+
+    def define(self, kind: str, name: str, scene: int, source: Union[Scene, Element],
+               offset: int = -1, length: int = 0):
+        key = (kind, name, scene if kind == BULLET else -1)
+        if key not in self._symbols:
+            self._symbols[key] = (kind, name, scene, source, offset, length)
+
+    def lookup(self, kind: str, name: str, scene: int = -1) -> Optional[Symbol]:
+        symbol = self._symbols.get((kind, name, scene if kind == BULLET else -1))
+        return Symbol(*symbol) if symbol is not None else None
+
+    @property
+    def symbols(self) -> List[Symbol]:
+        return [Symbol(*symbol) for symbol in self._symbols.values()]
+
+    @property
+    def references(self) -> List[Reference]:
+        return [Reference(*reference) for reference in self._references]
+
+    def add_ast(self, ast: AST):
+        # Wie beim Laden des AST-Caches: die vielen neuen Tupel enthalten keine Zyklen,
+        # ohne zyklische Speicherbereinigung ist das Eintragen deutlich schneller.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for scene in ast.scenes:
+                self.add_scene(scene)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def add_scene(self, scene: Scene):
+        index = self.scene_count
+        self.scene_count += 1
+        self.define(SCENE, scene.title, index, scene)
+        for element in scene.elements:
+            self.add_element(index, element)
+
+    def add_element(self, scene: int, element: Element):
+        kind = element.kind
+        if kind is ElementKind.QUIZ:
+            name = element.parameters.get("name")
+            if name:
+                self.define(QUIZ, name, scene, element)
+        elif kind is ElementKind.CODE:
+            name = element.parameters.get("snippet")
+            if name:
+                self.define(SNIPPET, name, scene, element)
+
+        content = element.content
+        if "[!" not in content and "###" not in content:
+            return
+        symbols = self._symbols
+        references = self._references
+        for match in CONTENT_PATTERN.finditer("\n" + content):
+            sub_type, params, bullet, command, args = match.groups()
+            # Positionen im Inhalt: Befehle ab "[!", Zeilen-Fundstellen ab Zeilenanfang
+            start, end = match.span()
+            if command is not None:
+                if command != "line" and command in COMMANDS and "," not in args:
+                    # Häufigster Fall: ein einzelner Name
+                    name = args.strip()
+                    if name:
+                        target = QUIZ if command == "quiz" else BULLET if name.startswith(BULLET) else BUTTON
+                        references.append((target, name, scene, element, start - 1, end - start, ""))
+                        continue
+                self._add_command(scene, element, start - 1, end - start, command, args)
+            elif bullet is not None:
+                key = (BULLET, bullet, scene)
+                if key not in symbols:
+                    symbols[key] = (BULLET, bullet, scene, element, start, end - start - 1)
+            else:
+                self._add_subelement(scene, element, start, end - start - 1, sub_type, params)
+
+    def _add_subelement(self, scene: int, element: Element, offset: int, length: int,
+                        sub_type: str, params: Optional[str]):
+        sub_type = sub_type.lower()
+        if sub_type == "button":
+            parameters = parse_parameters(params)
+            name = parameters.get("name")
+            if name:
+                self.define(BUTTON, name, scene, element, offset, length)
+            action = parameters.get("action", "").strip()
+            if action.startswith(SCENE_ACTION):
+                target = action[len(SCENE_ACTION):].strip()
+                self._references.append((SCENE, target, scene, element, offset, length, ""))
+        elif sub_type == "code":
+            name = parse_parameters(params).get("snippet")
+            if name:
+                self.define(SNIPPET, name, scene, element, offset, length)
+
+    def _add_command(self, scene: int, element: Element, offset: int, length: int, command: str, args: str):
+        text = element.content[offset:offset + length]
+        if command not in COMMANDS:
+            self.problems.append(Diagnostic(content_span(element, offset, length),
+                                            f'unknown command "{command}" in {text} '
+                                            f'(valid: {", ".join(COMMANDS)})'))
+            return
+        names = [name.strip() for name in args.split(",") if name.strip()]
+        if not names:
+            self.problems.append(Diagnostic(content_span(element, offset, length), f"{text} has no parameters"))
+            return
+        for name in names:
+            if command == "quiz":
+                target, label = QUIZ, ""
+            elif command == "line":
+                parts = name.split("-")
+                if len(parts) != 2 or not all(parts):
+                    self.problems.append(Diagnostic(content_span(element, offset, length),
+                                                    f'invalid line marker {text}, expected "snippet-label"'))
+                    continue
+                (target, name), label = (SNIPPET, parts[0]), parts[1]
+            else:
+                target, label = BULLET if name.startswith(BULLET) else BUTTON, ""
+            self._references.append((target, name, scene, element, offset, length, label))
+
+    def dangling(self) -> List[Reference]:
+        """Verweise, zu denen es kein Symbol gibt."""
+        symbols = self._symbols
+        return [Reference(*reference) for reference in self._references
+                if (reference[0], reference[1], reference[2] if reference[0] == BULLET else -1) not in symbols]
+
+    def resolve(self) -> List[Diagnostic]:
+        """Alle Probleme (Syntaxfehler und unaufgelöste Verweise), nach Position sortiert."""
+        diagnostics = list(self.problems)
+        for reference in self.dangling():
+            where = " in this scene" if reference.kind == BULLET else ""
+            diagnostics.append(Diagnostic(
+                reference.span, f'{reference.text} references unknown {reference.kind} "{reference.name}"{where}'))
+        diagnostics.sort(key=lambda diagnostic: (diagnostic.span.line, diagnostic.span.column))
+        return diagnostics
+
+
+def index_ast(ast: AST) -> SymbolIndex:
+    """Symbolverzeichnis eines bereits geparsten AST (z.B. aus dem AST-Cache)."""
+    index = SymbolIndex()
+    index.add_ast(ast)
+    return index
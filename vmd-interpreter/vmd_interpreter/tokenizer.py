@@ -0,0 +1,222 @@
+# vmd_interpreter/tokenizer.py
+
+import re
+import sys
+from functools import partial
+from typing import Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from .dsl_ast import NO_PARAMETERS, Parameters, SourceSpan
+
+# Token-Arten
+HEADER = "header"
+SCENE = "scene"
+ELEMENT = "element"
+
+SCENE_MARKER = "# Scene:"
+# Struktur-Zeilen: "# Scene: Titel" oder ein Elementkopf "## Typ (key="value", ...)".
+# Alle anderen Zeilen sind Inhalt und werden nicht einzeln angefasst. Das führende
+# "\n" erlaubt dem Regex-Modul eine schnelle Literal-Suche.
+MARKER_LINE_PATTERN = re.compile(
+    r'\n(?P<indent>[ \t]*)'
+    r'(?:# Scene:(?P<scene>[^\n]*)'
+    r'|(?P<element>##[ \t]*(?P<type>\w+)(?:[ \t]*\((?P<params>.*)\))?)[ \t]*$)',
+    re.MULTILINE
+)
+
+# Zeilenanfang einer Szene (für das Aufteilen eines Dokuments in Szenen-Quelltexte)
+SCENE_LINE_PATTERN = re.compile(r'^[ \t]*# Scene:', re.MULTILINE)
+
+# Lesegröße; klein genug, dass neben dem AST kaum Eingabe im Speicher liegt
+CHUNK_SIZE = 1 << 16
+
+
+class Token(NamedTuple):
+    kind: str                  # HEADER, SCENE oder ELEMENT
+    value: str                 # Szenentitel bzw. Elementtyp (leer beim Header)
+    span: SourceSpan
+    parameters: Parameters = NO_PARAMETERS
+    content: str = ""          # Nur bei ELEMENT: der (gestrippte) Inhalt
+
+
+def parse_parameters(params_str: Optional[str]) -> Parameters:
+    # Erwartetes Format: key="value", key2="value2", ...
+    if not params_str:
+        return NO_PARAMETERS
+    parameters = {}
+    for param in params_str.split(','):
+        if '=' in param:
+            k, v = param.split('=', 1)
+            parameters[k.strip()] = v.strip().strip('"')
+    return Parameters(parameters)
+
+
+class DSLTokenizer:
+    """
+    Zeilenorientierter Tokenizer, der die Eingabe in einem einzigen Durchlauf liest.
+    Akzeptiert einen String oder einen beliebigen Text-Stream (z.B. ein Datei-Handle)
+    und liefert HEADER-, SCENE- und ELEMENT-Tokens mit Zeilen-/Spaltenangaben (1-basiert).
+
+    Der Stream wird blockweise gelesen; nur Zeilen, die mit "#" beginnen, werden in
+    Python betrachtet, der Inhalt dazwischen wird als Ganzes übernommen.
+    """
+
+    def __init__(self, source: Union[str, TextIO], chunk_size: int = CHUNK_SIZE, first_line: int = 1):
+        """
+        first_line: Zeilennummer der ersten Zeile von source (für Ausschnitte einer Datei).
+        """
+        if isinstance(source, str) and "\r" in source:
+            # \r\n und \r werden wie beim Lesen einer Datei (newline=None) zu \n
+            source = source.replace("\r\n", "\n").replace("\r", "\n")
+        self.source = source
+        self.chunk_size = chunk_size
+        self.first_line = first_line
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.tokens()
+
+    def _read(self) -> Iterator[str]:
+        # Ein String wird direkt in Stücke geschnitten (io.StringIO hielte eine Kopie mit
+        # 4 Bytes je Zeichen). Beide Iteratoren behalten das zuletzt gelieferte Stück nicht.
+        source, size = self.source, self.chunk_size
+        if isinstance(source, str):
+            return (source[start:start + size] for start in range(0, len(source), size))
+        return iter(partial(source.read, size), "")
+
+    def _chunks(self) -> Iterator[str]:
+        # Liefert Blöcke, die jeweils an einer Zeilengrenze enden. Jeder Block beginnt
+        # mit einem zusätzlichen "\n", das die erste Zeile für MARKER_LINE_PATTERN
+        # auffindbar macht; er wird in einem Schritt zusammengesetzt, und der gelesene
+        # Rohblock ist beim Verarbeiten schon freigegeben.
+        pending = ""
+        for chunk in self._read():
+            cut = chunk.rfind("\n") + 1
+            if cut == 0:
+                pending += chunk
+                continue
+            block = "".join(("\n", pending, chunk[:cut]))
+            pending = chunk[cut:]
+            chunk = None
+            yield block
+        if pending:
+            yield "\n" + pending
+
+    def tokens(self) -> Iterator[Token]:
+        in_scene = False
+        header_seen = False
+        # Offener (mehrzeiliger) Header: Startzeile und bisher gesammelter Inhalt
+        header_start = 0
+        header_lines: List[str] = []
+        # Offenes Element: (Typ, Parameter, Zeile, Spalte, Endspalte des Kopfes) und
+        # Rohtext des Inhalts (ggf. über Blockgrenzen hinweg)
+        element: Optional[Tuple[str, Parameters, int, int, int]] = None
+        element_parts: List[str] = []
+        line_no = self.first_line  # Zeilennummer am Anfang des aktuellen Blocks
+
+        for buffer in self._chunks():
+            # Jeder Block beginnt an einer Zeilengrenze, nach dem vorangestellten "\n"
+            pos = 1
+            if not in_scene:
+                # Vor der ersten Szene wird zeilenweise nach dem Header gesucht.
+                while pos < len(buffer):
+                    end = buffer.find("\n", pos)
+                    end = len(buffer) if end < 0 else end + 1
+                    line = buffer[pos:end].rstrip("\n")
+                    stripped = line.lstrip()
+                    if stripped.startswith(SCENE_MARKER):
+                        # Ein nicht geschlossener Header wird ignoriert
+                        in_scene = True
+                        header_start = 0
+                        break
+                    if header_start:
+                        # Innerhalb des Headers bis zum schließenden "---"
+                        close = line.find("---")
+                        if close >= 0:
+                            header_lines.append(line[:close])
+                            yield self._header_token(header_lines, header_start, line_no, close + 3)
+                            header_start = 0
+                        else:
+                            header_lines.append(line)
+                    elif not header_seen and line.startswith("---"):
+                        header_seen = True
+                        rest = line[3:]
+                        close = rest.find("---")
+                        if close >= 0:
+                            yield self._header_token([rest[:close]], line_no, line_no, close + 6)
+                        else:
+                            header_start = line_no
+                            header_lines = [rest]
+                    pos = end
+                    line_no += 1
+                if not in_scene:
+                    continue
+
+            count_pos = pos      # bis hierhin sind die Zeilen gezählt
+            content_pos = pos    # ab hier beginnt noch nicht übernommener Inhalt
+            for match in MARKER_LINE_PATTERN.finditer(buffer, pos - 1):
+                start = match.start("indent")
+                line_no += buffer.count("\n", count_pos, start)
+                count_pos = start
+                if element is not None:
+                    element_parts.append(buffer[content_pos:start])
+                    yield self._finish_element(element, element_parts)
+                    element = None
+
+                column = match.end("indent") - start + 1
+                content_pos = match.end() + 1
+                title = match.group("scene")
+                if title is not None:
+                    stripped_title = title.rstrip()
+                    end_column = match.end("scene") - start - len(title) + len(stripped_title)
+                    span = SourceSpan(line_no, column, line_no, end_column)
+                    yield Token(SCENE, stripped_title.lstrip(), span)
+                else:
+                    element = (sys.intern(match.group("type")), parse_parameters(match.group("params")),
+                               line_no, column, match.end("element") - start)
+                    element_parts = []
+
+            if element is not None:
+                element_parts.append(buffer[content_pos:])
+            line_no += buffer.count("\n", count_pos)
+
+        if element is not None:
+            yield self._finish_element(element, element_parts)
+
+    @staticmethod
+    def _header_token(lines: List[str], start_line: int, end_line: int, end_column: int) -> Token:
+        header_data = {}
+        for line in lines:
+            if '=' in line:
+                key, value = line.split('=', 1)
+                header_data[key.strip()] = value.strip().strip('"')
+        span = SourceSpan(start_line, 1, end_line, end_column)
+        return Token(HEADER, "", span, parameters=Parameters(header_data))
+
+    @staticmethod
+    def _finish_element(element, parts: List[str]) -> Token:
+        # Der Inhalt beginnt in der Zeile nach dem Elementkopf. Das Ende der Spanne
+        # ist die letzte nicht-leere Inhaltszeile (bzw. der Kopf bei leerem Inhalt).
+        element_type, parameters, line, column, end_column = element
+        raw = parts[0] if len(parts) == 1 else "".join(parts)
+        content = raw.strip()
+        end_line = line
+        if content:
+            last = len(raw.rstrip())
+            end_line = line + 1 + raw.count("\n", 0, last)
+            end_column = last - raw.rfind("\n", 0, last) - 1
+        return Token(ELEMENT, element_type, SourceSpan(line, column, end_line, end_column), parameters, content)
+
+
+def split_scene_sources(text: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Teilt ein Dokument an den "# Scene:"-Zeilen auf. Liefert den Text vor der ersten
+    Szene (Header) und für jede Szene (Startzeile, Quelltext ab der "# Scene:"-Zeile).
+    """
+    starts = [match.start() for match in SCENE_LINE_PATTERN.finditer(text)]
+    if not starts:
+        return text, []
+    scenes = []
+    line_no = 1 + text.count("\n", 0, starts[0])
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        scenes.append((line_no, text[start:end]))
+        line_no += text.count("\n", start, end)
+    return text[:starts[0]], scenes
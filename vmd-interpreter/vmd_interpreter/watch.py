@@ -0,0 +1,153 @@
+# vmd_interpreter/watch.py
+
+import hashlib
+import os
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from .build import BuildError, collect_languages, open_atomic, output_path
+from .dsl_ast import AST, Scene
+from .parser import DSLParser
+from .renderer import DSLRenderer
+from .tokenizer import split_scene_sources
+
+POLL_INTERVAL = 0.1  # Sekunden
+
+
+def shift_scene(scene: Scene, delta: int) -> Scene:
+    """Kopie einer Szene, deren Quellpositionen um delta Zeilen verschoben sind."""
+    def shift(span):
+        return span._replace(line=span.line + delta, end_line=span.end_line + delta) if span else span
+    elements = [replace(element, span=shift(element.span)) for element in scene.elements]
+    return replace(scene, elements=elements, span=shift(scene.span))
+
+
+class WatchSession:
+    """
+    Hält den AST einer .vmd-Datei im Speicher und baut bei Änderungen nur die
+    Szenen neu, deren Quelltext sich geändert hat.
+
+    Die Datei wird an den "# Scene:"-Zeilen aufgeteilt; geparste Szenen und ihre
+    gerenderten Zeilen (je Sprachauswahl) werden pro Szenen-Quelltext gemerkt.
+    """
+
+    def __init__(self, vmd_file: str):
+        self.vmd_file = vmd_file
+        self.ast: Optional[AST] = None
+        # Szenen-Quelltext -> (Startzeile beim Parsen, geparste Szene)
+        self._scenes: Dict[str, Tuple[int, Scene]] = {}
+        # (Szenen-Quelltext, Sprachen) -> {Sprache: Zeilen}
+        self._rendered: Dict[Tuple[str, Tuple[str, ...]], Dict[Optional[str], List[str]]] = {}
+        # Ausgabepfad -> Hash des zuletzt geschriebenen Inhalts
+        self._written: Dict[str, bytes] = {}
+        self._prologue: Optional[str] = None
+        self.last_parsed = 0
+        self.last_rendered = 0
+
+    def rebuild(self) -> List[str]:
+        """
+        Liest die Datei neu ein und aktualisiert die Ausgaben. Liefert die Pfade der
+        tatsächlich neu geschriebenen Dateien; Fehler werden als BuildError gemeldet.
+        """
+        try:
+            with open(self.vmd_file, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise BuildError(f"Error reading file: {e}") from e
+
+        prologue, sources = split_scene_sources(text)
+        if prologue != self._prologue or self.ast is None:
+            header = DSLParser(prologue).parse_header()
+            self._prologue = prologue
+        else:
+            header = self.ast.header
+
+        # Nur geänderte Szenen parsen, verschobene nur in den Positionen anpassen
+        self.last_parsed = 0
+        scenes = []
+        known = {}
+        for first_line, source in sources:
+            entry = self._scenes.get(source) or known.get(source)
+            if entry is None:
+                scene = DSLParser(source, first_line=first_line).parse().scenes[0]
+                self.last_parsed += 1
+            elif entry[0] != first_line:
+                scene = shift_scene(entry[1], first_line - entry[0])
+            else:
+                scene = entry[1]
+            known[source] = (first_line, scene)
+            scenes.append(scene)
+        self._scenes = known
+        self.ast = AST(header=header, scenes=scenes)
+
+        languages = collect_languages(self.ast, self.vmd_file)
+        return self._render(sources, sorted(languages) if len(languages) > 1 else [])
+
+    def _render(self, sources, languages: List[str]) -> List[str]:
+        renderer = DSLRenderer(self.ast)
+        targets = languages or [None]
+        outputs = {lang: renderer.capture(renderer.render_header) for lang in targets}
+
+        self.last_rendered = 0
+        rendered = {}
+        lang_key = tuple(languages)
+        for (_first_line, source), scene in zip(sources, self.ast.scenes):
+            key = (source, lang_key)
+            scene_lines = self._rendered.get(key) or rendered.get(key)
+            if scene_lines is None:
+                if languages:
+                    scene_lines = renderer.render_scene_languages(scene, languages)
+                else:
+                    scene_lines = {None: renderer.capture(renderer.render_scene, scene)}
+                self.last_rendered += 1
+            rendered[key] = scene_lines
+            for lang in targets:
+                outputs[lang].extend(scene_lines[lang])
+        self._rendered = rendered
+
+        written = []
+        for lang, lines in outputs.items():
+            lines.append("\\end{document}")
+            output = "\n".join(lines)
+            path = output_path(self.vmd_file, lang)
+            digest = hashlib.sha1(output.encode("utf-8")).digest()
+            if self._written.get(path) == digest and os.path.exists(path):
+                continue  # unverändert, z.B. nur eine andere Sprache wurde bearbeitet
+            with open_atomic(path) as f:
+                f.write(output)
+            self._written[path] = digest
+            written.append(path)
+        return written
+
+
+def watch(vmd_file: str, interval: float = POLL_INTERVAL):
+    """Beobachtet vmd_file per Polling und baut bei jeder Änderung inkrementell neu."""
+    session = WatchSession(vmd_file)
+    last_state = None
+    print(f"Watching {vmd_file} (Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                stat = os.stat(vmd_file)
+                state = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                state = None
+            if state is not None and state != last_state:
+                last_state = state
+                start = time.perf_counter()
+                try:
+                    written = session.rebuild()
+                except BuildError as e:
+                    print(e)
+                else:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    total = len(session.ast.scenes)
+                    for path in written:
+                        print(f"LaTeX output written to {path}")
+                    print(f"Rebuilt in {elapsed:.0f} ms "
+                          f"({session.last_parsed}/{total} scenes parsed, "
+                          f"{session.last_rendered}/{total} scenes rendered)")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass